@@ -0,0 +1,209 @@
+"""
+Adaptive Wait Module
+Derives per-locator timeouts and poll intervals from observed appearance latency
+"""
+import os
+import json
+import atexit
+import threading
+from typing import Tuple, List, Dict, Optional
+from util.common_utils import CommonUtils
+from util.file_lock import FileLock
+from util.logger import Logger
+
+
+class AdaptiveWaitStore:
+    """
+    Latency history per (environment, page class, locator), persisted across runs
+    
+    The environment is the Appium server URL and device of the current
+    session, so timings of a fast emulator never shorten waits on a slow
+    device. Without an environment (no session created through
+    DriverFactory, or a replayed one) history is neither used nor recorded.
+    Waits that time out are recorded with the time they waited, so the
+    derived timeout grows again when an element gets slower.
+    """
+    
+    MAX_SAMPLES = 100
+    MIN_SAMPLES = 5
+    MIN_TIMEOUT = 1.0
+    MIN_POLL_INTERVAL = 0.05
+    MAX_POLL_INTERVAL = 0.5
+    
+    logger = Logger.get_logger(__name__)
+    
+    _lock = threading.Lock()
+    _samples: Dict[str, List[float]] = {}
+    _pending: Dict[str, List[float]] = {}
+    _loaded = False
+    _scope: Optional[str] = None
+    _store_dir = os.path.join(CommonUtils.get_project_root(), ".framework_cache")
+    _store_file = os.path.join(_store_dir, "wait_latencies.json")
+    
+    @staticmethod
+    def is_enabled() -> bool:
+        """
+        Check whether adaptive waits are enabled
+        
+        Returns:
+            bool: False if ADAPTIVE_WAITS is set to a false value
+        """
+        return os.getenv('ADAPTIVE_WAITS', 'true').lower() in ('1', 'true', 'yes')
+    
+    @classmethod
+    def set_scope(cls, server_url: Optional[str], device_id: str = ""):
+        """
+        Set the environment the following waits run in
+        
+        Args:
+            server_url: Appium server URL, None to neither use nor record history
+            device_id: Device serial or UDID of the session
+        """
+        cls._scope = f"{server_url}@{device_id}" if server_url else None
+    
+    @classmethod
+    def is_active(cls) -> bool:
+        """Check whether history is used and recorded for the current session"""
+        return cls.is_enabled() and cls._scope is not None
+    
+    @classmethod
+    def key(cls, page: str, locator: Tuple[str, str]) -> str:
+        """
+        Build the store key of a locator on a page in the current environment
+        
+        Args:
+            page: Page class name
+            locator: Tuple of (By strategy, locator value)
+            
+        Returns:
+            str: Store key
+        """
+        return f"{cls._scope}|{page}|{locator[0]}={locator[1]}"
+    
+    @classmethod
+    def record(cls, page: str, locator: Tuple[str, str], latency: float):
+        """
+        Record how long a locator took to appear
+        
+        Args:
+            page: Page class name
+            locator: Tuple of (By strategy, locator value)
+            latency: Time until the wait succeeded in seconds
+        """
+        if not cls.is_active():
+            return
+        cls._load()
+        key = cls.key(page, locator)
+        with cls._lock:
+            for store in (cls._samples, cls._pending):
+                samples = store.setdefault(key, [])
+                samples.append(round(latency, 4))
+                del samples[:-cls.MAX_SAMPLES]
+    
+    @classmethod
+    def record_timeout(cls, page: str, locator: Tuple[str, str], waited: float):
+        """
+        Record a wait that timed out; the time waited is a lower bound of the latency
+        
+        Args:
+            page: Page class name
+            locator: Tuple of (By strategy, locator value)
+            waited: Time until the wait gave up in seconds
+        """
+        cls.record(page, locator, waited)
+    
+    @classmethod
+    def percentile(cls, page: str, locator: Tuple[str, str], percent: float):
+        """
+        Get a latency percentile of a locator
+        
+        Args:
+            page: Page class name
+            locator: Tuple of (By strategy, locator value)
+            percent: Percentile between 0 and 100
+            
+        Returns:
+            float: Latency in seconds, or None without enough samples
+        """
+        cls._load()
+        samples = sorted(cls._samples.get(cls.key(page, locator), []))
+        if len(samples) < cls.MIN_SAMPLES:
+            return None
+        index = min(len(samples) - 1, int(round(percent / 100 * (len(samples) - 1))))
+        return samples[index]
+    
+    @classmethod
+    def wait_settings(cls, page: str, locator: Tuple[str, str], requested_timeout: float,
+                      default_poll: float = 0.5) -> Tuple[float, float]:
+        """
+        Get the timeout and poll interval to use for a wait
+        
+        The requested timeout is the cap: the adaptive timeout is the
+        observed p99 latency times ADAPTIVE_WAIT_MARGIN, never above the
+        request or ADAPTIVE_WAIT_CAP and never below MIN_TIMEOUT. Without
+        enough history the request is used unchanged.
+        
+        Args:
+            page: Page class name
+            locator: Tuple of (By strategy, locator value)
+            requested_timeout: Timeout asked for by the caller in seconds
+            default_poll: Poll interval used without history
+            
+        Returns:
+            tuple: (timeout, poll interval) in seconds
+        """
+        if not cls.is_active():
+            return requested_timeout, default_poll
+        p99 = cls.percentile(page, locator, 99)
+        if p99 is None:
+            return requested_timeout, default_poll
+        
+        margin = float(os.getenv('ADAPTIVE_WAIT_MARGIN', '2.0'))
+        cap = min(requested_timeout, float(os.getenv('ADAPTIVE_WAIT_CAP', str(requested_timeout))))
+        timeout = min(cap, max(cls.MIN_TIMEOUT, p99 * margin))
+        p50 = cls.percentile(page, locator, 50)
+        poll = min(cls.MAX_POLL_INTERVAL, max(cls.MIN_POLL_INTERVAL, p50 / 4))
+        return timeout, poll
+    
+    @classmethod
+    def flush(cls):
+        """Merge samples recorded by this process into the shared store file"""
+        with cls._lock:
+            pending, cls._pending = cls._pending, {}
+        if not pending:
+            return
+        try:
+            with FileLock(cls._store_file + ".lock"):
+                stored = cls._read_file()
+                for key, samples in pending.items():
+                    merged = stored.setdefault(key, []) + samples
+                    stored[key] = merged[-cls.MAX_SAMPLES:]
+                os.makedirs(cls._store_dir, exist_ok=True)
+                tmp_file = f"{cls._store_file}.{os.getpid()}.tmp"
+                with open(tmp_file, 'w') as file:
+                    json.dump(stored, file)
+                os.replace(tmp_file, cls._store_file)
+        except Exception as e:
+            cls.logger.warning(f"Could not save wait latencies: {str(e)}")
+    
+    @classmethod
+    def _load(cls):
+        """Load history from previous runs once per process"""
+        if cls._loaded:
+            return
+        with cls._lock:
+            if not cls._loaded:
+                cls._samples = cls._read_file()
+                cls._loaded = True
+                atexit.register(cls.flush)
+    
+    @classmethod
+    def _read_file(cls) -> Dict[str, List[float]]:
+        if not os.path.exists(cls._store_file):
+            return {}
+        try:
+            with open(cls._store_file, 'r') as file:
+                return json.load(file)
+        except ValueError:
+            cls.logger.warning("Corrupt wait latency store, ignoring it")
+            return {}
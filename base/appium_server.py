@@ -0,0 +1,229 @@
+"""
+Appium Server Module
+Spawns and supervises one local Appium server per pytest-xdist worker
+"""
+import os
+import time
+import shlex
+import threading
+import subprocess
+import urllib.request
+from typing import List, Optional, Dict
+from util.common_utils import CommonUtils
+from util.logger import Logger
+
+
+class AppiumServerManager:
+    """Lifecycle manager for a fleet of local Appium servers on distinct ports"""
+    
+    DEFAULT_COMMAND = "appium --address {host} --port {port} --base-path /"
+    
+    logger = Logger.get_logger(__name__)
+    
+    def __init__(self, count: int, base_port: int = 4723, host: str = "127.0.0.1",
+                 command: Optional[str] = None, startup_timeout: float = 60, log_dir: Optional[str] = None,
+                 max_missed_checks: int = 3):
+        """
+        Initialize server manager
+        
+        Args:
+            count: Number of servers to run
+            base_port: Port of the first server, the others use consecutive ports
+            host: Interface the servers bind to
+            command: Server command template with {host} and {port} placeholders
+            startup_timeout: Time to wait for a server to report ready in seconds
+            log_dir: Directory for per-server output
+            max_missed_checks: Consecutive failed health checks before a running server is restarted
+        """
+        self.count = count
+        self.base_port = base_port
+        self.host = host
+        self.command = command or os.getenv('APPIUM_SERVER_COMMAND', self.DEFAULT_COMMAND)
+        self.startup_timeout = startup_timeout
+        self.log_dir = log_dir or os.path.join(CommonUtils.get_project_root(), "logs", "appium")
+        self.max_missed_checks = max_missed_checks
+        self._processes: Dict[int, subprocess.Popen] = {}
+        self._missed_checks: Dict[int, int] = {}
+        self._monitor: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self._restart_lock = threading.Lock()
+    
+    @property
+    def ports(self) -> List[int]:
+        """Ports of all managed servers"""
+        return [self.base_port + index for index in range(self.count)]
+    
+    def url(self, port: int) -> str:
+        """
+        Get the URL of a server
+        
+        Args:
+            port: Server port
+            
+        Returns:
+            str: Server URL
+        """
+        return f"http://{self.host}:{port}"
+    
+    @staticmethod
+    def url_for_worker(worker_id: Optional[str] = None) -> Optional[str]:
+        """
+        Get the managed server URL bound to an xdist worker
+        
+        Args:
+            worker_id: Worker id such as 'gw2', defaults to the current worker
+            
+        Returns:
+            str: Server URL, or None if no managed servers are running
+        """
+        count = int(os.getenv('APPIUM_MANAGED_SERVERS', '0'))
+        if count <= 0:
+            return None
+        worker_id = worker_id or os.getenv('PYTEST_XDIST_WORKER', 'gw0')
+        index = int(worker_id[2:]) if worker_id.startswith('gw') and worker_id[2:].isdigit() else 0
+        host = os.getenv('APPIUM_MANAGED_HOST', '127.0.0.1')
+        base_port = int(os.getenv('APPIUM_MANAGED_BASE_PORT', '4723'))
+        return f"http://{host}:{base_port + index % count}"
+    
+    def start(self):
+        """
+        Start every server and wait until all report ready
+        
+        Raises:
+            RuntimeError: If a server does not become healthy in time
+        """
+        os.makedirs(self.log_dir, exist_ok=True)
+        for port in self.ports:
+            self._spawn(port)
+        for port in self.ports:
+            if not self.wait_until_healthy(port):
+                self.stop()
+                raise RuntimeError(f"Appium server on port {port} did not become ready")
+        
+        os.environ['APPIUM_MANAGED_SERVERS'] = str(self.count)
+        os.environ['APPIUM_MANAGED_HOST'] = self.host
+        os.environ['APPIUM_MANAGED_BASE_PORT'] = str(self.base_port)
+        self.logger.info(f"Started {self.count} Appium servers on ports {self.ports}")
+    
+    def is_healthy(self, port: int, timeout: float = 2) -> bool:
+        """
+        Check a server's /status endpoint
+        
+        Args:
+            port: Server port
+            timeout: HTTP timeout in seconds
+            
+        Returns:
+            bool: True if the server answered /status with HTTP 200
+        """
+        try:
+            with urllib.request.urlopen(f"{self.url(port)}/status", timeout=timeout) as response:
+                return response.status == 200
+        except Exception:
+            return False
+    
+    def wait_until_healthy(self, port: int) -> bool:
+        """
+        Wait for a server to report ready
+        
+        Args:
+            port: Server port
+            
+        Returns:
+            bool: True if healthy before startup_timeout, False otherwise
+        """
+        deadline = time.monotonic() + self.startup_timeout
+        while time.monotonic() < deadline:
+            process = self._processes.get(port)
+            if process is not None and process.poll() is not None:
+                self.logger.error(f"Appium server on port {port} exited with code {process.returncode}")
+                return False
+            if self.is_healthy(port):
+                return True
+            time.sleep(0.25)
+        return False
+    
+    def ensure_running(self, port: int) -> bool:
+        """
+        Restart a server that crashed or stopped answering
+        
+        A server whose process exited is restarted right away. One that is
+        still running but misses health checks is only restarted after
+        max_missed_checks in a row, so a server busy with a slow command
+        (a large page_source, a screen recording) keeps its live session.
+        
+        Args:
+            port: Server port
+            
+        Returns:
+            bool: True if the server is healthy afterwards
+        """
+        with self._restart_lock:
+            process = self._processes.get(port)
+            if process is not None and process.poll() is None:
+                if self.is_healthy(port):
+                    self._missed_checks[port] = 0
+                    return True
+                missed = self._missed_checks.get(port, 0) + 1
+                self._missed_checks[port] = missed
+                if missed < self.max_missed_checks:
+                    self.logger.warning(f"Appium server on port {port} missed {missed} of "
+                                        f"{self.max_missed_checks} health checks")
+                    return False
+                self.logger.warning(f"Appium server on port {port} stopped answering, restarting")
+            else:
+                self.logger.warning(f"Appium server on port {port} is down, restarting")
+            self._missed_checks[port] = 0
+            self._terminate(port)
+            self._spawn(port)
+            return self.wait_until_healthy(port)
+    
+    def start_monitor(self, interval: float = 5):
+        """
+        Health-check all servers in the background and restart crashed ones
+        
+        Args:
+            interval: Time between health checks in seconds
+        """
+        def monitor():
+            while not self._stopping.wait(interval):
+                for port in self.ports:
+                    if self._stopping.is_set():
+                        return
+                    self.ensure_running(port)
+        
+        self._monitor = threading.Thread(target=monitor, name="appium-server-monitor", daemon=True)
+        self._monitor.start()
+    
+    def stop(self):
+        """Stop the monitor and tear down every server"""
+        self._stopping.set()
+        if self._monitor is not None:
+            self._monitor.join()
+            self._monitor = None
+        for port in list(self._processes):
+            self._terminate(port)
+        os.environ.pop('APPIUM_MANAGED_SERVERS', None)
+        self.logger.info("Stopped managed Appium servers")
+    
+    def _spawn(self, port: int):
+        """Launch one server process"""
+        args = shlex.split(self.command.format(host=self.host, port=port))
+        log_path = os.path.join(self.log_dir, f"appium_{port}.log")
+        self.logger.info(f"Starting Appium server: {' '.join(args)}")
+        with open(log_path, 'ab') as log_file:
+            self._processes[port] = subprocess.Popen(
+                args, stdout=log_file, stderr=subprocess.STDOUT, cwd=CommonUtils.get_project_root()
+            )
+    
+    def _terminate(self, port: int):
+        """Terminate one server process, killing it if it does not exit"""
+        process = self._processes.pop(port, None)
+        if process is None or process.poll() is not None:
+            return
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
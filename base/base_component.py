@@ -0,0 +1,223 @@
+"""
+Base Component Module
+Parts of a screen, such as list rows, whose element lookups are scoped to a root element
+"""
+import re
+from typing import Tuple, List, Optional, Callable, Any
+from selenium.common.exceptions import StaleElementReferenceException, NoSuchElementException
+from selenium.webdriver.common.by import By
+from base.page_snapshot import PageSnapshot, UnsupportedLocatorError, is_supported
+from util.logger import Logger
+
+
+class BaseComponent:
+    """
+    A screen fragment found under one root element, e.g. a cart row or a search result tile
+    
+    Subclasses declare ROOT, the locator of their container, and child
+    locators that are only searched under the root. The server walks the
+    fragment's subtree instead of the whole screen, and a row's name and
+    price can never come from different rows. XPath child locators are
+    made relative ('//a' is searched as './/a').
+    
+    BasePage.find_components() materializes a whole list from a single
+    ROOT query. On pages with USE_SNAPSHOT, reads (get_text, is_present)
+    of top-level components come from the page's shared page_source
+    snapshot, so reading every row costs one round trip instead of one per
+    row and field. A component whose root went stale is found again by its
+    position in the list, as long as the list still has the same length.
+    """
+    
+    ROOT: Optional[Tuple[str, str]] = None
+    
+    def __init__(self, page, root, index: int = 0, count: int = 1, parent: Optional['BaseComponent'] = None):
+        """
+        Initialize component
+        
+        Args:
+            page: BasePage showing the component
+            root: WebElement of the component's container
+            index: Position among the components found by the same query
+            count: Number of components the query found
+            parent: Component the query was scoped to, None for the whole screen
+        """
+        self.page = page
+        self.driver = page.driver
+        self.root = root
+        self.index = index
+        self.count = count
+        self.parent = parent
+        self.logger = Logger.get_logger(self.__class__.__name__)
+    
+    def __repr__(self):
+        return f"{self.__class__.__name__}(#{self.index} of {self.count})"
+    
+    @staticmethod
+    def scoped(locator: Tuple[str, str]) -> Tuple[str, str]:
+        """
+        Make a locator search under an element
+        
+        Args:
+            locator: Tuple of (By strategy, locator value)
+            
+        Returns:
+            tuple: Locator with XPaths starting at the element ('.//a', '(.//a)[2]')
+        """
+        strategy, value = locator
+        if strategy == By.XPATH:
+            return strategy, re.sub(r"^(\(*)/", r"\1./", value)
+        return locator
+    
+    def find_element(self, locator: Tuple[str, str]):
+        """
+        Find a child element
+        
+        Args:
+            locator: Tuple of (By strategy, locator value)
+            
+        Returns:
+            WebElement: First match under the root
+        """
+        return self._with_root(lambda root: root.find_element(*self.scoped(locator)))
+    
+    def find_elements(self, locator: Tuple[str, str]) -> list:
+        """
+        Find child elements
+        
+        Args:
+            locator: Tuple of (By strategy, locator value)
+            
+        Returns:
+            list: Matches under the root, empty if none
+        """
+        return self._with_root(lambda root: root.find_elements(*self.scoped(locator)))
+    
+    def find_components(self, component_class: type) -> List['BaseComponent']:
+        """
+        Materialize nested components from one query under the root
+        
+        Args:
+            component_class: BaseComponent subclass with a ROOT locator
+            
+        Returns:
+            list: Components in screen order, empty if none
+        """
+        elements = self.find_elements(component_class.ROOT)
+        return [component_class(self.page, element, index, len(elements), parent=self)
+                for index, element in enumerate(elements)]
+    
+    def get_text(self, locator: Optional[Tuple[str, str]] = None) -> str:
+        """
+        Get the text of a child element, or of the root without a locator
+        
+        Args:
+            locator: Tuple of (By strategy, locator value)
+            
+        Returns:
+            str: Element text
+            
+        Raises:
+            NoSuchElementException: If the component has no such child
+        """
+        self.logger.debug("Getting text of %s in %r", locator or "root", self)
+        
+        def from_snapshot(snapshot, node):
+            nodes = snapshot.find_all_within(node, locator) if locator else [node]
+            if not nodes:
+                raise NoSuchElementException(f"{locator} not found in {self!r}")
+            return PageSnapshot.node_text(nodes[0])
+        
+        def from_elements():
+            element = self.find_element(locator) if locator else self._with_root(lambda root: root)
+            return element.text
+        
+        return self._read(locator, from_snapshot, from_elements)
+    
+    def is_present(self, locator: Tuple[str, str]) -> bool:
+        """
+        Check whether the component has a child element, without waiting
+        
+        Args:
+            locator: Tuple of (By strategy, locator value)
+            
+        Returns:
+            bool: True if present
+        """
+        def from_elements():
+            with self.page._implicit_wait_suspended():
+                return bool(self.find_elements(locator))
+        
+        return self._read(locator, lambda snapshot, node: bool(snapshot.find_all_within(node, locator)),
+                          from_elements)
+    
+    def click(self, locator: Optional[Tuple[str, str]] = None):
+        """
+        Click a child element, or the root without a locator
+        
+        Args:
+            locator: Tuple of (By strategy, locator value)
+        """
+        self.logger.info("Clicking on %s in %r", locator or "root", self)
+        if locator:
+            self.find_element(locator).click()
+        else:
+            self._with_root(lambda root: root.click())
+        self.page.invalidate_snapshot()
+        self.page.invalidate_elements()
+    
+    def click_first_of(self, locators: List[Tuple[str, str]], timeout: float = 10) -> Tuple[str, str]:
+        """
+        Click whichever alternative child becomes clickable first
+        
+        Args:
+            locators: Alternative child locators in preference order
+            timeout: Wait timeout in seconds
+            
+        Returns:
+            tuple: The locator that was clicked
+            
+        Raises:
+            TimeoutException: If no alternative became clickable in time
+        """
+        locator, element = self.page.wait_for_first_of(locators, timeout, condition="clickable", within=self)
+        self.logger.info("Clicking on %s in %r", locator, self)
+        element.click()
+        self.page.invalidate_snapshot()
+        self.page.invalidate_elements()
+        return locator
+    
+    def _read(self, locator: Optional[Tuple[str, str]], from_snapshot: Callable[[PageSnapshot, Any], Any],
+              from_elements: Callable[[], Any]):
+        """Answer a read from the page snapshot when the component maps onto it, from elements otherwise"""
+        if self.parent is None and self.page.USE_SNAPSHOT and is_supported(self.ROOT):
+            snapshot = self.page.snapshot()
+            nodes = snapshot.find_all(self.ROOT)
+            # The screen changed since the query if the count differs; rows would not line up
+            if len(nodes) == self.count:
+                try:
+                    return from_snapshot(snapshot, nodes[self.index])
+                except UnsupportedLocatorError:
+                    pass
+        return from_elements()
+    
+    def _with_root(self, action: Callable):
+        """Run an action on the root, finding the root again once if it went stale"""
+        try:
+            return action(self.root)
+        # A missing child raises NoSuchElementException and must not re-query the root
+        except StaleElementReferenceException:
+            self.logger.debug("Stale root of %r, finding it again", self)
+            self.root = self._find_root()
+            return action(self.root)
+    
+    def _find_root(self):
+        """Find the root again by its position in the list it came from"""
+        if self.parent is not None:
+            elements = self.parent.find_elements(self.ROOT)
+        else:
+            elements = self.driver.find_elements(*self.ROOT)
+        if len(elements) != self.count:
+            raise StaleElementReferenceException(
+                f"{self!r} is gone: the list now has {len(elements)} components instead of {self.count}"
+            )
+        return elements[self.index]
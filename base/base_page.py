@@ -2,13 +2,65 @@
 from appium.webdriver.common.appiumby import AppiumBy
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
-from typing import Tuple, Optional
+from selenium.common.exceptions import (
+    TimeoutException, NoSuchElementException, StaleElementReferenceException, WebDriverException
+)
+from typing import Tuple, Optional, Callable, Sequence
+from contextlib import contextmanager
+import io
+import time
+import hashlib
+import weakref
+from base.adaptive_wait import AdaptiveWaitStore
+from base.locator_overrides import LocatorOverrides
+from base.locator_stats import LocatorStats
+from base.page_snapshot import PageSnapshot, is_supported
 from util.logger import Logger
+from util.screenshot_service import ScreenshotService
+
+try:
+    from PIL import Image, ImageChops, ImageStat
+except ImportError:
+    Image = None
 
 
 class BasePage:
     
+    # Page objects set USE_SNAPSHOT = True to answer is_element_displayed
+    # from page_source snapshots instead of one WebDriverWait per locator
+    USE_SNAPSHOT = False
+    SNAPSHOT_MAX_AGE = 2.0
+    SNAPSHOT_POLL_INTERVAL = 0.5
+    
+    # Shared by all page objects of a driver so any mutating action invalidates it
+    _snapshots = weakref.WeakKeyDictionary()
+    
+    # Element handles found per driver, keyed by locator, so a wait followed
+    # by an action on the same locator costs one lookup. Only actions
+    # (_on_element) reuse them, retrying once on a stale handle;
+    # find_element always looks the element up. Dropped by actions that may
+    # leave the screen and by app resets (forget).
+    USE_ELEMENT_CACHE = True
+    _elements = weakref.WeakKeyDictionary()
+    element_cache_stats = {'hits': 0, 'misses': 0, 'stale': 0}
+    
+    # Page classes already warned about mixing implicit and explicit waits
+    _mixed_wait_warned = set()
+    
+    # UI-idle synchronization: the screen counts as settled once it stops
+    # changing for UI_IDLE_WINDOW seconds ('hierarchy' or 'screenshot')
+    UI_IDLE_METHOD = "hierarchy"
+    UI_IDLE_WINDOW = 0.5
+    UI_IDLE_TIMEOUT = 5.0
+    UI_IDLE_POLL_INTERVAL = 0.2
+    UI_IDLE_SCREENSHOT_SIZE = (36, 80)
+    UI_IDLE_SCREENSHOT_TOLERANCE = 2.0
+    
+    def __init_subclass__(cls, **kwargs):
+        
+        super().__init_subclass__(**kwargs)
+        # Before modules such as pageObjects.navigation copy the locators
+        LocatorOverrides.apply(cls)
     
     def __init__(self, driver):
         
@@ -18,46 +70,85 @@ class BasePage:
     
     def find_element(self, locator: Tuple[str, str], timeout: int = 20):
         
+        self._check_wait_mixing(locator)
         try:
-            self.logger.debug(f"Finding element: {locator}")
-            element = WebDriverWait(self.driver, timeout).until(
-                EC.presence_of_element_located(locator)
-            )
+            self.logger.debug("Finding element: %s", locator)
+            element = self._wait_until(EC.presence_of_element_located, locator, timeout)
+            self._cache_element(locator, element)
             return element
         except TimeoutException:
-            self.logger.error(f"Element not found: {locator}")
+            self.logger.error("Element not found: %s", locator)
             raise
     
     def find_elements(self, locator: Tuple[str, str], timeout: int = 20):
        
+        self._check_wait_mixing(locator)
         try:
-            self.logger.debug(f"Finding elements: {locator}")
-            elements = WebDriverWait(self.driver, timeout).until(
-                EC.presence_of_all_elements_located(locator)
-            )
+            self.logger.debug("Finding elements: %s", locator)
+            elements = self._wait_until(EC.presence_of_all_elements_located, locator, timeout)
             return elements
         except TimeoutException:
-            self.logger.error(f"Elements not found: {locator}")
+            self.logger.error("Elements not found: %s", locator)
             raise
     
+    def find_components(self, component_class: type, timeout: float = 20) -> list:
+        """
+        Materialize every component of a kind from a single query
+        
+        Args:
+            component_class: BaseComponent subclass with a ROOT locator
+            timeout: Seconds to wait for the first component
+            
+        Returns:
+            list: Components in screen order, empty if none appeared
+        """
+        self._check_wait_mixing(component_class.ROOT)
+        try:
+            elements = self._wait_until(EC.presence_of_all_elements_located, component_class.ROOT, timeout)
+        except TimeoutException:
+            self.logger.debug("No %s found", component_class.__name__)
+            return []
+        return [component_class(self, element, index, len(elements)) for index, element in enumerate(elements)]
+    
+    def find_component(self, component_class: type, timeout: float = 20):
+        """
+        Get the first component of a kind
+        
+        Args:
+            component_class: BaseComponent subclass with a ROOT locator
+            timeout: Wait timeout in seconds
+            
+        Returns:
+            BaseComponent: Component rooted at the first match
+            
+        Raises:
+            TimeoutException: If no component appeared
+        """
+        return component_class(self, self.find_element(component_class.ROOT, timeout))
+    
     def click(self, locator: Tuple[str, str]):
         
-        self.logger.info(f"Clicking on element: {locator}")
-        element = self.find_element(locator)
-        element.click()
+        self.logger.info("Clicking on element: %s", locator)
+        self._on_element(locator, lambda element: element.click())
+        self.invalidate_snapshot()
+        self.invalidate_elements()
     
-    def send_keys(self, locator: Tuple[str, str], text: str):
+    def send_keys(self, locator: Tuple[str, str], text: str, clear: bool = True, timeout: int = 20):
         
-        self.logger.info(f"Sending keys to element: {locator}")
-        element = self.find_element(locator)
-        element.clear()
-        element.send_keys(text)
+        self.logger.info("Sending keys to element: %s", locator)
+        
+        def type_text(element):
+            if clear:
+                element.clear()
+            element.send_keys(text)
+        
+        self._on_element(locator, type_text, timeout)
+        self.invalidate_snapshot()
     
     def get_text(self, locator: Tuple[str, str]) -> str:
        
-        self.logger.info(f"Getting text from element: {locator}")
-        element = self.find_element(locator)
-        return element.text
+        self.logger.info("Getting text from element: %s", locator)
+        return self._on_element(locator, lambda element: element.text)
     
     def is_element_displayed(self, locator: Tuple[str, str], timeout: int = 10) -> bool:
         """
@@ -70,42 +161,418 @@ class BasePage:
         Returns:
             bool: True if displayed, False otherwise
         """
+        if self.USE_SNAPSHOT and is_supported(locator):
+            return self.wait_for_snapshot(lambda snapshot: snapshot.is_displayed(locator), timeout) is not None
         try:
-            element = WebDriverWait(self.driver, timeout).until(
-                EC.visibility_of_element_located(locator)
-            )
-            return element.is_displayed()
+            # A missing element would otherwise block for the implicit wait on every poll
+            with self._implicit_wait_suspended():
+                element = self._wait_until(EC.visibility_of_element_located, locator, timeout)
+                return element.is_displayed()
         except (TimeoutException, NoSuchElementException):
             return False
     
     def wait_for_element_clickable(self, locator: Tuple[str, str], timeout: int = 20):
         
-        self.logger.debug(f"Waiting for element to be clickable: {locator}")
-        return WebDriverWait(self.driver, timeout).until(
-            EC.element_to_be_clickable(locator)
-        )
+        self.logger.debug("Waiting for element to be clickable: %s", locator)
+        element = self._cached_element(locator)
+        try:
+            if element is not None and element.is_displayed() and element.is_enabled():
+                return element
+        except (StaleElementReferenceException, NoSuchElementException):
+            self._drop_element(locator)
+        self._check_wait_mixing(locator)
+        element = self._wait_until(EC.element_to_be_clickable, locator, timeout)
+        self._cache_element(locator, element)
+        return element
     
     def scroll_to_element(self, locator: Tuple[str, str]):
        
-        self.logger.info(f"Scrolling to element: {locator}")
-        element = self.find_element(locator)
-        self.driver.execute_script("mobile: scrollToElement", {"element": element})
+        self.logger.info("Scrolling to element: %s", locator)
+        self._on_element(locator, lambda element: self.driver.execute_script("mobile: scrollToElement",
+                                                                             {"element": element}))
+        self.invalidate_snapshot()
+        self.invalidate_elements()
     
     def swipe(self, start_x: int, start_y: int, end_x: int, end_y: int, duration: int = 800):
        
-        self.logger.info(f"Swiping from ({start_x}, {start_y}) to ({end_x}, {end_y})")
+        self.logger.info("Swiping from (%s, %s) to (%s, %s)", start_x, start_y, end_x, end_y)
         self.driver.swipe(start_x, start_y, end_x, end_y, duration)
+        self.invalidate_snapshot()
+        self.invalidate_elements()
     
     def hide_keyboard(self):
         
         try:
             self.logger.info("Hiding keyboard")
             self.driver.hide_keyboard()
+            self.invalidate_snapshot()
         except Exception as e:
-            self.logger.debug(f"Keyboard not visible or unable to hide: {str(e)}")
+            self.logger.debug("Keyboard not visible or unable to hide: %s", e)
     
     def take_screenshot(self, filename: str):
         
-        self.logger.info(f"Taking screenshot: {filename}")
-        self.driver.save_screenshot(filename)
+        self.logger.info("Taking screenshot: %s", filename)
+        # Written in the background; ScreenshotService.wait() blocks until it is on disk
+        return ScreenshotService.save(self.driver, filename)
+    
+    def snapshot(self, max_age: Optional[float] = None) -> PageSnapshot:
+        """
+        Get a parsed snapshot of the current screen
 
+        A snapshot younger than max_age is reused, so several locator
+        queries cost a single page_source round trip.
+        
+        Args:
+            max_age: Maximum snapshot age in seconds, defaults to SNAPSHOT_MAX_AGE
+            
+        Returns:
+            PageSnapshot: Snapshot of the current hierarchy
+        """
+        max_age = self.SNAPSHOT_MAX_AGE if max_age is None else max_age
+        snapshot = self._snapshots.get(self.driver)
+        if snapshot is None or snapshot.age > max_age:
+            self.logger.debug("Fetching page source snapshot")
+            snapshot = PageSnapshot(self.driver.page_source)
+            self._snapshots[self.driver] = snapshot
+        return snapshot
+    
+    def invalidate_snapshot(self):
+        """Drop the cached snapshot after an action that may change the screen"""
+        self._snapshots.pop(self.driver, None)
+    
+    def invalidate_elements(self):
+        """Drop the cached element handles after an action that may leave the screen"""
+        self._elements.pop(self.driver, None)
+    
+    @classmethod
+    def forget(cls, driver):
+        """
+        Drop the cached snapshot and element handles of a driver, e.g. after its app restarted
+        
+        Args:
+            driver: Appium WebDriver instance
+        """
+        cls._snapshots.pop(driver, None)
+        cls._elements.pop(driver, None)
+    
+    @classmethod
+    def get_element_cache_stats(cls) -> dict:
+        """
+        Get element cache counters of this process
+        
+        Returns:
+            dict: Hits (lookups saved), misses (lookups sent) and stale handles looked up again
+        """
+        return dict(cls.element_cache_stats)
+    
+    def wait_for_snapshot(self, condition: Callable[[PageSnapshot], bool], timeout: float = 10,
+                          poll_interval: Optional[float] = None) -> Optional[PageSnapshot]:
+        """
+        Poll page_source snapshots until a condition holds
+        
+        Args:
+            condition: Function taking a PageSnapshot and returning bool
+            timeout: Wait timeout in seconds
+            poll_interval: Time between snapshots, defaults to SNAPSHOT_POLL_INTERVAL
+            
+        Returns:
+            PageSnapshot: First snapshot satisfying the condition, None on timeout
+        """
+        poll_interval = self.SNAPSHOT_POLL_INTERVAL if poll_interval is None else poll_interval
+        deadline = time.monotonic() + timeout
+        snapshot = self.snapshot()
+        while not condition(snapshot):
+            if time.monotonic() >= deadline:
+                return None
+            time.sleep(poll_interval)
+            snapshot = self.snapshot(max_age=0)
+        return snapshot
+
+    def wait_for_first_of(self, locators: Sequence[Tuple[str, str]], timeout: float = 20,
+                          condition: str = "present", poll_interval: float = 0.25, within=None):
+        """
+        Wait for whichever of several alternative locators matches first
+        
+        All alternatives are checked in one polling loop with the implicit
+        wait suspended, so a missing alternative costs one round trip per
+        poll instead of its own full timeout. Alternatives that won before
+        are polled first.
+        
+        Args:
+            locators: Alternative locators in preference order
+            timeout: Wait timeout in seconds
+            condition: 'present', 'visible' or 'clickable'
+            poll_interval: Time between polls in seconds
+            within: BaseComponent to search under instead of the whole screen
+            
+        Returns:
+            tuple: (winning locator, WebElement)
+            
+        Raises:
+            TimeoutException: If no alternative matched in time
+        """
+        chain = f"{(within or self).__class__.__name__}:" + "|".join(value for _, value in locators)
+        ordered = LocatorStats.order(chain, locators)
+        self.logger.debug("Waiting for first of: %s", ordered)
+        
+        deadline = time.monotonic() + timeout
+        with self._implicit_wait_suspended():
+            while True:
+                for locator in ordered:
+                    element = self._first_matching(locator, condition, within)
+                    if element is not None:
+                        LocatorStats.record_win(chain, locator)
+                        self.logger.debug("Alternative matched: %s", locator)
+                        return locator, element
+                if time.monotonic() >= deadline:
+                    break
+                time.sleep(poll_interval)
+        
+        self.logger.error("None of the alternatives matched: %s", ordered)
+        raise TimeoutException(f"None of the alternatives matched within {timeout}s: {ordered}")
+    
+    def click_first_of(self, locators: Sequence[Tuple[str, str]], timeout: float = 20) -> Tuple[str, str]:
+        """
+        Click whichever alternative locator becomes clickable first
+        
+        Args:
+            locators: Alternative locators in preference order
+            timeout: Wait timeout in seconds
+            
+        Returns:
+            tuple: The locator that was clicked
+        """
+        locator, element = self.wait_for_first_of(locators, timeout, condition="clickable")
+        self.logger.info("Clicking on element: %s", locator)
+        element.click()
+        self.invalidate_snapshot()
+        self.invalidate_elements()
+        return locator
+    
+    def is_element_absent(self, locator: Tuple[str, str], stability_window: float = 0,
+                          poll_interval: float = 0.25) -> bool:
+        """
+        Check that an element is not displayed, without waiting for a timeout
+        
+        The screen is checked once with the implicit wait suspended. With a
+        stability window the element must also stay absent for that long,
+        which guards against screens that are still loading.
+        
+        Args:
+            locator: Tuple of (By strategy, locator value)
+            stability_window: Time the element must stay absent in seconds
+            poll_interval: Time between checks in seconds
+            
+        Returns:
+            bool: True if absent, False if it is (or becomes) displayed
+        """
+        deadline = time.monotonic() + stability_window
+        with self._implicit_wait_suspended():
+            while True:
+                if self._is_displayed_now(locator):
+                    return False
+                if time.monotonic() >= deadline:
+                    return True
+                time.sleep(poll_interval)
+    
+    def wait_for_element_to_disappear(self, locator: Tuple[str, str], timeout: float = 10,
+                                      poll_interval: float = 0.25) -> bool:
+        """
+        Wait until an element is no longer displayed
+        
+        Returns as soon as the element is gone, immediately if it is
+        already absent.
+        
+        Args:
+            locator: Tuple of (By strategy, locator value)
+            timeout: Wait timeout in seconds
+            poll_interval: Time between checks in seconds
+            
+        Returns:
+            bool: True if the element disappeared, False on timeout
+        """
+        deadline = time.monotonic() + timeout
+        with self._implicit_wait_suspended():
+            while self._is_displayed_now(locator):
+                if time.monotonic() >= deadline:
+                    self.logger.debug("Element still displayed after %ss: %s", timeout, locator)
+                    return False
+                time.sleep(poll_interval)
+        return True
+    
+    def wait_for_ui_idle(self, timeout: Optional[float] = None, window: Optional[float] = None,
+                         method: Optional[str] = None) -> bool:
+        """
+        Wait until the screen stops changing
+        
+        Consecutive hierarchy hashes (or downscaled screenshots) are compared
+        and the wait returns as soon as they stay unchanged for the window.
+        Use after navigation actions instead of sleeps or implicitly_wait.
+        
+        Args:
+            timeout: Maximum wait in seconds, defaults to UI_IDLE_TIMEOUT
+            window: Time the screen must stay unchanged, defaults to UI_IDLE_WINDOW
+            method: 'hierarchy' or 'screenshot', defaults to UI_IDLE_METHOD
+            
+        Returns:
+            bool: True if the screen settled, False on timeout
+        """
+        timeout = self.UI_IDLE_TIMEOUT if timeout is None else timeout
+        window = self.UI_IDLE_WINDOW if window is None else window
+        method = method or self.UI_IDLE_METHOD
+        
+        start = time.monotonic()
+        previous, source = self._screen_fingerprint(method)
+        stable_since = time.monotonic()
+        while True:
+            if time.monotonic() - stable_since >= window:
+                if source is not None:
+                    self._snapshots[self.driver] = PageSnapshot(source)
+                self.logger.debug("UI idle after %.2fs", time.monotonic() - start)
+                return True
+            if time.monotonic() - start >= timeout:
+                self.logger.debug("UI still changing after %ss", timeout)
+                return False
+            time.sleep(self.UI_IDLE_POLL_INTERVAL)
+            current, source = self._screen_fingerprint(method)
+            if not self._same_screen(previous, current, method):
+                stable_since = time.monotonic()
+            previous = current
+    
+    def _screen_fingerprint(self, method: str):
+        """
+        Capture a cheap fingerprint of the current screen
+        
+        Returns:
+            tuple: (fingerprint, page source or None)
+        """
+        if method == "hierarchy":
+            source = self.driver.page_source
+            return hashlib.md5(source.encode('utf-8')).hexdigest(), source
+        if method == "screenshot":
+            png = self.driver.get_screenshot_as_png()
+            if Image is None:
+                return hashlib.md5(png).hexdigest(), None
+            return Image.open(io.BytesIO(png)).convert('L').resize(self.UI_IDLE_SCREENSHOT_SIZE), None
+        raise ValueError(f"Unsupported UI idle method: {method}")
+    
+    def _same_screen(self, previous, current, method: str) -> bool:
+        """Compare two fingerprints, tolerating small pixel noise for screenshots"""
+        if method == "screenshot" and Image is not None:
+            difference = ImageStat.Stat(ImageChops.difference(previous, current)).mean[0]
+            return difference <= self.UI_IDLE_SCREENSHOT_TOLERANCE
+        return previous == current
+    
+    def _wait_until(self, condition, locator: Tuple[str, str], timeout: float):
+        """
+        Run an explicit wait with a history-derived timeout and poll interval
+        
+        The caller's timeout is the upper bound; AdaptiveWaitStore shortens
+        it and tightens polling once the locator has enough latency history.
+        Successful waits feed their latency back into the store, timed out
+        waits the time they waited.
+        
+        Args:
+            condition: expected_conditions factory taking the locator
+            locator: Tuple of (By strategy, locator value)
+            timeout: Requested wait timeout in seconds
+            
+        Returns:
+            Result of the expected condition
+        """
+        page = self.__class__.__name__
+        timeout, poll_interval = AdaptiveWaitStore.wait_settings(page, locator, timeout)
+        start = time.monotonic()
+        try:
+            result = WebDriverWait(self.driver, timeout, poll_frequency=poll_interval).until(condition(locator))
+        except TimeoutException:
+            AdaptiveWaitStore.record_timeout(page, locator, time.monotonic() - start)
+            raise
+        AdaptiveWaitStore.record(page, locator, time.monotonic() - start)
+        return result
+    
+    def _on_element(self, locator: Tuple[str, str], action: Callable, timeout: int = 20):
+        """
+        Run an action on a locator's element, looking it up again once if the handle went stale
+        
+        Args:
+            locator: Tuple of (By strategy, locator value)
+            action: Callable taking the WebElement
+            timeout: Maximum time to wait for the element in seconds
+            
+        Returns:
+            Result of the action
+        """
+        element = self._cached_element(locator)
+        if element is None:
+            return action(self.find_element(locator, timeout))
+        try:
+            return action(element)
+        # Some drivers report a handle of a re-rendered view as unknown rather than stale
+        except (StaleElementReferenceException, NoSuchElementException):
+            self.logger.debug("Stale element handle, finding again: %s", locator)
+            self._drop_element(locator)
+            return action(self.find_element(locator, timeout))
+    
+    def _cached_element(self, locator: Tuple[str, str]):
+        """Cached handle of a locator, None on a miss"""
+        if not self.USE_ELEMENT_CACHE:
+            return None
+        element = self._elements.get(self.driver, {}).get(tuple(locator))
+        BasePage.element_cache_stats['hits' if element is not None else 'misses'] += 1
+        return element
+    
+    def _cache_element(self, locator: Tuple[str, str], element):
+        """Remember a handle found for a locator"""
+        if self.USE_ELEMENT_CACHE:
+            self._elements.setdefault(self.driver, {})[tuple(locator)] = element
+    
+    def _drop_element(self, locator: Tuple[str, str]):
+        """Forget a stale handle"""
+        BasePage.element_cache_stats['stale'] += 1
+        self._elements.get(self.driver, {}).pop(tuple(locator), None)
+    
+    def _is_displayed_now(self, locator: Tuple[str, str]) -> bool:
+        """Check once whether a locator is displayed, from a fresh snapshot if enabled"""
+        if self.USE_SNAPSHOT and is_supported(locator):
+            return self.snapshot(max_age=0).is_displayed(locator)
+        return self._first_matching(locator, "visible") is not None
+    
+    def _check_wait_mixing(self, locator: Tuple[str, str]):
+        """Warn once per page class when an explicit wait runs on top of an implicit wait"""
+        implicit_wait = getattr(self.driver, 'implicit_wait_seconds', 0)
+        page = self.__class__.__name__
+        if implicit_wait and page not in BasePage._mixed_wait_warned:
+            BasePage._mixed_wait_warned.add(page)
+            self.logger.warning(
+                f"Explicit wait for {locator} runs with an implicit wait of {implicit_wait}s; "
+                f"absence checks can take the sum of both. Set IMPLICIT_WAIT=0 or use "
+                f"is_element_absent/wait_for_element_to_disappear"
+            )
+    
+    def _first_matching(self, locator: Tuple[str, str], condition: str, within=None):
+        """Return the first element of locator (under a component's root) satisfying condition, or None"""
+        try:
+            elements = within.find_elements(locator) if within is not None else self.driver.find_elements(*locator)
+            for element in elements:
+                if condition == "present":
+                    return element
+                if element.is_displayed() and (condition == "visible" or element.is_enabled()):
+                    return element
+        except WebDriverException:
+            pass
+        return None
+    
+    @contextmanager
+    def _implicit_wait_suspended(self):
+        """Temporarily set the implicit wait to zero, restoring it afterwards"""
+        previous = getattr(self.driver, 'implicit_wait_seconds', None)
+        if previous is None:
+            previous = self.driver.timeouts.implicit_wait
+        if previous:
+            self.driver.implicitly_wait(0)
+        try:
+            yield
+        finally:
+            if previous:
+                self.driver.implicitly_wait(previous)
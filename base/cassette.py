@@ -0,0 +1,336 @@
+"""
+Cassette Module
+Records WebDriver traffic of real sessions and replays it without a device or Appium server
+"""
+import os
+import re
+import json
+import gzip
+import time
+import threading
+from collections import deque
+from typing import Dict, Any, List, Optional, Tuple
+from appium.webdriver.appium_connection import AppiumConnection
+from base.driver_factory import PooledAppiumConnection
+from util.common_utils import CommonUtils
+from util.logger import Logger
+
+
+class Cassettes:
+    """
+    Per-test cassettes of WebDriver requests and responses
+    
+    In record mode every request a session sends is stored with its
+    response and duration under the test running at the time, and each
+    test's interactions are written to one gzipped JSON file. In replay
+    mode the connection answers from those files instead of the network.
+    Requests are matched by method, path (session ids normalized) and
+    body. Repeated requests are answered in recorded order, and the last
+    answer repeats once they run out, so polling loops that need more
+    rounds than recorded settle on the final screen. A request missing
+    from the test's cassette falls back to any other cassette in the
+    directory, so a test that reuses another test's session still replays.
+    Secrets such as passwords are stored and matched redacted.
+    """
+    
+    logger = Logger.get_logger(__name__)
+    
+    OFF = "off"
+    RECORD = "record"
+    REPLAY = "replay"
+    ALL = (OFF, RECORD, REPLAY)
+    
+    VERSION = 1
+    REDACTED = "<redacted>"
+    SESSION_PATTERN = re.compile(r"^/session/[^/]+")
+    
+    mode = OFF
+    directory = os.path.join(CommonUtils.get_project_root(), "tests", "cassettes")
+    speed = 0.0
+    
+    _lock = threading.Lock()
+    _test = "session"
+    _secrets = set()
+    _recorded: Dict[str, Dict[str, Any]] = {}
+    _queues: Dict[str, Dict[str, deque]] = {}
+    _fallback: Optional[Dict[str, Dict[str, Any]]] = None
+    _misses = 0
+    
+    @classmethod
+    def configure(cls, mode: str, directory: Optional[str] = None, speed: float = 0.0):
+        """
+        Set the cassette mode for this process
+        
+        Args:
+            mode: One of ALL
+            directory: Cassette directory, defaults to tests/cassettes
+            speed: Replay delay as a fraction of the recorded duration, 0 answers immediately
+            
+        Raises:
+            ValueError: If the mode is unknown
+        """
+        if mode not in cls.ALL:
+            raise ValueError(f"Unsupported cassette mode: {mode}")
+        cls.mode = mode
+        cls.directory = os.path.abspath(directory) if directory else cls.directory
+        cls.speed = speed
+    
+    @classmethod
+    def is_recording(cls) -> bool:
+        """Check if sessions are being recorded"""
+        return cls.mode == cls.RECORD
+    
+    @classmethod
+    def is_replaying(cls) -> bool:
+        """Check if sessions are served from cassettes"""
+        return cls.mode == cls.REPLAY
+    
+    @classmethod
+    def connection(cls, server_url: str) -> AppiumConnection:
+        """
+        Build the command executor for a new session
+        
+        Args:
+            server_url: Appium server URL
+            
+        Returns:
+            AppiumConnection: Recording or replaying connection
+        """
+        if cls.is_replaying():
+            return ReplayConnection(server_url)
+        return RecordingConnection(server_url)
+    
+    @classmethod
+    def begin_test(cls, test_id: str):
+        """
+        Attribute the following requests to a test
+        
+        Args:
+            test_id: Node id of the test
+        """
+        with cls._lock:
+            cls._test = test_id
+    
+    @classmethod
+    def add_secret(cls, value: str):
+        """
+        Never write a value to a cassette; it is matched as REDACTED
+        
+        Args:
+            value: Secret, e.g. a password typed into the app
+        """
+        if value:
+            cls._secrets.add(value)
+    
+    @classmethod
+    def set_meta(cls, key: str, value: Any):
+        """
+        Store a value with the current test's recording
+        
+        Args:
+            key: Metadata key
+            value: JSON serializable value
+        """
+        with cls._lock:
+            cls._recording(cls._test)['meta'][key] = value
+    
+    @classmethod
+    def get_meta(cls, test_id: str, key: str, default: Any = None) -> Any:
+        """
+        Read a value stored with a test's recording
+        
+        Args:
+            test_id: Node id of the test
+            key: Metadata key
+            default: Value when the cassette or key is missing
+            
+        Returns:
+            Any: Stored value
+        """
+        cassette = cls._read(cls.path_for(test_id))
+        return (cassette or {}).get('meta', {}).get(key, default)
+    
+    @classmethod
+    def record(cls, method: str, path: str, body: Optional[str], response: Dict[str, Any], duration: float):
+        """
+        Append an interaction to the current test's recording
+        
+        Args:
+            method: HTTP method
+            path: Request path relative to the server URL
+            body: JSON request body
+            response: Parsed response returned by the connection
+            duration: Round trip in seconds
+        """
+        with cls._lock:
+            cls._recording(cls._test)['interactions'].append({
+                'key': cls._key(method, path, body),
+                # Copied: selenium replaces element references in the response with WebElements
+                'response': cls._redact(json.loads(json.dumps(response))),
+                'duration': round(duration, 4),
+            })
+    
+    @classmethod
+    def respond(cls, method: str, path: str, body: Optional[str]) -> Optional[Tuple[Dict[str, Any], float]]:
+        """
+        Find the recorded answer to a request
+        
+        Args:
+            method: HTTP method
+            path: Request path relative to the server URL
+            body: JSON request body
+            
+        Returns:
+            tuple: Response and recorded duration, None if nothing matches
+        """
+        key = cls._key(method, path, body)
+        with cls._lock:
+            queue = cls._queue(cls._test, key)
+            if queue:
+                return queue.popleft() if len(queue) > 1 else queue[0]
+            fallback = cls._fallback_index().get(key)
+            if fallback is not None:
+                return fallback
+            cls._misses += 1
+        cls.logger.warning("No recorded response for %s in %s", key, cls._test)
+        return None
+    
+    @classmethod
+    def save(cls) -> List[str]:
+        """
+        Write the recordings of this process, one file per test
+        
+        Returns:
+            list: Written cassette paths
+        """
+        with cls._lock:
+            recorded, cls._recorded = cls._recorded, {}
+        paths = []
+        os.makedirs(cls.directory, exist_ok=True)
+        for test_id, cassette in recorded.items():
+            if not cassette['interactions']:
+                continue
+            path = cls.path_for(test_id)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with gzip.open(tmp_path, 'wt', encoding='utf-8') as file:
+                json.dump(cassette, file, separators=(',', ':'))
+            os.replace(tmp_path, path)
+            paths.append(path)
+        if paths:
+            cls.logger.info("Saved %d cassettes to %s", len(paths), cls.directory)
+        return paths
+    
+    @classmethod
+    def get_stats(cls) -> Dict[str, int]:
+        """
+        Get replay counters of this process
+        
+        Returns:
+            dict: Requests that matched no recording
+        """
+        with cls._lock:
+            return {'misses': cls._misses}
+    
+    @classmethod
+    def path_for(cls, test_id: str) -> str:
+        """Cassette file of a test"""
+        name = re.sub(r'[^\w.-]+', '_', test_id)
+        return os.path.join(cls.directory, f"{name}.json.gz")
+    
+    @classmethod
+    def _recording(cls, test_id: str) -> Dict[str, Any]:
+        """Recording of a test, created on first use; caller holds the lock"""
+        if test_id not in cls._recorded:
+            cls._recorded[test_id] = {'version': cls.VERSION, 'test': test_id, 'meta': {}, 'interactions': []}
+        return cls._recorded[test_id]
+    
+    @classmethod
+    def _queue(cls, test_id: str, key: str) -> Optional[deque]:
+        """Remaining recorded answers of a request in a test's cassette; caller holds the lock"""
+        if test_id not in cls._queues:
+            queues = {}
+            for interaction in (cls._read(cls.path_for(test_id)) or {}).get('interactions', []):
+                queues.setdefault(interaction['key'], deque()).append(
+                    (interaction['response'], interaction['duration'])
+                )
+            cls._queues[test_id] = queues
+        return cls._queues[test_id].get(key)
+    
+    @classmethod
+    def _fallback_index(cls) -> Dict[str, Tuple[Dict[str, Any], float]]:
+        """First recorded answer of every request across all cassettes; caller holds the lock"""
+        if cls._fallback is None:
+            cls._fallback = {}
+            names = sorted(os.listdir(cls.directory)) if os.path.isdir(cls.directory) else []
+            for name in names:
+                if not name.endswith('.json.gz'):
+                    continue
+                for interaction in (cls._read(os.path.join(cls.directory, name)) or {}).get('interactions', []):
+                    cls._fallback.setdefault(interaction['key'], (interaction['response'], interaction['duration']))
+        return cls._fallback
+    
+    @classmethod
+    def _read(cls, path: str) -> Optional[Dict[str, Any]]:
+        """Read a cassette file, None if missing or unreadable"""
+        try:
+            with gzip.open(path, 'rt', encoding='utf-8') as file:
+                cassette = json.load(file)
+        except (OSError, ValueError):
+            return None
+        if cassette.get('version') != cls.VERSION:
+            cls.logger.warning("Ignoring cassette with unsupported version: %s", path)
+            return None
+        return cassette
+    
+    @classmethod
+    def _key(cls, method: str, path: str, body: Optional[str]) -> str:
+        """Match key of a request: method, path with the session id normalized, canonical body"""
+        path = cls.SESSION_PATTERN.sub("/session/:id", path.split('?', 1)[0])
+        # Capabilities differ between devices and runs; there is one new-session request per session anyway
+        if path == "/session" or not body or method not in ("POST", "PUT"):
+            return f"{method} {path}"
+        try:
+            payload = cls._redact(json.loads(body))
+        except ValueError:
+            return f"{method} {path} {body}"
+        return f"{method} {path} {json.dumps(payload, sort_keys=True, separators=(',', ':'))}"
+    
+    @classmethod
+    def _redact(cls, value: Any) -> Any:
+        """Replace secrets, including ones typed as a list of characters"""
+        if not cls._secrets:
+            return value
+        if isinstance(value, str):
+            return cls.REDACTED if value in cls._secrets else value
+        if isinstance(value, list):
+            if value and all(isinstance(item, str) for item in value) and ''.join(value) in cls._secrets:
+                return [cls.REDACTED]
+            return [cls._redact(item) for item in value]
+        if isinstance(value, dict):
+            return {key: cls._redact(item) for key, item in value.items()}
+        return value
+
+
+class RecordingConnection(PooledAppiumConnection):
+    """Pooled Appium transport that records every request into the current test's cassette"""
+    
+    def _request(self, method, url, body=None):
+        start = time.perf_counter()
+        response = super()._request(method, url, body=body)
+        Cassettes.record(method, url[len(self._url):], body, response, time.perf_counter() - start)
+        return response
+
+
+class ReplayConnection(AppiumConnection):
+    """Appium transport answering from cassettes; nothing is sent over the network"""
+    
+    def _request(self, method, url, body=None):
+        answer = Cassettes.respond(method, url[len(self._url):], body)
+        if answer is None:
+            error = {'error': 'unknown command', 'message': f"No recorded response for {method} {url}",
+                     'stacktrace': ''}
+            return {'status': 404, 'value': json.dumps({'value': error})}
+        response, duration = answer
+        if Cassettes.speed:
+            time.sleep(duration * Cassettes.speed)
+        return json.loads(json.dumps(response))
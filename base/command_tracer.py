@@ -0,0 +1,310 @@
+"""
+Command Tracer Module
+Records every WebDriver command per test and exports Chrome trace-event timelines
+"""
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+from typing import Dict, Any, List, Optional
+import allure_commons
+from util.logger import Logger
+
+
+class _AllureStepListener:
+    """Tracks the currently open allure.step titles"""
+    
+    @allure_commons.hookimpl
+    def start_step(self, uuid, title, params):
+        CommandTracer.push_step(title)
+    
+    @allure_commons.hookimpl
+    def stop_step(self, uuid, exc_type, exc_val, exc_tb):
+        CommandTracer.pop_step()
+
+
+class CommandTracer:
+    """Per-process recorder of WebDriver command latency"""
+    
+    logger = Logger.get_logger(__name__)
+    
+    _lock = threading.Lock()
+    _origin = time.time() - time.perf_counter()
+    _test: Optional[str] = None
+    _events: List[Dict[str, Any]] = []
+    _steps: List[Dict[str, Any]] = []
+    _last_key = None
+    _retries = 0
+    _totals: Dict[str, Dict[str, Any]] = {}
+    _slowest: List[Dict[str, Any]] = []
+    _listener_registered = False
+    
+    SLOWEST_KEPT = 50
+    
+    @classmethod
+    def instrument(cls, driver):
+        """
+        Wrap a driver's command executor so every command is recorded
+        
+        Args:
+            driver: Appium driver instance
+            
+        Returns:
+            The same driver, instrumented
+        """
+        cls._register_step_listener()
+        executor = driver.command_executor
+        execute = executor.execute
+        
+        def traced_execute(command, params):
+            start = time.perf_counter()
+            error = None
+            response = None
+            try:
+                response = execute(command, params)
+                error = cls._response_error(response)
+                return response
+            except Exception as e:
+                error = type(e).__name__
+                raise
+            finally:
+                cls.record_command(command, params, start, time.perf_counter() - start, response, error)
+        
+        executor.execute = traced_execute
+        return driver
+    
+    @classmethod
+    def record_command(cls, command: str, params: Optional[Dict[str, Any]], start: float, duration: float,
+                       response: Optional[Dict[str, Any]] = None, error: Optional[str] = None):
+        """
+        Record one WebDriver command
+        
+        Args:
+            command: Selenium command name
+            params: Command parameters
+            start: time.perf_counter() when the command was sent
+            duration: Elapsed time in seconds
+            response: Decoded server response
+            error: W3C error code or exception name if the command failed
+        """
+        params = params or {}
+        locator = f"{params['using']}={params['value']}" if 'using' in params and 'value' in params else None
+        key = (command, locator)
+        with cls._lock:
+            cls._retries = cls._retries + 1 if key == cls._last_key else 0
+            cls._last_key = key
+            event = {
+                'name': command,
+                'cat': 'command',
+                'ts': cls._origin + start,
+                'dur': duration,
+                'args': {
+                    'locator': locator,
+                    'retries': cls._retries,
+                    'bytes': cls._response_size(response),
+                    'step': cls._steps[-1]['name'] if cls._steps else None,
+                    'test': cls._test,
+                    'error': error,
+                },
+            }
+            if cls._test is not None:
+                cls._events.append(event)
+            cls._aggregate(command, locator, duration, event)
+    
+    @classmethod
+    @contextmanager
+    def span(cls, name: str, category: str = "framework", **args):
+        """
+        Record a non-WebDriver phase such as session creation or an adb call
+        
+        Args:
+            name: Span name
+            category: Trace event category
+            args: Extra attributes stored on the event
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - start
+            with cls._lock:
+                if cls._test is not None:
+                    cls._events.append({
+                        'name': name, 'cat': category, 'ts': cls._origin + start, 'dur': duration,
+                        'args': dict(args, test=cls._test),
+                    })
+                cls._aggregate(name, None, duration, None)
+    
+    @classmethod
+    def push_step(cls, title: str):
+        """Mark the start of an allure step"""
+        with cls._lock:
+            cls._steps.append({'name': title, 'start': time.perf_counter()})
+    
+    @classmethod
+    def pop_step(cls):
+        """Mark the end of the innermost allure step"""
+        with cls._lock:
+            if not cls._steps:
+                return
+            step = cls._steps.pop()
+            if cls._test is not None:
+                cls._events.append({
+                    'name': step['name'], 'cat': 'step', 'ts': cls._origin + step['start'],
+                    'dur': time.perf_counter() - step['start'], 'args': {'test': cls._test},
+                })
+    
+    @classmethod
+    def begin_test(cls, test_id: str):
+        """
+        Start collecting events for a test
+        
+        Args:
+            test_id: Pytest node id
+        """
+        with cls._lock:
+            cls._test = test_id
+            cls._events = []
+            cls._steps = []
+            cls._last_key = None
+    
+    @classmethod
+    def end_test(cls) -> List[Dict[str, Any]]:
+        """
+        Stop collecting events for the current test
+        
+        Returns:
+            list: Events recorded since begin_test
+        """
+        with cls._lock:
+            events, cls._events = cls._events, []
+            cls._test = None
+            return events
+    
+    @classmethod
+    def write_timeline(cls, events: List[Dict[str, Any]], path: str) -> str:
+        """
+        Write events as a Chrome trace-event JSON file (chrome://tracing, Perfetto)
+        
+        Args:
+            events: Events from end_test
+            path: Output file path
+            
+        Returns:
+            str: Path of the written file
+        """
+        pid = os.getpid()
+        worker = os.getenv('PYTEST_XDIST_WORKER', 'master')
+        trace_events = [{'name': 'process_name', 'ph': 'M', 'pid': pid, 'args': {'name': worker}}]
+        for event in events:
+            trace_events.append({
+                'name': event['name'],
+                'cat': event['cat'],
+                'ph': 'X',
+                'ts': int(event['ts'] * 1_000_000),
+                'dur': int(event['dur'] * 1_000_000),
+                'pid': pid,
+                'tid': 1 if event['cat'] == 'step' else 2,
+                'args': event['args'],
+            })
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as file:
+            json.dump({'traceEvents': trace_events, 'displayTimeUnit': 'ms'}, file)
+        return path
+    
+    @classmethod
+    def get_summary(cls) -> Dict[str, Any]:
+        """
+        Get aggregated command statistics of this process
+        
+        Returns:
+            dict: 'totals' per command/locator and the 'slowest' single commands
+        """
+        with cls._lock:
+            return {'totals': dict(cls._totals), 'slowest': list(cls._slowest)}
+    
+    @staticmethod
+    def merge_summaries(summaries: List[Dict[str, Any]], top: int = 10) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Merge per-worker summaries and rank the top N entries
+        
+        Args:
+            summaries: Summaries from get_summary of each worker
+            top: Number of entries to keep
+            
+        Returns:
+            dict: 'commands' and 'locators' ranked by total time, 'slowest' single commands
+        """
+        totals: Dict[str, Dict[str, Any]] = {}
+        slowest: List[Dict[str, Any]] = []
+        for summary in summaries:
+            for key, stats in summary['totals'].items():
+                merged = totals.setdefault(key, dict(stats, count=0, total=0.0, max=0.0))
+                merged['count'] += stats['count']
+                merged['total'] += stats['total']
+                merged['max'] = max(merged['max'], stats['max'])
+            slowest.extend(summary['slowest'])
+        
+        ranked = sorted(totals.values(), key=lambda stats: -stats['total'])
+        return {
+            'commands': [stats for stats in ranked if stats['locator'] is None][:top],
+            'locators': [stats for stats in ranked if stats['locator'] is not None][:top],
+            'slowest': sorted(slowest, key=lambda event: -event['dur'])[:top],
+        }
+    
+    @classmethod
+    def _aggregate(cls, name: str, locator: Optional[str], duration: float, event: Optional[Dict[str, Any]]):
+        """Update run totals; caller holds the lock"""
+        key = f"{name} {locator}" if locator else name
+        stats = cls._totals.setdefault(key, {'command': name, 'locator': locator, 'count': 0, 'total': 0.0, 'max': 0.0})
+        stats['count'] += 1
+        stats['total'] += duration
+        stats['max'] = max(stats['max'], duration)
+        if event is not None:
+            if len(cls._slowest) < cls.SLOWEST_KEPT or duration > cls._slowest[-1]['dur']:
+                cls._slowest.append({'name': name, 'locator': locator, 'dur': duration,
+                                     'test': event['args']['test'], 'step': event['args']['step']})
+                cls._slowest.sort(key=lambda item: -item['dur'])
+                del cls._slowest[cls.SLOWEST_KEPT:]
+    
+    @staticmethod
+    def _response_error(response: Optional[Dict[str, Any]]) -> Optional[str]:
+        """Extract the W3C error code of a failed response"""
+        if not isinstance(response, dict):
+            return None
+        value = response.get('value')
+        # HTTP errors come back as {'status': code, 'value': raw body}
+        if isinstance(value, str) and isinstance(response.get('status'), int) and response['status'] >= 400:
+            try:
+                value = json.loads(value)
+            except ValueError:
+                return str(response['status'])
+        # Error bodies are wrapped once more as {'value': {'error': ...}}
+        if isinstance(value, dict) and isinstance(value.get('value'), dict):
+            value = value['value']
+        if isinstance(value, dict) and 'error' in value:
+            return value['error']
+        return None
+    
+    @staticmethod
+    def _response_size(response: Optional[Dict[str, Any]]) -> int:
+        """Approximate the payload size of a response in bytes"""
+        if not isinstance(response, dict):
+            return 0
+        value = response.get('value')
+        if value is None:
+            return 0
+        if isinstance(value, str):
+            return len(value)
+        try:
+            return len(json.dumps(value))
+        except (TypeError, ValueError):
+            return 0
+    
+    @classmethod
+    def _register_step_listener(cls):
+        """Listen to allure.step so commands can be attributed to steps"""
+        if not cls._listener_registered:
+            allure_commons.plugin_manager.register(_AllureStepListener())
+            cls._listener_registered = True
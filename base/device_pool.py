@@ -0,0 +1,209 @@
+"""
+Device Pool Module
+Hands each pytest-xdist worker an exclusive device and Appium ports
+"""
+import os
+import json
+import time
+from typing import Dict, Any, List, Optional
+from config.config_loader import ConfigLoader
+from util.adb_client import AdbClient
+from util.common_utils import CommonUtils
+from util.file_lock import FileLock
+from util.logger import Logger
+
+
+class DevicePool:
+    """Cross-process lease manager for the devices attached to this host"""
+    
+    logger = Logger.get_logger(__name__)
+    
+    def __init__(self, devices: Optional[List[Dict[str, Any]]] = None, settings: Optional[Dict[str, Any]] = None,
+                 state_dir: Optional[str] = None):
+        """
+        Initialize device pool
+        
+        Args:
+            devices: Device inventory, each entry with 'udid' and optional 'name'
+            settings: 'device_pool' section of config.yaml
+            state_dir: Directory holding the shared lease state
+        """
+        self.settings = settings if settings is not None else self.load_settings()
+        self.devices = devices if devices is not None else self.load_inventory(self.settings)
+        self.state_dir = state_dir or os.path.join(CommonUtils.get_project_root(), ".framework_cache")
+        self.state_file = os.path.join(self.state_dir, "device_pool.json")
+        self.lock = FileLock(os.path.join(self.state_dir, "device_pool.lock"))
+        self.run_id = Logger.get_run_id()
+        self.owner = os.getenv('PYTEST_XDIST_WORKER', 'master')
+    
+    @staticmethod
+    def load_settings() -> Dict[str, Any]:
+        """
+        Read the device pool section from config.yaml
+        
+        Returns:
+            dict: Device pool settings
+        """
+        return ConfigLoader.section('device_pool')
+    
+    @staticmethod
+    def is_enabled() -> bool:
+        """
+        Check whether devices should be leased from the pool
+        
+        Returns:
+            bool: True if enabled via DEVICE_POOL or config.yaml
+        """
+        return ConfigLoader.get_bool('device_pool.enabled', False, env='DEVICE_POOL')
+    
+    @classmethod
+    def load_inventory(cls, settings: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Build the device inventory from config.yaml, falling back to adb
+        
+        Args:
+            settings: Device pool settings
+            
+        Returns:
+            list: Devices with 'udid' and 'name'
+        """
+        devices = [
+            {'udid': d['udid'], 'name': d.get('name', d['udid'])}
+            for d in settings.get('devices') or []
+        ]
+        if devices:
+            return devices
+        return [{'udid': udid, 'name': udid} for udid in cls.list_adb_devices()]
+    
+    @classmethod
+    def list_adb_devices(cls) -> List[str]:
+        """
+        List serials of devices in 'device' state reported by adb
+        
+        Returns:
+            list: Device serials
+        """
+        try:
+            return AdbClient().ready_serials()
+        except Exception as e:
+            cls.logger.warning(f"Could not list adb devices: {str(e)}")
+            return []
+    
+    def lease(self) -> Dict[str, Any]:
+        """
+        Lease a free device for this worker, waiting until one is available
+        
+        Returns:
+            dict: Lease with 'udid', 'name', 'system_port' and 'mjpeg_server_port'
+            
+        Raises:
+            RuntimeError: If the pool has no usable devices
+            TimeoutError: If no device became free within lease_timeout
+        """
+        if not self.devices:
+            raise RuntimeError("Device pool is empty. Configure device_pool.devices or connect a device.")
+        
+        deadline = time.monotonic() + float(self.settings.get('lease_timeout', 600))
+        while True:
+            with self.lock:
+                state = self._read_state()
+                lease = self._pick_device(state)
+                if lease is not None:
+                    state['leases'][lease['udid']] = {'owner': self.owner, 'pid': os.getpid()}
+                    state['last_owner'][self.owner] = lease['udid']
+                    self._write_state(state)
+                    self.logger.info(f"Worker {self.owner} leased device {lease['udid']} "
+                                     f"(systemPort {lease['system_port']}, mjpegServerPort {lease['mjpeg_server_port']})")
+                    return lease
+                if all(d['udid'] in state['quarantined'] for d in self.devices):
+                    raise RuntimeError("All devices in the pool are quarantined")
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"No free device for worker {self.owner}")
+            time.sleep(1)
+    
+    def release(self, udid: str, failed: bool = False):
+        """
+        Return a device to the pool
+        
+        Args:
+            udid: Device udid
+            failed: True if the device failed, counting towards quarantine
+        """
+        with self.lock:
+            state = self._read_state()
+            state['leases'].pop(udid, None)
+            if failed:
+                failures = state['failures'].get(udid, 0) + 1
+                state['failures'][udid] = failures
+                if failures >= int(self.settings.get('max_failures', 2)):
+                    state['quarantined'][udid] = f"{failures} failures"
+                    self.logger.error(f"Device {udid} quarantined after {failures} failures")
+            self._write_state(state)
+        self.logger.info(f"Worker {self.owner} released device {udid}")
+    
+    def quarantine(self, udid: str, reason: str):
+        """
+        Take a device out of the pool for the rest of the run
+        
+        Args:
+            udid: Device udid
+            reason: Why the device was quarantined
+        """
+        with self.lock:
+            state = self._read_state()
+            state['leases'].pop(udid, None)
+            state['quarantined'][udid] = reason
+            self._write_state(state)
+        self.logger.error(f"Device {udid} quarantined: {reason}")
+    
+    def _pick_device(self, state: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Pick a free device, preferring the one this worker used last"""
+        free = [
+            (slot, device) for slot, device in enumerate(self.devices)
+            if device['udid'] not in state['leases'] and device['udid'] not in state['quarantined']
+        ]
+        if not free:
+            return None
+        previous = state['last_owner'].get(self.owner)
+        slot, device = next(((s, d) for s, d in free if d['udid'] == previous), free[0])
+        return {
+            'udid': device['udid'],
+            'name': device['name'],
+            'system_port': int(self.settings.get('system_port_base', 8200)) + slot,
+            'mjpeg_server_port': int(self.settings.get('mjpeg_server_port_base', 9200)) + slot,
+        }
+    
+    def _read_state(self) -> Dict[str, Any]:
+        """Read lease state, discarding state from other runs and dead workers"""
+        state = None
+        if os.path.exists(self.state_file):
+            try:
+                with open(self.state_file, 'r') as file:
+                    state = json.load(file)
+            except ValueError:
+                self.logger.warning("Corrupt device pool state, starting fresh")
+        if not state or state.get('run_id') != self.run_id:
+            state = {'run_id': self.run_id, 'leases': {}, 'failures': {}, 'quarantined': {}, 'last_owner': {}}
+        state['leases'] = {
+            udid: lease for udid, lease in state['leases'].items() if self._is_process_alive(lease['pid'])
+        }
+        return state
+    
+    def _write_state(self, state: Dict[str, Any]):
+        """Atomically write lease state"""
+        os.makedirs(self.state_dir, exist_ok=True)
+        tmp_file = f"{self.state_file}.{os.getpid()}.tmp"
+        with open(tmp_file, 'w') as file:
+            json.dump(state, file, indent=4)
+        os.replace(tmp_file, self.state_file)
+    
+    @staticmethod
+    def _is_process_alive(pid: int) -> bool:
+        """Check whether the process holding a lease still exists"""
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            return True
+        return True
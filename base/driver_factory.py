@@ -5,15 +5,218 @@ Handles Appium driver initialization and configuration
 from appium import webdriver
 from appium.options.android import UiAutomator2Options
 from appium.options.ios import XCUITestOptions
-from typing import Optional
+from appium.webdriver.appium_connection import AppiumConnection
+from typing import Optional, List, Dict, Any
 import os
+import json
+import time
+import threading
+import urllib3
+from base.adaptive_wait import AdaptiveWaitStore
+from base.appium_server import AppiumServerManager
+from base.base_page import BasePage
+from base.command_tracer import CommandTracer
+from base.device_pool import DevicePool
+from config.config_loader import ConfigLoader
+from util.common_utils import CommonUtils
+from util.file_lock import FileLock
 from util.logger import Logger
 
 
+class SessionResetStrategy:
+    """Strategies used to bring a reused session back to a clean app state"""
+    
+    NONE = "none"
+    TERMINATE_ACTIVATE = "terminate_activate"
+    CLEAR_APP_DATA = "clear_app_data"
+    DEEP_LINK = "deep_link"
+    
+    ALL = (NONE, TERMINATE_ACTIVATE, CLEAR_APP_DATA, DEEP_LINK)
+
+
+class PooledAppiumConnection(AppiumConnection):
+    """
+    Keep-alive Appium transport with an explicitly sized connection pool
+    
+    Selenium's default pool keeps a single idle connection per host and has
+    no timeouts, so any overlap (screenshots from a helper thread, status
+    probes) opens and drops extra sockets. This transport sizes the pool,
+    reuses connections for every command, bounds connect/read time and can
+    ask for gzip responses (useful for page_source and screenshots on
+    remote grids). Connections opened vs reused are counted per process.
+    """
+    
+    _stats_lock = threading.Lock()
+    stats = {"opened": 0, "requests": 0}
+    
+    def __init__(self, remote_server_addr: str, settings: Optional[Dict[str, Any]] = None):
+        """
+        Initialize pooled connection
+        
+        Args:
+            remote_server_addr: Appium server URL
+            settings: Transport settings, defaults to load_settings()
+        """
+        settings = settings if settings is not None else self.load_settings()
+        self.compression = bool(settings.get('compression', False))
+        init_args = {
+            'num_pools': int(settings.get('num_pools', 4)),
+            'maxsize': int(settings.get('pool_maxsize', 4)),
+            'block': bool(settings.get('pool_block', False)),
+            'timeout': urllib3.Timeout(
+                connect=float(settings.get('connect_timeout', 10)),
+                read=float(settings.get('read_timeout', 300)),
+            ),
+        }
+        super().__init__(remote_server_addr, keep_alive=True, init_args_for_pool_manager=init_args)
+    
+    @staticmethod
+    def load_settings() -> Dict[str, Any]:
+        """
+        Read the transport section from config.yaml
+        
+        Returns:
+            dict: Transport settings
+        """
+        return ConfigLoader.section('transport')
+    
+    @staticmethod
+    def is_enabled() -> bool:
+        """
+        Check whether the pooled transport should be used
+        
+        Returns:
+            bool: True if enabled via POOLED_TRANSPORT or config.yaml
+        """
+        return ConfigLoader.get_bool('transport.enabled', False, env='POOLED_TRANSPORT')
+    
+    @classmethod
+    def get_stats(cls) -> Dict[str, int]:
+        """
+        Get connection counters of this process
+        
+        Returns:
+            dict: Connections opened, requests sent and requests on a reused connection
+        """
+        with cls._stats_lock:
+            return {**cls.stats, "reused": max(cls.stats["requests"] - cls.stats["opened"], 0)}
+    
+    @classmethod
+    def _count(cls, key: str):
+        with cls._stats_lock:
+            cls.stats[key] += 1
+    
+    def _get_connection_manager(self):
+        manager = super()._get_connection_manager()
+        manager.pool_classes_by_scheme = {
+            'http': _CountingHTTPConnectionPool,
+            'https': _CountingHTTPSConnectionPool,
+        }
+        return manager
+    
+    def get_remote_connection_headers(self, parsed_url, keep_alive: bool = True) -> Dict[str, Any]:
+        headers = super().get_remote_connection_headers(parsed_url, keep_alive=keep_alive)
+        if self.compression:
+            headers['Accept-Encoding'] = 'gzip'
+        return headers
+    
+    def _request(self, method, url, body=None):
+        self._count("requests")
+        return super()._request(method, url, body=body)
+
+
+class _CountingHTTPConnectionPool(urllib3.HTTPConnectionPool):
+    """HTTP pool that counts newly opened connections"""
+    
+    def _new_conn(self):
+        PooledAppiumConnection._count("opened")
+        return super()._new_conn()
+
+
+class _CountingHTTPSConnectionPool(urllib3.HTTPSConnectionPool):
+    """HTTPS pool that counts newly opened connections"""
+    
+    def _new_conn(self):
+        PooledAppiumConnection._count("opened")
+        return super()._new_conn()
+
+
+class WarmDevices:
+    """
+    Devices that already had a session created on them during this run
+    
+    The first session installs the UiAutomator2/WDA server and the settings
+    helper, so later sessions on the same device can skip those steps.
+    Shared by xdist workers through a JSON file under a file lock.
+    """
+    
+    state_dir = os.path.join(CommonUtils.get_project_root(), ".framework_cache")
+    state_file = os.path.join(state_dir, "warm_devices.json")
+    lock = FileLock(os.path.join(state_dir, "warm_devices.lock"))
+    
+    @classmethod
+    def is_warm(cls, device_id: str) -> bool:
+        """
+        Check whether a session was created on a device during this run
+        
+        Args:
+            device_id: Device udid or name
+            
+        Returns:
+            bool: True if warm
+        """
+        if not device_id:
+            return False
+        with cls.lock:
+            return device_id in cls._read()
+    
+    @classmethod
+    def mark(cls, device_id: str):
+        """Record a successful session on a device"""
+        cls._update(device_id, True)
+    
+    @classmethod
+    def forget(cls, device_id: str):
+        """Drop a device whose warm start failed"""
+        cls._update(device_id, False)
+    
+    @classmethod
+    def _update(cls, device_id: str, warm: bool):
+        if not device_id:
+            return
+        with cls.lock:
+            devices = cls._read()
+            if warm == (device_id in devices):
+                return
+            devices = devices | {device_id} if warm else devices - {device_id}
+            os.makedirs(cls.state_dir, exist_ok=True)
+            tmp_file = f"{cls.state_file}.{os.getpid()}.tmp"
+            with open(tmp_file, 'w') as file:
+                json.dump({'run_id': Logger.get_run_id(), 'devices': sorted(devices)}, file)
+            os.replace(tmp_file, cls.state_file)
+    
+    @classmethod
+    def _read(cls) -> set:
+        """Warm devices of this run; state from earlier runs is ignored"""
+        try:
+            with open(cls.state_file, 'r') as file:
+                state = json.load(file)
+        except (OSError, ValueError):
+            return set()
+        return set(state.get('devices', [])) if state.get('run_id') == Logger.get_run_id() else set()
+
+
 class DriverFactory:
     """Factory class to create and manage Appium driver instances"""
     
     _driver: Optional[webdriver.Remote] = None
+    _platform: Optional[str] = None
+    _app_id: str = ""
+    _device_id: str = ""
+    _device_pool: Optional[DevicePool] = None
+    _lease: Optional[Dict[str, Any]] = None
+    _session_phases: Optional[Dict[str, Any]] = None
+    session_timings: List[Dict[str, Any]] = []
     logger = Logger.get_logger(__name__)
     
     @classmethod
@@ -29,57 +232,400 @@ class DriverFactory:
         """
         if cls._driver is None:
             cls._driver = cls._create_driver(platform)
+            cls._platform = platform.lower()
         return cls._driver
     
+    @classmethod
+    def get_app_id(cls) -> str:
+        """Get the package/bundle id of the app under test in the current session"""
+        return cls._app_id
+    
+    @classmethod
+    def get_device_id(cls) -> str:
+        """Get the udid (or configured device name) of the current session's device"""
+        return cls._device_id
+    
+    @classmethod
+    def is_session_reuse_enabled(cls) -> bool:
+        """
+        Check whether one session should be kept alive across tests
+        
+        Returns:
+            bool: True if SESSION_REUSE is enabled
+        """
+        return ConfigLoader.get_bool('session.reuse', False, env='SESSION_REUSE')
+    
+    @classmethod
+    def get_reset_strategy(cls) -> str:
+        """
+        Get the app state reset strategy used between tests
+        
+        Returns:
+            str: One of SessionResetStrategy.ALL
+        """
+        strategy = ConfigLoader.get_str(
+            'session.reset_strategy', SessionResetStrategy.TERMINATE_ACTIVATE, env='SESSION_RESET_STRATEGY'
+        ).lower()
+        if strategy not in SessionResetStrategy.ALL:
+            raise ValueError(f"Unsupported session reset strategy: {strategy}")
+        return strategy
+    
+    @classmethod
+    def acquire_driver(cls, platform: str = "android", test_name: str = "") -> webdriver.Remote:
+        """
+        Get a driver ready for the next test
+        
+        With session reuse enabled, a healthy existing session is reset
+        with the configured strategy instead of being recreated. A fresh
+        session is only created when none exists, the existing one is
+        unhealthy or the reset fails.
+        
+        Args:
+            platform: Mobile platform - 'android' or 'ios'
+            test_name: Name of the test the driver is acquired for
+            
+        Returns:
+            webdriver.Remote: Appium driver instance
+        """
+        if cls._driver is not None and cls.is_session_reuse_enabled():
+            start = time.perf_counter()
+            with CommandTracer.span("session reset", strategy=cls.get_reset_strategy()):
+                reset = cls._is_session_healthy() and cls._reset_app_state(cls.get_reset_strategy())
+            if reset:
+                cls._record_timing(test_name, "reset", time.perf_counter() - start)
+                return cls._driver
+            cls.logger.warning("Reused session is unhealthy, creating a fresh session")
+            cls._discard_driver()
+        
+        start = time.perf_counter()
+        with CommandTracer.span("session create", platform=platform):
+            driver = cls.get_driver(platform)
+        cls._record_timing(test_name, "create", time.perf_counter() - start, cls._session_phases)
+        cls._session_phases = None
+        return driver
+    
+    @classmethod
+    def release_driver(cls):
+        """Release the driver after a test, keeping it alive when sessions are reused"""
+        if not cls.is_session_reuse_enabled():
+            cls.quit_driver()
+    
     @classmethod
     def _create_driver(cls, platform: str) -> webdriver.Remote:
         """
         Create new Appium driver instance
         
+        Capabilities come from the active capability profile. Its warm
+        capabilities (skipping server installation and device setup) are
+        only added once a session has been created on the device during
+        this run, and the session is retried without them if they fail.
+        
         Args:
             platform: Mobile platform - 'android' or 'ios'
             
         Returns:
             webdriver.Remote: New Appium driver instance
         """
-        appium_server_url = os.getenv('APPIUM_SERVER_URL', 'http://localhost:4723')
+        from base.cassette import Cassettes
+        phases = {}
+        start = time.perf_counter()
+        platform = platform.lower()
+        if platform not in ("android", "ios"):
+            raise ValueError(f"Unsupported platform: {platform}")
+        appium_server_url = AppiumServerManager.url_for_worker() or \
+            ConfigLoader.get_str('appium.server_url', 'http://localhost:4723', env='APPIUM_SERVER_URL')
+        settings = ConfigLoader.capability_profile(platform)
+        capabilities = ConfigLoader.to_capabilities(settings)
+        cls._app_id = settings.get('app_package' if platform == "android" else 'bundle_id') or ""
+        phases['config'] = time.perf_counter() - start
         
-        cls.logger.info(f"Initializing {platform} driver...")
+        cls.logger.info("Initializing %s driver with capability profile '%s'...", platform, settings['profile'])
+        device_id = settings.get('udid') or settings.get('device_name', '')
+        if platform == "android" and DevicePool.is_enabled() and not Cassettes.is_replaying():
+            start = time.perf_counter()
+            lease = cls._lease_device()
+            capabilities.update({
+                'appium:udid': lease['udid'],
+                'appium:deviceName': lease['name'],
+                'appium:systemPort': lease['system_port'],
+                'appium:mjpegServerPort': lease['mjpeg_server_port'],
+            })
+            device_id = lease['udid']
+            phases['device_lease'] = time.perf_counter() - start
         
-        if platform.lower() == "android":
-            options = UiAutomator2Options()
-            options.platform_name = "Android"
-            options.device_name = os.getenv('ANDROID_DEVICE_NAME', 'emulator-5554')
-            options.automation_name = "UiAutomator2"
-            options.app = os.getenv('ANDROID_APP_PATH', '')
-            options.app_package = os.getenv('APP_PACKAGE', '')
-            options.app_activity = os.getenv('APP_ACTIVITY', '')
-            options.no_reset = False
-            
-        elif platform.lower() == "ios":
-            options = XCUITestOptions()
-            options.platform_name = "iOS"
-            options.device_name = os.getenv('IOS_DEVICE_NAME', 'iPhone 14')
-            options.automation_name = "XCUITest"
-            options.app = os.getenv('IOS_APP_PATH', '')
-            options.bundle_id = os.getenv('BUNDLE_ID', '')
-            options.no_reset = False
-        else:
-            raise ValueError(f"Unsupported platform: {platform}")
+        warm_capabilities = ConfigLoader.to_capabilities(settings['warm_capabilities'])
+        warm = bool(warm_capabilities) and WarmDevices.is_warm(device_id)
+        
+        cls.logger.info("Connecting to Appium server at %s", appium_server_url)
+        start = time.perf_counter()
+        try:
+            try:
+                driver = cls._new_session(platform, appium_server_url,
+                                          {**capabilities, **warm_capabilities} if warm else capabilities)
+            except Exception as e:
+                if not warm:
+                    raise
+                cls.logger.warning("Session with warm capabilities failed, retrying a full start: %s", e)
+                WarmDevices.forget(device_id)
+                warm = False
+                driver = cls._new_session(platform, appium_server_url, capabilities)
+        except Exception:
+            cls._release_device(failed=True)
+            raise
+        phases['new_session'] = time.perf_counter() - start
+        phases.update(cls._server_phases(driver))
+        WarmDevices.mark(device_id)
+        cls._device_id = driver.capabilities.get('deviceUDID') or device_id
+        # Replayed sessions answer instantly; their timings say nothing about the device
+        AdaptiveWaitStore.set_scope(None if Cassettes.is_replaying() else appium_server_url, cls._device_id)
         
-        cls.logger.info(f"Connecting to Appium server at {appium_server_url}")
-        driver = webdriver.Remote(appium_server_url, options=options)
-        driver.implicitly_wait(10)
+        start = time.perf_counter()
+        CommandTracer.instrument(driver)
+        cls._track_implicit_wait(driver)
+        driver.implicitly_wait(ConfigLoader.get_float('test.implicit_wait', 10, env='IMPLICIT_WAIT'))
+        phases['post_init'] = time.perf_counter() - start
         
-        cls.logger.info(f"{platform} driver initialized successfully")
+        cls._session_phases = {'profile': settings['profile'], 'warm': warm, 'phases': phases}
+        cls.logger.info(
+            "%s driver initialized (%s%s): %s", platform, settings['profile'], ", warm" if warm else "",
+            ", ".join(f"{name} {seconds:.2f}s" for name, seconds in phases.items())
+        )
         return driver
     
+    @staticmethod
+    def _new_session(platform: str, server_url: str, capabilities: Dict[str, Any]) -> webdriver.Remote:
+        """
+        Start an Appium session
+        
+        Args:
+            platform: 'android' or 'ios'
+            server_url: Appium server URL
+            capabilities: W3C capabilities
+            
+        Returns:
+            webdriver.Remote: New driver
+        """
+        options = UiAutomator2Options() if platform == "android" else XCUITestOptions()
+        options.load_capabilities(capabilities)
+        from base.cassette import Cassettes
+        command_executor = server_url
+        if Cassettes.mode != Cassettes.OFF:
+            command_executor = Cassettes.connection(server_url)
+        elif PooledAppiumConnection.is_enabled():
+            command_executor = PooledAppiumConnection(server_url)
+        return webdriver.Remote(command_executor, options=options)
+    
+    @staticmethod
+    def _server_phases(driver: webdriver.Remote) -> Dict[str, float]:
+        """
+        Split the server side of session creation using Appium's event timings
+        
+        Needs the eventTimings capability; each event is timed from the one before it.
+        
+        Args:
+            driver: Newly created driver
+            
+        Returns:
+            dict: 'server:<event>' to seconds, empty without event timings
+        """
+        events = (driver.capabilities or {}).get('events') or {}
+        timeline = sorted(
+            (timestamps[0], name) for name, timestamps in events.items()
+            if isinstance(timestamps, list) and timestamps and isinstance(timestamps[0], (int, float))
+        )
+        phases = {}
+        for (previous, _), (timestamp, name) in zip(timeline, timeline[1:]):
+            phases[f"server:{name}"] = (timestamp - previous) / 1000.0
+        return phases
+    
+    @staticmethod
+    def _track_implicit_wait(driver: webdriver.Remote):
+        """
+        Remember the implicit wait on the driver whenever it is changed
+        
+        BasePage reads driver.implicit_wait_seconds to suspend the implicit
+        wait for polling loops without an extra GET /timeouts round trip.
+        
+        Args:
+            driver: Newly created driver
+        """
+        set_implicit_wait = driver.implicitly_wait
+        
+        def implicitly_wait(time_to_wait: float):
+            set_implicit_wait(time_to_wait)
+            driver.implicit_wait_seconds = time_to_wait
+        
+        driver.implicit_wait_seconds = 0
+        driver.implicitly_wait = implicitly_wait
+    
+    @classmethod
+    def _is_session_healthy(cls) -> bool:
+        """
+        Check that the current session still responds
+        
+        Returns:
+            bool: True if the session answered a device round trip
+        """
+        try:
+            if cls._app_id:
+                cls._driver.query_app_state(cls._app_id)
+            else:
+                cls._driver.get_window_size()
+            return True
+        except Exception as e:
+            cls.logger.warning(f"Session health check failed: {str(e)}")
+            return False
+    
     @classmethod
-    def quit_driver(cls):
-        """Quit and cleanup driver instance"""
+    def _reset_app_state(cls, strategy: str) -> bool:
+        """
+        Reset the app under test inside the current session
+        
+        Args:
+            strategy: One of SessionResetStrategy.ALL
+            
+        Returns:
+            bool: True if the app was reset, False if a new session is needed
+        """
+        # Handles and snapshots from the previous test must not outlive the reset
+        BasePage.forget(cls._driver)
+        if strategy == SessionResetStrategy.NONE:
+            return True
+        if not cls._app_id:
+            cls.logger.warning("No app package/bundle id configured, cannot reset app state")
+            return False
+        
+        cls.logger.info(f"Resetting app state with strategy: {strategy}")
+        try:
+            if strategy == SessionResetStrategy.TERMINATE_ACTIVATE:
+                cls._driver.terminate_app(cls._app_id)
+                cls._driver.activate_app(cls._app_id)
+            
+            elif strategy == SessionResetStrategy.CLEAR_APP_DATA:
+                if cls._platform == "android":
+                    cls._driver.execute_script("mobile: clearApp", {"appId": cls._app_id})
+                else:
+                    cls.logger.warning("Clearing app data is Android only, terminating app instead")
+                    cls._driver.terminate_app(cls._app_id)
+                cls._driver.activate_app(cls._app_id)
+            
+            elif strategy == SessionResetStrategy.DEEP_LINK:
+                home_url = ConfigLoader.get_str('session.home_deep_link', '', env='HOME_DEEP_LINK')
+                if not home_url:
+                    cls.logger.warning("HOME_DEEP_LINK is not set, cannot reset via deep link")
+                    return False
+                app_key = "package" if cls._platform == "android" else "bundleId"
+                cls._driver.execute_script("mobile: deepLink", {"url": home_url, app_key: cls._app_id})
+            return True
+        except Exception as e:
+            cls.logger.warning(f"App state reset failed: {str(e)}")
+            return False
+    
+    @classmethod
+    def _record_timing(cls, test_name: str, action: str, duration: float,
+                       details: Optional[Dict[str, Any]] = None):
+        """
+        Record how long it took to get a driver ready for a test
+        
+        Args:
+            test_name: Name of the test
+            action: 'create' for a new session, 'reset' for a reused one
+            duration: Elapsed time in seconds
+            details: Capability profile, warm flag and phase durations of a created session
+        """
+        cls.session_timings.append({"test": test_name, "action": action, "duration": duration, **(details or {})})
+        cls.logger.info(f"Session {action} for {test_name or 'test'} took {duration:.2f}s")
+    
+    @classmethod
+    def get_session_timing_summary(cls) -> Dict[str, Any]:
+        """
+        Summarize session create vs reset timings recorded so far
+        
+        Returns:
+            dict: Counts, averages, the estimated time saved by resets and
+                per-profile average create phases
+        """
+        creates = [t["duration"] for t in cls.session_timings if t["action"] == "create"]
+        resets = [t["duration"] for t in cls.session_timings if t["action"] == "reset"]
+        avg_create = sum(creates) / len(creates) if creates else 0.0
+        avg_reset = sum(resets) / len(resets) if resets else 0.0
+        
+        profiles = {}
+        for timing in cls.session_timings:
+            if timing["action"] != "create" or "profile" not in timing:
+                continue
+            key = f"{timing['profile']} (warm)" if timing.get("warm") else timing["profile"]
+            profile = profiles.setdefault(key, {"creates": 0, "total": 0.0, "phases": {}})
+            profile["creates"] += 1
+            profile["total"] += timing["duration"]
+            for name, seconds in timing.get("phases", {}).items():
+                profile["phases"][name] = profile["phases"].get(name, 0.0) + seconds
+        for profile in profiles.values():
+            profile["avg_create"] = profile.pop("total") / profile["creates"]
+            profile["phases"] = {name: total / profile["creates"] for name, total in profile["phases"].items()}
+        
+        return {
+            "creates": len(creates),
+            "resets": len(resets),
+            "avg_create": avg_create,
+            "avg_reset": avg_reset,
+            "estimated_saved": max(avg_create - avg_reset, 0.0) * len(resets),
+            "profiles": profiles,
+        }
+    
+    @classmethod
+    def _lease_device(cls) -> Dict[str, Any]:
+        """
+        Lease an exclusive device and ports for this worker
+        
+        Returns:
+            dict: Device lease from the pool
+        """
+        if cls._device_pool is None:
+            cls._device_pool = DevicePool()
+        if cls._lease is None:
+            cls._lease = cls._device_pool.lease()
+        return cls._lease
+    
+    @classmethod
+    def _release_device(cls, failed: bool = False):
+        """
+        Return the leased device to the pool
+        
+        Args:
+            failed: True if the device failed and should count towards quarantine
+        """
+        if cls._lease is not None:
+            cls._device_pool.release(cls._lease['udid'], failed=failed)
+            cls._lease = None
+    
+    @classmethod
+    def _discard_driver(cls):
+        """Drop the current driver, ignoring errors from a dead session"""
+        try:
+            cls.quit_driver(device_failed=True)
+        except Exception as e:
+            cls.logger.debug(f"Ignoring error while quitting stale session: {str(e)}")
+            cls._driver = None
+            cls._release_device(failed=True)
+    
+    @classmethod
+    def quit_driver(cls, device_failed: bool = False):
+        """
+        Quit and cleanup driver instance
+        
+        Args:
+            device_failed: True if the leased device should count a failure
+        """
         if cls._driver is not None:
             cls.logger.info("Quitting driver...")
             cls._driver.quit()
             cls._driver = None
             cls.logger.info("Driver quit successfully")
-
+            if PooledAppiumConnection.is_enabled():
+                stats = PooledAppiumConnection.get_stats()
+                cls.logger.info(
+                    f"HTTP transport: {stats['requests']} requests, "
+                    f"{stats['opened']} connections opened, {stats['reused']} reused"
+                )
+        cls._release_device(failed=device_failed)
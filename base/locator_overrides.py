@@ -0,0 +1,129 @@
+"""
+Locator Overrides Module
+Swaps page object locators for cheaper equivalents found by the locator profiler
+"""
+import os
+import json
+import threading
+from typing import Tuple, Dict, Any, Optional
+from config.config_loader import ConfigLoader
+from util.common_utils import CommonUtils
+from util.logger import Logger
+
+
+class LocatorOverrides:
+    """
+    Replacement locators keyed by 'PageClass.ATTRIBUTE', applied when page classes are defined
+    
+    Each entry stores the original locator next to its replacement. An
+    entry is only applied while the page class still declares that
+    original, so editing a locator in the source retires its override
+    instead of silently replacing the new value.
+    """
+    
+    logger = Logger.get_logger(__name__)
+    
+    DEFAULT_FILE = os.path.join("config", "locator_overrides.json")
+    
+    _lock = threading.Lock()
+    _overrides: Optional[Dict[str, Dict[str, Any]]] = None
+    # 'PageClass.ATTRIBUTE' -> (original, replacement) of overrides applied in this process
+    applied: Dict[str, Tuple[Tuple[str, str], Tuple[str, str]]] = {}
+    
+    @staticmethod
+    def is_enabled() -> bool:
+        """Check if overrides are applied (LOCATOR_OVERRIDES overrides locator_overrides.enabled)"""
+        return ConfigLoader.get_bool('locator_overrides.enabled', True, env='LOCATOR_OVERRIDES')
+    
+    @classmethod
+    def path(cls) -> str:
+        """Overrides file (LOCATOR_OVERRIDES_FILE overrides locator_overrides.file)"""
+        path = ConfigLoader.get_str('locator_overrides.file', cls.DEFAULT_FILE, env='LOCATOR_OVERRIDES_FILE')
+        return path if os.path.isabs(path) else os.path.join(CommonUtils.get_project_root(), path)
+    
+    @classmethod
+    def load(cls) -> Dict[str, Dict[str, Any]]:
+        """
+        Get the overrides, reading the file on first use
+        
+        Returns:
+            dict: Entries with 'original' and 'replacement' locators
+        """
+        if cls._overrides is None:
+            with cls._lock:
+                if cls._overrides is None:
+                    cls._overrides = cls._read_file()
+        return cls._overrides
+    
+    @classmethod
+    def apply(cls, page_class: type):
+        """
+        Replace the locators a page class declares itself
+        
+        Args:
+            page_class: BasePage subclass
+        """
+        if not cls.is_enabled():
+            return
+        overrides = cls.load()
+        if not overrides:
+            return
+        for name, value in list(vars(page_class).items()):
+            key = f"{page_class.__name__}.{name}"
+            entry = overrides.get(key)
+            if entry is None or not isinstance(value, tuple):
+                continue
+            original, replacement = tuple(entry['original']), tuple(entry['replacement'])
+            if value != original:
+                cls.logger.warning("Ignoring locator override of %s, the page now declares %s", key, value)
+                continue
+            setattr(page_class, name, replacement)
+            cls.applied[key] = (original, replacement)
+            cls.logger.debug("Locator %s overridden with %s", key, replacement)
+    
+    @classmethod
+    def original(cls, key: str, locator: Tuple[str, str]) -> Tuple[str, str]:
+        """
+        Get the locator a page declared before overrides were applied
+        
+        Args:
+            key: 'PageClass.ATTRIBUTE'
+            locator: Current value of the attribute
+            
+        Returns:
+            tuple: Declared locator
+        """
+        applied = cls.applied.get(key)
+        return applied[0] if applied and applied[1] == locator else locator
+    
+    @classmethod
+    def save(cls, overrides: Dict[str, Dict[str, Any]]):
+        """
+        Merge entries into the overrides file
+        
+        Args:
+            overrides: Entries keyed by 'PageClass.ATTRIBUTE'
+        """
+        path = cls.path()
+        with cls._lock:
+            stored = cls._read_file()
+            stored.update(overrides)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_file = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_file, 'w') as file:
+                json.dump(dict(sorted(stored.items())), file, indent=4)
+            os.replace(tmp_file, path)
+            cls._overrides = stored
+        cls.logger.info("Saved %d locator overrides to %s", len(overrides), path)
+    
+    @classmethod
+    def _read_file(cls) -> Dict[str, Dict[str, Any]]:
+        path = cls.path()
+        if not os.path.exists(path):
+            return {}
+        try:
+            with open(path, 'r') as file:
+                return json.load(file)
+        except ValueError:
+            cls.logger.warning("Corrupt locator overrides file, ignoring it: %s", path)
+            return {}
@@ -0,0 +1,128 @@
+"""
+Locator Stats Module
+Persists which alternative of a locator fallback chain matched, across runs
+"""
+import os
+import json
+import atexit
+import threading
+from typing import Tuple, List, Dict, Sequence
+from util.common_utils import CommonUtils
+from util.file_lock import FileLock
+from util.logger import Logger
+
+
+class LocatorStats:
+    """Win counters per fallback chain, merged into a shared JSON file at exit"""
+    
+    logger = Logger.get_logger(__name__)
+    
+    _lock = threading.Lock()
+    _wins: Dict[str, Dict[str, int]] = {}
+    _pending: Dict[str, Dict[str, int]] = {}
+    _loaded = False
+    _stats_dir = os.path.join(CommonUtils.get_project_root(), ".framework_cache")
+    _stats_file = os.path.join(_stats_dir, "locator_wins.json")
+    
+    @staticmethod
+    def locator_key(locator: Tuple[str, str]) -> str:
+        """
+        Build a stable key for a locator
+        
+        Args:
+            locator: Tuple of (By strategy, locator value)
+            
+        Returns:
+            str: Key used in the stats file
+        """
+        return f"{locator[0]}={locator[1]}"
+    
+    @classmethod
+    def order(cls, chain: str, locators: Sequence[Tuple[str, str]]) -> List[Tuple[str, str]]:
+        """
+        Order alternatives by past wins, keeping declaration order on ties
+        
+        Args:
+            chain: Name of the fallback chain
+            locators: Alternative locators in declaration order
+            
+        Returns:
+            list: Locators, most frequent winner first
+        """
+        cls._load()
+        wins = cls._wins.get(chain, {})
+        return sorted(locators, key=lambda locator: -wins.get(cls.locator_key(locator), 0))
+    
+    @classmethod
+    def record_win(cls, chain: str, locator: Tuple[str, str]):
+        """
+        Count a win for one alternative of a chain
+        
+        Args:
+            chain: Name of the fallback chain
+            locator: Locator that matched
+        """
+        cls._load()
+        key = cls.locator_key(locator)
+        with cls._lock:
+            for counters in (cls._wins, cls._pending):
+                chain_wins = counters.setdefault(chain, {})
+                chain_wins[key] = chain_wins.get(key, 0) + 1
+    
+    @classmethod
+    def get_wins(cls, chain: str) -> Dict[str, int]:
+        """
+        Get win counts of a chain
+        
+        Args:
+            chain: Name of the fallback chain
+            
+        Returns:
+            dict: Locator key to win count
+        """
+        cls._load()
+        return dict(cls._wins.get(chain, {}))
+    
+    @classmethod
+    def flush(cls):
+        """Merge wins recorded by this process into the shared stats file"""
+        with cls._lock:
+            pending, cls._pending = cls._pending, {}
+        if not pending:
+            return
+        try:
+            with FileLock(cls._stats_file + ".lock"):
+                stored = cls._read_file()
+                for chain, counters in pending.items():
+                    chain_wins = stored.setdefault(chain, {})
+                    for key, count in counters.items():
+                        chain_wins[key] = chain_wins.get(key, 0) + count
+                os.makedirs(cls._stats_dir, exist_ok=True)
+                tmp_file = f"{cls._stats_file}.{os.getpid()}.tmp"
+                with open(tmp_file, 'w') as file:
+                    json.dump(stored, file, indent=4)
+                os.replace(tmp_file, cls._stats_file)
+        except Exception as e:
+            cls.logger.warning(f"Could not save locator stats: {str(e)}")
+    
+    @classmethod
+    def _load(cls):
+        """Load stats from previous runs once per process"""
+        if cls._loaded:
+            return
+        with cls._lock:
+            if not cls._loaded:
+                cls._wins = cls._read_file()
+                cls._loaded = True
+                atexit.register(cls.flush)
+    
+    @classmethod
+    def _read_file(cls) -> Dict[str, Dict[str, int]]:
+        if not os.path.exists(cls._stats_file):
+            return {}
+        try:
+            with open(cls._stats_file, 'r') as file:
+                return json.load(file)
+        except ValueError:
+            cls.logger.warning("Corrupt locator stats file, ignoring it")
+            return {}
@@ -0,0 +1,428 @@
+"""
+Navigator Module
+Shortest-path routing between screens over UI actions and deep links
+"""
+import os
+import json
+import heapq
+import time
+import atexit
+import threading
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from base.base_page import BasePage
+from base.page_snapshot import PageSnapshot
+from config.config_loader import ConfigLoader
+from util.common_utils import CommonUtils
+from util.file_lock import FileLock
+from util.logger import Logger
+
+
+class NavigationError(RuntimeError):
+    """Raised when no route reaches the requested screen"""
+
+
+class Screen:
+    """
+    Node of the navigation graph
+    
+    A screen is detected when any of its marker locators is displayed.
+    Screens listed later in the graph are only tried when no earlier one
+    matches, so generic screens (a tab bar) go last. Edges of the parent
+    screen are also available from its children.
+    """
+    
+    def __init__(self, name: str, markers: Sequence[Tuple[str, str]], parent: Optional['Screen'] = None):
+        """
+        Initialize screen
+        
+        Args:
+            name: Unique screen name
+            markers: Locators of which any identifies the screen
+            parent: Screen whose outgoing edges also apply to this one
+        """
+        self.name = name
+        self.markers = list(markers)
+        self.parent = parent
+    
+    def matches(self, snapshot: PageSnapshot) -> bool:
+        """Check whether the snapshot shows this screen"""
+        return any(snapshot.is_displayed(marker) for marker in self.markers)
+    
+    def lineage(self) -> List['Screen']:
+        """This screen followed by its parents"""
+        screens, screen = [], self
+        while screen is not None:
+            screens.append(screen)
+            screen = screen.parent
+        return screens
+    
+    def __repr__(self):
+        return f"Screen({self.name})"
+
+
+class Edge:
+    """Transition between two screens, either a UI action or a deep link"""
+    
+    UI = "ui"
+    DEEP_LINK = "deep_link"
+    
+    def __init__(self, source: Optional[Screen], target: Screen, kind: str, cost: float,
+                 action: Optional[Callable] = None, url: Optional[str] = None, timeout: float = 10):
+        """
+        Initialize edge
+        
+        Args:
+            source: Screen the edge starts from, None for any screen (deep links)
+            target: Screen the edge leads to
+            kind: Edge.UI or Edge.DEEP_LINK
+            cost: Expected duration in seconds until learned costs exist
+            action: UI action called as action(driver, **params)
+            url: Deep link template formatted with the navigation params
+            timeout: Seconds to wait for the target screen afterwards
+        """
+        self.source = source
+        self.target = target
+        self.kind = kind
+        self.cost = cost
+        self.action = action
+        self.url = url
+        self.timeout = timeout
+    
+    @property
+    def key(self) -> str:
+        """Stable name used for learned costs"""
+        source = self.source.name if self.source else "*"
+        return f"{source}->{self.target.name}:{self.kind}"
+    
+    def __repr__(self):
+        return f"Edge({self.key})"
+
+
+class EdgeCosts:
+    """
+    Learned edge durations, an exponentially weighted moving average per edge
+    
+    Samples of this process are merged into a shared JSON file at exit, so
+    every run starts from what earlier runs measured.
+    """
+    
+    logger = Logger.get_logger(__name__)
+    
+    _lock = threading.Lock()
+    _costs: Dict[str, Dict[str, float]] = {}
+    _pending: Dict[str, List[float]] = {}
+    _loaded = False
+    _stats_dir = os.path.join(CommonUtils.get_project_root(), ".framework_cache")
+    _stats_file = os.path.join(_stats_dir, "navigation_costs.json")
+    
+    @staticmethod
+    def alpha() -> float:
+        """Weight of the newest sample"""
+        return ConfigLoader.get_float('navigation.ewma_alpha', 0.3)
+    
+    @classmethod
+    def get(cls, edge: Edge) -> float:
+        """
+        Expected duration of an edge
+        
+        Args:
+            edge: Graph edge
+            
+        Returns:
+            float: Learned cost, or the edge's declared cost without samples
+        """
+        cls._load()
+        learned = cls._costs.get(edge.key)
+        return learned['cost'] if learned else edge.cost
+    
+    @classmethod
+    def record(cls, edge: Edge, duration: float):
+        """
+        Add a measured duration of an edge
+        
+        Args:
+            edge: Graph edge
+            duration: Seconds until the target screen was shown, with a penalty on failure
+        """
+        cls._load()
+        with cls._lock:
+            cls._costs[edge.key] = cls._apply(cls._costs.get(edge.key), [duration], cls.alpha())
+            cls._pending.setdefault(edge.key, []).append(duration)
+    
+    @classmethod
+    def get_all(cls) -> Dict[str, Dict[str, float]]:
+        """Learned cost and sample count of every edge"""
+        cls._load()
+        return {key: dict(value) for key, value in cls._costs.items()}
+    
+    @classmethod
+    def flush(cls):
+        """Merge samples recorded by this process into the shared costs file"""
+        with cls._lock:
+            pending, cls._pending = cls._pending, {}
+        if not pending:
+            return
+        try:
+            with FileLock(cls._stats_file + ".lock"):
+                stored = cls._read_file()
+                for key, samples in pending.items():
+                    stored[key] = cls._apply(stored.get(key), samples, cls.alpha())
+                os.makedirs(cls._stats_dir, exist_ok=True)
+                tmp_file = f"{cls._stats_file}.{os.getpid()}.tmp"
+                with open(tmp_file, 'w') as file:
+                    json.dump(stored, file, indent=4)
+                os.replace(tmp_file, cls._stats_file)
+        except Exception as e:
+            cls.logger.warning("Could not save navigation costs: %s", e)
+    
+    @staticmethod
+    def _apply(current: Optional[Dict[str, float]], samples: List[float], alpha: float) -> Dict[str, float]:
+        cost = current['cost'] if current else None
+        count = int(current['samples']) if current else 0
+        for sample in samples:
+            cost = sample if cost is None else alpha * sample + (1 - alpha) * cost
+            count += 1
+        return {'cost': round(cost, 4), 'samples': count}
+    
+    @classmethod
+    def _load(cls):
+        """Load costs from previous runs once per process"""
+        if cls._loaded:
+            return
+        with cls._lock:
+            if not cls._loaded:
+                cls._costs = cls._read_file()
+                cls._loaded = True
+                atexit.register(cls.flush)
+    
+    @classmethod
+    def _read_file(cls) -> Dict[str, Dict[str, float]]:
+        if not os.path.exists(cls._stats_file):
+            return {}
+        try:
+            with open(cls._stats_file, 'r') as file:
+                return json.load(file)
+        except ValueError:
+            cls.logger.warning("Corrupt navigation costs file, ignoring it")
+            return {}
+
+
+class NavigationGraph:
+    """Screens and the edges between them"""
+    
+    def __init__(self):
+        self.screens: List[Screen] = []
+        self.edges: List[Edge] = []
+    
+    def add_screen(self, screen: Screen) -> Screen:
+        """Register a screen; detection tries screens in registration order"""
+        self.screens.append(screen)
+        return screen
+    
+    def add_ui_edge(self, source: Screen, target: Screen, action: Callable, cost: float = 3.0,
+                    timeout: float = 10) -> Edge:
+        """
+        Register a UI action leading from one screen to another
+        
+        Args:
+            source: Starting screen
+            target: Resulting screen
+            action: Called as action(driver, **params)
+            cost: Expected duration in seconds
+            timeout: Seconds to wait for the target screen
+            
+        Returns:
+            Edge: New edge
+        """
+        edge = Edge(source, target, Edge.UI, cost, action=action, timeout=timeout)
+        self.edges.append(edge)
+        return edge
+    
+    def add_deep_link(self, target: Screen, url: str, cost: float = 2.0, source: Optional[Screen] = None,
+                      timeout: float = 10) -> Optional[Edge]:
+        """
+        Register a deep link, usable from any screen unless a source is given
+        
+        Args:
+            target: Screen the link opens
+            url: URL template, e.g. "myapp://search?q={query}"; empty skips the edge
+            cost: Expected duration in seconds
+            source: Screen the link is restricted to
+            timeout: Seconds to wait for the target screen
+            
+        Returns:
+            Edge: New edge, None if no URL is configured
+        """
+        if not url:
+            return None
+        edge = Edge(source, target, Edge.DEEP_LINK, cost, url=url, timeout=timeout)
+        self.edges.append(edge)
+        return edge
+    
+    def detect(self, snapshot: PageSnapshot) -> Optional[Screen]:
+        """
+        Identify the screen shown in a snapshot
+        
+        Args:
+            snapshot: Current page snapshot
+            
+        Returns:
+            Screen: First registered screen that matches, None if unknown
+        """
+        return next((screen for screen in self.screens if screen.matches(snapshot)), None)
+    
+    def outgoing(self, screen: Optional[Screen], params: Dict[str, str]) -> List[Edge]:
+        """
+        Edges usable from a screen with the given navigation params
+        
+        Args:
+            screen: Current screen, None when unknown (only deep links apply)
+            params: Navigation params; deep links missing one of their fields are skipped
+            
+        Returns:
+            list: Usable edges
+        """
+        lineage = screen.lineage() if screen else []
+        edges = []
+        for edge in self.edges:
+            if edge.source is not None and edge.source not in lineage:
+                continue
+            if edge.url:
+                try:
+                    edge.url.format(**params)
+                except KeyError:
+                    continue
+            edges.append(edge)
+        return edges
+    
+    def shortest_path(self, source: Optional[Screen], target: Screen, params: Optional[Dict[str, str]] = None,
+                      cost: Callable[[Edge], float] = EdgeCosts.get) -> Optional[List[Edge]]:
+        """
+        Cheapest route between two screens (Dijkstra)
+        
+        Args:
+            source: Current screen, None when unknown
+            target: Requested screen
+            params: Navigation params
+            cost: Edge cost function, learned costs by default
+            
+        Returns:
+            list: Edges to follow, empty if already there, None if unreachable
+        """
+        params = params or {}
+        if source is target:
+            return []
+        distances = {source: 0.0}
+        previous: Dict[Screen, Tuple[Optional[Screen], Edge]] = {}
+        queue = [(0.0, 0, source)]
+        counter = 1
+        while queue:
+            distance, _, screen = heapq.heappop(queue)
+            if screen is target:
+                path = []
+                while screen is not source:
+                    screen, edge = previous[screen]
+                    path.append(edge)
+                return list(reversed(path))
+            if distance > distances.get(screen, float('inf')):
+                continue
+            for edge in self.outgoing(screen, params):
+                candidate = distance + max(cost(edge), 0.0)
+                if candidate < distances.get(edge.target, float('inf')):
+                    distances[edge.target] = candidate
+                    previous[edge.target] = (screen, edge)
+                    heapq.heappush(queue, (candidate, counter, edge.target))
+                    counter += 1
+        return None
+
+
+class Navigator:
+    """
+    Moves the app to a requested screen along the cheapest known route
+    
+    The current screen is detected from one page source snapshot. Every
+    edge taken is timed until the target screen is shown, and the time is
+    fed back into EdgeCosts. A failed edge is recorded with a penalty and
+    the route is planned again from wherever the app ended up.
+    """
+    
+    logger = Logger.get_logger(__name__)
+    
+    MAX_REPLANS = 3
+    
+    def __init__(self, driver, graph: NavigationGraph, app_id: Optional[str] = None):
+        """
+        Initialize navigator
+        
+        Args:
+            driver: Appium driver instance
+            graph: Navigation graph of the app
+            app_id: Package (or bundle id) opened by deep links
+        """
+        self.driver = driver
+        self.graph = graph
+        self.page = BasePage(driver)
+        self.app_id = app_id or ConfigLoader.capability_profile('android').get('app_package', '')
+    
+    def current_screen(self) -> Optional[Screen]:
+        """
+        Detect the screen shown right now
+        
+        Returns:
+            Screen: Detected screen, None if unknown
+        """
+        return self.graph.detect(self.page.snapshot(max_age=0))
+    
+    def navigate_to(self, target: Screen, **params: str) -> List[Edge]:
+        """
+        Go to a screen along the cheapest route
+        
+        Args:
+            target: Requested screen
+            **params: Values needed by the edges, e.g. query for search results
+            
+        Returns:
+            list: Edges that were taken
+            
+        Raises:
+            NavigationError: If the screen cannot be reached
+        """
+        taken = []
+        penalty = ConfigLoader.get_float('navigation.failure_penalty', 30)
+        for _ in range(self.MAX_REPLANS + 1):
+            current = self.current_screen()
+            path = self.graph.shortest_path(current, target, params)
+            if path is None:
+                raise NavigationError(f"No route from {current} to {target}")
+            if not path:
+                return taken
+            self.logger.info("Route %s -> %s: %s", current.name if current else "unknown", target.name,
+                             " -> ".join(edge.key for edge in path))
+            for edge in path:
+                start = time.perf_counter()
+                arrived = self._follow(edge, params)
+                duration = time.perf_counter() - start
+                EdgeCosts.record(edge, duration if arrived else duration + penalty)
+                if not arrived:
+                    self.logger.warning("Edge %s did not reach %s, re-planning", edge.key, edge.target.name)
+                    break
+                taken.append(edge)
+            else:
+                return taken
+        raise NavigationError(f"Could not reach {target} after {self.MAX_REPLANS} re-plans")
+    
+    def _follow(self, edge: Edge, params: Dict[str, str]) -> bool:
+        """Take one edge and wait for its target screen"""
+        try:
+            if edge.kind == Edge.DEEP_LINK:
+                self.driver.execute_script("mobile: deepLink", {"url": edge.url.format(**params),
+                                                                "package": self.app_id})
+            else:
+                edge.action(self.driver, **params)
+        except Exception as e:
+            self.logger.warning("Edge %s failed: %s", edge.key, e)
+            return False
+        finally:
+            self.page.invalidate_snapshot()
+            self.page.invalidate_elements()
+        return self.page.wait_for_snapshot(edge.target.matches, timeout=edge.timeout) is not None
@@ -0,0 +1,470 @@
+"""
+Page Snapshot Module
+Answers many locator queries from a single page_source fetch
+"""
+import re
+import time
+import xml.etree.ElementTree as ET
+from typing import Tuple, List, Optional, Dict, Callable
+from appium.webdriver.common.appiumby import AppiumBy
+from selenium.webdriver.common.by import By
+
+
+class UnsupportedLocatorError(ValueError):
+    """Raised when a locator cannot be evaluated against a snapshot"""
+
+
+_TOKEN_PATTERN = re.compile(r"""
+    (?P<string>'[^']*'|"[^"]*")
+  | (?P<number>\d+)
+  | (?P<op>//|/|\(|\)|\[|\]|@|!=|=|,)
+  | (?P<name>[A-Za-z_*][\w.\-:*]*)
+  | (?P<space>\s+)
+""", re.VERBOSE)
+
+
+def _tokenize(expression: str) -> List[Tuple[str, str]]:
+    """Split an XPath expression into (kind, value) tokens"""
+    tokens = []
+    position = 0
+    while position < len(expression):
+        match = _TOKEN_PATTERN.match(expression, position)
+        if match is None:
+            raise UnsupportedLocatorError(f"Unsupported XPath syntax at {position}: {expression}")
+        position = match.end()
+        kind = match.lastgroup
+        if kind == 'space':
+            continue
+        value = match.group(kind)
+        if kind == 'string':
+            value = value[1:-1]
+        tokens.append((kind, value))
+    return tokens
+
+
+class _XPathCompiler:
+    """Compiles the XPath subset used by page objects into Python predicates
+    
+    Supported: absolute and descendant steps with a tag name or '*',
+    positional predicates, @attr = / != 'value', @attr presence,
+    contains(), starts-with(), not(), and/or, parentheses and a trailing
+    position on a parenthesised path such as (//a[@b='c'])[2].
+    """
+    
+    def __init__(self, expression: str):
+        self.expression = expression
+        self.tokens = _tokenize(expression)
+        self.position = 0
+    
+    def _peek(self, offset: int = 0) -> Optional[Tuple[str, str]]:
+        index = self.position + offset
+        return self.tokens[index] if index < len(self.tokens) else None
+    
+    def _next(self) -> Tuple[str, str]:
+        token = self._peek()
+        if token is None:
+            raise UnsupportedLocatorError(f"Unexpected end of XPath: {self.expression}")
+        self.position += 1
+        return token
+    
+    def _expect(self, value: str):
+        token = self._next()
+        if token[1] != value:
+            raise UnsupportedLocatorError(f"Expected '{value}' but found '{token[1]}' in: {self.expression}")
+    
+    def compile(self) -> Callable[["PageSnapshot"], List[ET.Element]]:
+        if self._peek() == ('op', '('):
+            self._next()
+            path = self._parse_path()
+            self._expect(')')
+            index = None
+            if self._peek() == ('op', '['):
+                self._next()
+                kind, value = self._next()
+                if kind != 'number':
+                    raise UnsupportedLocatorError(f"Only numeric positions are supported: {self.expression}")
+                index = int(value)
+                self._expect(']')
+            if self._peek() is not None:
+                raise UnsupportedLocatorError(f"Unsupported XPath: {self.expression}")
+            
+            def evaluate(snapshot):
+                nodes = snapshot._evaluate_path(path)
+                if index is None:
+                    return nodes
+                return nodes[index - 1:index] if 0 < index <= len(nodes) else []
+            return evaluate
+        
+        path = self._parse_path()
+        if self._peek() is not None:
+            raise UnsupportedLocatorError(f"Unsupported XPath: {self.expression}")
+        return lambda snapshot: snapshot._evaluate_path(path)
+    
+    def _parse_path(self) -> List[Tuple[str, str, list]]:
+        steps = []
+        while self._peek() in (('op', '//'), ('op', '/')):
+            axis = self._next()[1]
+            kind, tag = self._next()
+            if kind != 'name':
+                raise UnsupportedLocatorError(f"Expected a node name in: {self.expression}")
+            predicates = []
+            while self._peek() == ('op', '['):
+                self._next()
+                if self._peek() and self._peek()[0] == 'number' and self._peek(1) == ('op', ']'):
+                    predicates.append(int(self._next()[1]))
+                else:
+                    predicates.append(self._parse_or())
+                self._expect(']')
+            steps.append((axis, tag, predicates))
+        if not steps:
+            raise UnsupportedLocatorError(f"XPath must start with '/' or '//': {self.expression}")
+        return steps
+    
+    def _parse_or(self) -> Callable[[ET.Element], bool]:
+        terms = [self._parse_and()]
+        while self._peek() == ('name', 'or'):
+            self._next()
+            terms.append(self._parse_and())
+        return terms[0] if len(terms) == 1 else (lambda node: any(term(node) for term in terms))
+    
+    def _parse_and(self) -> Callable[[ET.Element], bool]:
+        terms = [self._parse_atom()]
+        while self._peek() == ('name', 'and'):
+            self._next()
+            terms.append(self._parse_atom())
+        return terms[0] if len(terms) == 1 else (lambda node: all(term(node) for term in terms))
+    
+    def _parse_attribute(self) -> str:
+        token = self._next()
+        if token == ('op', '@'):
+            return self._next()[1]
+        if token == ('name', 'text') and self._peek() == ('op', '('):
+            self._next()
+            self._expect(')')
+            return 'text'
+        raise UnsupportedLocatorError(f"Expected an attribute in: {self.expression}")
+    
+    def _parse_literal(self) -> str:
+        kind, value = self._next()
+        if kind not in ('string', 'number'):
+            raise UnsupportedLocatorError(f"Expected a literal in: {self.expression}")
+        return value
+    
+    def _parse_atom(self) -> Callable[[ET.Element], bool]:
+        token = self._peek()
+        if token == ('op', '('):
+            self._next()
+            inner = self._parse_or()
+            self._expect(')')
+            return inner
+        if token in (('name', 'contains'), ('name', 'starts-with'), ('name', 'not')):
+            function = self._next()[1]
+            self._expect('(')
+            if function == 'not':
+                inner = self._parse_or()
+                self._expect(')')
+                return lambda node: not inner(node)
+            attribute = self._parse_attribute()
+            self._expect(',')
+            literal = self._parse_literal()
+            self._expect(')')
+            if function == 'contains':
+                return lambda node: literal in node.get(attribute, '')
+            return lambda node: node.get(attribute, '').startswith(literal)
+        
+        attribute = self._parse_attribute()
+        if self._peek() in (('op', '='), ('op', '!=')):
+            operator = self._next()[1]
+            literal = self._parse_literal()
+            if operator == '=':
+                return lambda node: node.get(attribute) == literal
+            return lambda node: node.get(attribute) is not None and node.get(attribute) != literal
+        return lambda node: attribute in node.attrib
+
+
+_UI_SELECTOR_PREFIX = re.compile(r"^\s*new\s+UiSelector\(\s*\)")
+_UI_SELECTOR_CALL = re.compile(r"""
+    \s*\.?\s*(?P<method>\w+)\(\s*
+    (?P<arg>"(?:[^"\\]|\\.)*"|-?\d+|true|false)?
+    \s*\)
+""", re.VERBOSE)
+
+# UiSelector methods comparing an attribute: (attribute, comparison)
+_UI_SELECTOR_METHODS = {
+    'resourceId': ('resource-id', 'equals'),
+    'resourceIdMatches': ('resource-id', 'matches'),
+    'text': ('text', 'equals'),
+    'textContains': ('text', 'contains'),
+    'textStartsWith': ('text', 'starts_with'),
+    'textMatches': ('text', 'matches'),
+    'description': ('content-desc', 'equals'),
+    'descriptionContains': ('content-desc', 'contains'),
+    'descriptionStartsWith': ('content-desc', 'starts_with'),
+    'descriptionMatches': ('content-desc', 'matches'),
+    'className': ('class', 'equals'),
+    'classNameMatches': ('class', 'matches'),
+    'packageName': ('package', 'equals'),
+    'checkable': ('checkable', 'equals'),
+    'checked': ('checked', 'equals'),
+    'clickable': ('clickable', 'equals'),
+    'enabled': ('enabled', 'equals'),
+    'focusable': ('focusable', 'equals'),
+    'focused': ('focused', 'equals'),
+    'longClickable': ('long-clickable', 'equals'),
+    'scrollable': ('scrollable', 'equals'),
+    'selected': ('selected', 'equals'),
+    'index': ('index', 'equals'),
+}
+
+
+def _compile_ui_selector(expression: str) -> Callable[["PageSnapshot"], List[ET.Element]]:
+    """Compile a single UiSelector chain, e.g. new UiSelector().className("a").text("b").instance(1)
+    
+    Supported: the attribute methods in _UI_SELECTOR_METHODS and instance().
+    Child, parent and UiScrollable selectors are not.
+    """
+    prefix = _UI_SELECTOR_PREFIX.match(expression)
+    position = prefix.end() if prefix else 0
+    predicates = []
+    instance = None
+    while position < len(expression.rstrip().rstrip(';')):
+        match = _UI_SELECTOR_CALL.match(expression, position)
+        if match is None:
+            raise UnsupportedLocatorError(f"Unsupported UiSelector syntax at {position}: {expression}")
+        position = match.end()
+        method, argument = match.group('method'), match.group('arg')
+        if argument is None:
+            raise UnsupportedLocatorError(f"UiSelector.{method}() needs an argument: {expression}")
+        if argument.startswith('"'):
+            argument = re.sub(r'\\(.)', r'\1', argument[1:-1])
+        if method == 'instance':
+            instance = int(argument)
+            continue
+        if method not in _UI_SELECTOR_METHODS:
+            raise UnsupportedLocatorError(f"Unsupported UiSelector method {method}: {expression}")
+        attribute, comparison = _UI_SELECTOR_METHODS[method]
+        predicates.append(_ui_selector_predicate(attribute, comparison, argument))
+    if not predicates and instance is None:
+        raise UnsupportedLocatorError(f"Empty UiSelector: {expression}")
+    
+    def matcher(snapshot):
+        nodes = [
+            node for node in snapshot.nodes
+            if node is not snapshot.root and all(predicate(node) for predicate in predicates)
+        ]
+        if instance is None:
+            return nodes
+        return nodes[instance:instance + 1] if instance >= 0 else []
+    return matcher
+
+
+def _ui_selector_predicate(attribute: str, comparison: str, argument: str) -> Callable[[ET.Element], bool]:
+    """Predicate of one UiSelector attribute method"""
+    def value_of(node):
+        # page_source names the element by its class; the attribute is not always repeated
+        return node.get(attribute, node.tag if attribute == 'class' else '')
+    
+    if comparison == 'contains':
+        return lambda node: argument in value_of(node)
+    if comparison == 'starts_with':
+        return lambda node: value_of(node).startswith(argument)
+    if comparison == 'matches':
+        pattern = re.compile(argument, re.DOTALL)
+        return lambda node: pattern.fullmatch(value_of(node)) is not None
+    return lambda node: value_of(node) == argument
+
+
+_MATCHER_CACHE: Dict[Tuple[str, str], Callable[["PageSnapshot"], List[ET.Element]]] = {}
+
+
+def compile_locator(locator: Tuple[str, str]) -> Callable[["PageSnapshot"], List[ET.Element]]:
+    """
+    Compile a locator into a snapshot matcher, caching the result
+    
+    Args:
+        locator: Tuple of (By strategy, locator value)
+        
+    Returns:
+        callable: Function returning the matching nodes of a snapshot
+        
+    Raises:
+        UnsupportedLocatorError: If the strategy or expression is not supported
+    """
+    matcher = _MATCHER_CACHE.get(locator)
+    if matcher is not None:
+        return matcher
+    
+    strategy, value = locator
+    if strategy == By.XPATH:
+        matcher = _XPathCompiler(value).compile()
+    elif strategy == By.ID:
+        def matcher(snapshot, value=value):
+            return [
+                node for node in snapshot.nodes
+                if node.get('resource-id') == value or node.get('resource-id', '').endswith(f":id/{value}")
+                or node.get('name') == value
+            ]
+    elif strategy == AppiumBy.ACCESSIBILITY_ID:
+        def matcher(snapshot, value=value):
+            return [node for node in snapshot.nodes if node.get('content-desc') == value or node.get('name') == value]
+    elif strategy == AppiumBy.ANDROID_UIAUTOMATOR:
+        matcher = _compile_ui_selector(value)
+    elif strategy == By.CLASS_NAME:
+        def matcher(snapshot, value=value):
+            return [node for node in snapshot.nodes if node.tag == value or node.get('class') == value]
+    else:
+        raise UnsupportedLocatorError(f"Unsupported snapshot locator strategy: {strategy}")
+    
+    _MATCHER_CACHE[locator] = matcher
+    return matcher
+
+
+def is_supported(locator: Tuple[str, str]) -> bool:
+    """
+    Check whether a locator can be answered from a snapshot
+    
+    Args:
+        locator: Tuple of (By strategy, locator value)
+        
+    Returns:
+        bool: True if supported
+    """
+    try:
+        compile_locator(locator)
+        return True
+    except UnsupportedLocatorError:
+        return False
+
+
+class PageSnapshot:
+    """In-memory view of one page_source hierarchy"""
+    
+    _BOUNDS_PATTERN = re.compile(r"\[(-?\d+),(-?\d+)\]\[(-?\d+),(-?\d+)\]")
+    
+    def __init__(self, page_source: str, captured_at: Optional[float] = None):
+        """
+        Parse a page_source hierarchy
+        
+        Args:
+            page_source: XML returned by driver.page_source
+            captured_at: time.monotonic() of the fetch, defaults to now
+        """
+        self.root = ET.fromstring(page_source.encode('utf-8') if isinstance(page_source, str) else page_source)
+        self.captured_at = captured_at if captured_at is not None else time.monotonic()
+        self.nodes: List[ET.Element] = list(self.root.iter())
+        self._order = {id(node): index for index, node in enumerate(self.nodes)}
+    
+    @property
+    def age(self) -> float:
+        """Seconds since the snapshot was captured"""
+        return time.monotonic() - self.captured_at
+    
+    def find_all(self, locator: Tuple[str, str]) -> List[ET.Element]:
+        """
+        Find all nodes matching a locator
+        
+        Args:
+            locator: Tuple of (By strategy, locator value)
+            
+        Returns:
+            list: Matching nodes in document order
+        """
+        return compile_locator(locator)(self)
+    
+    def find_all_within(self, node: ET.Element, locator: Tuple[str, str]) -> List[ET.Element]:
+        """
+        Find the nodes matching a locator inside a node's subtree, as a search from that element would
+        
+        Args:
+            node: Node whose descendants are searched
+            locator: Tuple of (By strategy, locator value); XPaths may start with '.'
+            
+        Returns:
+            list: Matching descendants in document order
+            
+        Raises:
+            UnsupportedLocatorError: For positional XPaths such as (//a)[2], which count across the whole screen
+        """
+        strategy, value = locator
+        if strategy == By.XPATH:
+            if value.startswith('('):
+                raise UnsupportedLocatorError(f"Positional XPath cannot be scoped to a node: {value}")
+            locator = (strategy, value[1:] if value.startswith('.') else value)
+        inside = {id(child) for child in node.iter() if child is not node}
+        return [match for match in self.find_all(locator) if id(match) in inside]
+    
+    def find(self, locator: Tuple[str, str]) -> Optional[ET.Element]:
+        """Find the first node matching a locator, or None"""
+        nodes = self.find_all(locator)
+        return nodes[0] if nodes else None
+    
+    def exists(self, locator: Tuple[str, str]) -> bool:
+        """Check whether any node matches a locator"""
+        return self.find(locator) is not None
+    
+    def count(self, locator: Tuple[str, str]) -> int:
+        """Count nodes matching a locator"""
+        return len(self.find_all(locator))
+    
+    def is_displayed(self, locator: Tuple[str, str]) -> bool:
+        """Check whether a matching node is reported as displayed"""
+        return any(
+            node.get('displayed', node.get('visible', 'true')) == 'true'
+            for node in self.find_all(locator)
+        )
+    
+    def text(self, locator: Tuple[str, str]) -> Optional[str]:
+        """Get the text of the first matching node, or None"""
+        node = self.find(locator)
+        return None if node is None else self.node_text(node)
+    
+    @staticmethod
+    def node_text(node: ET.Element) -> str:
+        """Get the text of a node as WebElement.text reports it"""
+        for attribute in ('text', 'value', 'label'):
+            if node.get(attribute) is not None:
+                return node.get(attribute)
+        return ''
+    
+    def bounds(self, locator: Tuple[str, str]) -> Optional[Tuple[int, int, int, int]]:
+        """
+        Get the bounds of the first matching node
+        
+        Returns:
+            tuple: (left, top, right, bottom), or None if not found
+        """
+        node = self.find(locator)
+        if node is None:
+            return None
+        match = self._BOUNDS_PATTERN.match(node.get('bounds', ''))
+        if match:
+            return tuple(int(value) for value in match.groups())
+        if node.get('x') is not None:
+            x, y = int(node.get('x')), int(node.get('y'))
+            return x, y, x + int(node.get('width', 0)), y + int(node.get('height', 0))
+        return None
+    
+    def _evaluate_path(self, steps: List[Tuple[str, str, list]]) -> List[ET.Element]:
+        """Evaluate compiled location steps from the document root"""
+        context = [None]
+        for axis, tag, predicates in steps:
+            selected = {}
+            parents = {}
+            for node in context:
+                if axis == '/':
+                    parents[id(node)] = node
+                else:
+                    for parent in ([None] + self.nodes if node is None else node.iter()):
+                        parents[id(parent)] = parent
+            for parent in parents.values():
+                children = [self.root] if parent is None else list(parent)
+                candidates = [child for child in children if tag == '*' or child.tag == tag]
+                for predicate in predicates:
+                    if isinstance(predicate, int):
+                        candidates = candidates[predicate - 1:predicate] if predicate > 0 else []
+                    else:
+                        candidates = [child for child in candidates if predicate(child)]
+                for child in candidates:
+                    selected[id(child)] = child
+            context = sorted(selected.values(), key=lambda item: self._order[id(item)])
+        return context
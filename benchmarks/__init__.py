@@ -0,0 +1 @@
+# Benchmarks package for framework overhead measurements
@@ -0,0 +1,216 @@
+"""
+Framework Overhead Benchmark
+Measures what BasePage, the page objects and the driver fixture add on top of the Appium server
+
+Every high-level action runs against the fake Appium server with a fixed
+per-request latency. For each action it reports the WebDriver commands it
+sends, the client CPU time of the test thread, and wall-time percentiles.
+Results can be saved as a baseline and later runs checked against it.
+Command counts must not grow. CPU and wall time may grow up to the
+tolerance, and wall time is only compared at the baseline's latency.
+
+Usage:
+    python -m benchmarks.bench_framework --iterations 50 --latency 0.002
+    python -m benchmarks.bench_framework --save-baseline
+    python -m benchmarks.bench_framework --check
+"""
+import os
+import sys
+import json
+import time
+import argparse
+from typing import Callable, Dict, Any, List, Tuple
+from base.base_page import BasePage
+from base.driver_factory import DriverFactory
+from pageObjects.account_page import AccountPage
+from pageObjects.cart_page import CartPage
+from pageObjects.login_page import LoginPage
+from util.fake_appium_server import FakeAppiumServer
+
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baselines", "bench_framework.json")
+
+# Login and account screen with the elements the measured page object methods use
+PAGE_SOURCE = """<?xml version="1.0" encoding="UTF-8"?>
+<hierarchy rotation="0">
+  <android.widget.FrameLayout package="com.mumzworld.android" bounds="[0,0][1080,2400]" displayed="true">
+    <android.widget.TextView text="Sign In" bounds="[40,100][1040,160]" displayed="true"/>
+    <android.widget.TextView text="Sign In" bounds="[40,180][1040,240]" displayed="true"/>
+    <android.widget.EditText text="Email" bounds="[40,300][1040,400]" displayed="true"/>
+    <android.widget.EditText text="Password" bounds="[40,420][1040,520]" displayed="true"/>
+    <android.widget.TextView text="Sign In" bounds="[40,560][1040,640]" displayed="true"/>
+    <android.widget.TextView text="Sign In" bounds="[40,660][1040,740]" displayed="true"/>
+    <android.widget.TextView text="My orders" bounds="[40,800][1040,860]" displayed="true"/>
+    <android.view.ViewGroup resource-id="com.mumzworld.android:id/cart_item" bounds="[40,900][1040,1100]" displayed="true">
+      <android.widget.TextView text="Diapers" resource-id="com.mumzworld.android:id/cart_item_name" bounds="[60,920][1020,980]" displayed="true"/>
+    </android.view.ViewGroup>
+    <android.widget.Button content-desc="Cart" bounds="[540,2280][800,2400]" displayed="true"/>
+    <android.widget.Button content-desc="Account" bounds="[800,2280][1080,2400]" displayed="true"/>
+  </android.widget.FrameLayout>
+</hierarchy>
+"""
+
+
+def page_actions() -> List[Tuple[str, Callable]]:
+    """High-level actions, each a callable taking the driver"""
+    return [
+        ("page object construction", lambda driver: LoginPage(driver)),
+        ("BasePage.find_element", lambda driver: BasePage(driver).find_element(LoginPage.EMAIL_FIELD)),
+        ("BasePage.click", lambda driver: BasePage(driver).click(AccountPage.ACCOUNT_TAB)),
+        ("BasePage.get_text", lambda driver: CartPage(driver).get_cart_item_name()),
+        ("BasePage.is_element_displayed (snapshot)",
+         lambda driver: AccountPage(driver).is_element_displayed(AccountPage.MY_ORDERS)),
+        ("AccountPage.click_sign_in_button", lambda driver: AccountPage(driver).click_sign_in_button()),
+        ("LoginPage.enter_email", lambda driver: LoginPage(driver).enter_email("user@example.com")),
+        ("LoginPage.login", lambda driver: LoginPage(driver).login("user@example.com", "secret")),
+    ]
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of a non-empty list"""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(round(fraction * len(ordered))) - 1))]
+
+
+def measure(server: FakeAppiumServer, action: Callable, driver, iterations: int) -> Dict[str, Any]:
+    """
+    Run an action repeatedly
+    
+    Args:
+        server: Fake server counting the requests
+        action: Callable taking the driver
+        driver: Driver the action runs on, None for actions that create their own
+        iterations: Number of runs
+        
+    Returns:
+        dict: Commands per run, CPU and wall percentiles in ms
+    """
+    cpu, wall, commands = [], [], []
+    for _ in range(iterations):
+        # Typing changes the fake screen (the Email field's text); start every run from the same screen
+        server.set_page_source(PAGE_SOURCE)
+        if driver is not None:
+            BasePage(driver).invalidate_snapshot()
+            BasePage(driver).invalidate_elements()
+        requests = server.requests
+        wall_start, cpu_start = time.perf_counter(), time.thread_time()
+        action(driver)
+        cpu.append((time.thread_time() - cpu_start) * 1000)
+        wall.append((time.perf_counter() - wall_start) * 1000)
+        commands.append(server.requests - requests)
+    return {
+        'commands': max(commands),
+        'cpu_ms_p50': round(percentile(cpu, 0.5), 3),
+        'wall_ms_p50': round(percentile(wall, 0.5), 3),
+        'wall_ms_p95': round(percentile(wall, 0.95), 3),
+        'wall_ms_p99': round(percentile(wall, 0.99), 3),
+    }
+
+
+def driver_fixture(_):
+    """What the driver fixture does around a test without session reuse"""
+    DriverFactory.acquire_driver("android", "benchmark")
+    DriverFactory.release_driver()
+
+
+def run(iterations: int, latency: float) -> Dict[str, Any]:
+    """
+    Measure every action against a fresh fake server
+    
+    Args:
+        iterations: Runs per action
+        latency: Server side delay per request in seconds
+        
+    Returns:
+        dict: Settings and per-action results
+    """
+    # Screens of the fake server never change; one hierarchy read settles wait_for_ui_idle
+    BasePage.UI_IDLE_WINDOW = 0
+    results = {}
+    with FakeAppiumServer(latency=latency, page_source=PAGE_SOURCE) as server:
+        # Fake server latencies must not end up in the wait history real-device runs use
+        os.environ.update(APPIUM_SERVER_URL=server.url, IMPLICIT_WAIT="0", SESSION_REUSE="false",
+                          DEVICE_POOL="false", ADAPTIVE_WAITS="false")
+        results["driver fixture setup"] = measure(server, driver_fixture, None, max(iterations // 5, 3))
+        driver = DriverFactory.acquire_driver("android", "benchmark")
+        try:
+            for name, action in page_actions():
+                results[name] = measure(server, action, driver, iterations)
+        finally:
+            DriverFactory.quit_driver()
+    return {'settings': {'iterations': iterations, 'latency': latency}, 'actions': results}
+
+
+def check(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """
+    Compare a run with the baseline
+    
+    Args:
+        current: Output of run()
+        baseline: Saved output of run()
+        tolerance: Allowed relative growth of CPU and wall time
+        
+    Returns:
+        list: Regression messages, empty if none
+    """
+    same_latency = current['settings']['latency'] == baseline['settings']['latency']
+    regressions = []
+    for name, base in baseline['actions'].items():
+        result = current['actions'].get(name)
+        if result is None:
+            continue
+        if result['commands'] > base['commands']:
+            regressions.append(f"{name}: {result['commands']} commands, baseline {base['commands']}")
+        metrics = ['cpu_ms_p50'] + (['wall_ms_p50'] if same_latency else [])
+        for metric in metrics:
+            # Half a millisecond of slack keeps sub-millisecond actions from failing on noise
+            limit = base[metric] * (1 + tolerance) + 0.5
+            if result[metric] > limit:
+                regressions.append(f"{name}: {metric} {result[metric]:.2f}, baseline {base[metric]:.2f}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark framework overhead against the fake Appium server")
+    parser.add_argument('--iterations', type=int, default=50)
+    parser.add_argument('--latency', type=float, default=0.002, help="Server side delay per request in seconds")
+    parser.add_argument('--baseline', default=BASELINE_PATH, help="Baseline JSON file")
+    parser.add_argument('--save-baseline', action='store_true', help="Store this run as the baseline")
+    parser.add_argument('--check', action='store_true', help="Exit non-zero when a result regressed")
+    parser.add_argument('--tolerance', type=float, default=0.5, help="Allowed relative growth of CPU and wall time")
+    args = parser.parse_args()
+    
+    current = run(args.iterations, args.latency)
+    baseline = None
+    if os.path.exists(args.baseline):
+        with open(args.baseline, 'r') as file:
+            baseline = json.load(file)
+    
+    print(f"{'action':<42}{'cmds':>6}{'base':>6}{'cpu p50':>10}{'wall p50':>10}{'p95':>9}{'p99':>9}  (ms)")
+    for name, result in current['actions'].items():
+        base = (baseline or {}).get('actions', {}).get(name, {}).get('commands', '')
+        print(
+            f"{name:<42}{result['commands']:>6}{base:>6}{result['cpu_ms_p50']:>10.2f}"
+            f"{result['wall_ms_p50']:>10.2f}{result['wall_ms_p95']:>9.2f}{result['wall_ms_p99']:>9.2f}"
+        )
+    
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, 'w') as file:
+            json.dump(current, file, indent=4)
+        print(f"Baseline saved to {args.baseline}")
+    if args.check:
+        if baseline is None:
+            print(f"No baseline at {args.baseline}, run with --save-baseline first")
+            return 1
+        regressions = check(current, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            return 1
+        print("No regressions against the baseline")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
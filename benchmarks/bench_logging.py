@@ -0,0 +1,81 @@
+"""
+Logging Benchmark
+Measures the per-call cost of BasePage-style logging on the test thread
+
+Compares the previous synchronous setup (FileHandler + StreamHandler per
+logger, f-string messages) with the queue-based Logger and lazy
+%-formatting, for an enabled INFO call and a disabled DEBUG call.
+
+Usage:
+    python -m benchmarks.bench_logging --calls 20000
+"""
+import os
+import sys
+import time
+import logging
+import argparse
+import tempfile
+from appium.webdriver.common.appiumby import AppiumBy
+from util import logger as logger_module
+from util.logger import Logger
+
+
+LOCATOR = (AppiumBy.XPATH, "//android.widget.TextView[@text='Account']")
+
+
+def legacy_logger(log_dir: str) -> logging.Logger:
+    """Build a logger the way Logger.get_logger did before the queue pipeline"""
+    logger = logging.getLogger("bench.legacy")
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    file_handler = logging.FileHandler(os.path.join(log_dir, "legacy.log"))
+    file_handler.setLevel(logging.DEBUG)
+    file_handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+    console_handler = logging.StreamHandler(sys.stderr)
+    console_handler.setLevel(logging.INFO)
+    console_handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+    logger.addHandler(file_handler)
+    logger.addHandler(console_handler)
+    return logger
+
+
+def per_call_us(log_call, calls: int) -> float:
+    """Average microseconds spent on the calling thread per log call"""
+    start = time.perf_counter()
+    for _ in range(calls):
+        log_call()
+    return (time.perf_counter() - start) / calls * 1_000_000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark framework logging overhead")
+    parser.add_argument('--calls', type=int, default=20000)
+    args = parser.parse_args()
+    
+    log_dir = tempfile.mkdtemp(prefix="bench_logging_")
+    logger_module.LOG_DIR = log_dir
+    os.environ['TEST_RUN_ID'] = "bench"
+    # Console output is part of the cost but should not flood the terminal
+    sys.stderr = open(os.devnull, 'w')
+    
+    legacy = legacy_logger(log_dir)
+    queued = Logger.get_logger("bench.queued")
+    
+    results = {
+        "before: INFO, f-string": per_call_us(lambda: legacy.info(f"Clicking on element: {LOCATOR}"), args.calls),
+        "before: DEBUG off, f-string": per_call_us(lambda: legacy.debug(f"Finding element: {LOCATOR}"), args.calls),
+        "after: INFO, lazy": per_call_us(lambda: queued.info("Clicking on element: %s", LOCATOR), args.calls),
+        "after: DEBUG off, lazy": per_call_us(lambda: queued.debug("Finding element: %s", LOCATOR), args.calls),
+    }
+    drain_start = time.perf_counter()
+    Logger.flush()
+    drain = time.perf_counter() - drain_start
+    sys.stderr = sys.__stderr__
+    
+    for name, value in results.items():
+        print(f"{name:<30}{value:>10.2f} us/call")
+    print(f"{'background drain after run':<30}{drain * 1000:>10.2f} ms total")
+
+
+if __name__ == '__main__':
+    main()
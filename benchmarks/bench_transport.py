@@ -0,0 +1,109 @@
+"""
+Transport Benchmark
+Compares per-command latency and connection churn of the Appium HTTP transports
+
+Usage:
+    python -m benchmarks.bench_transport --sessions 4 --commands 300 --latency 0.002
+"""
+import time
+import argparse
+import statistics
+import threading
+from typing import Dict, Any, List
+from appium import webdriver
+from appium.options.android import UiAutomator2Options
+from appium.webdriver.appium_connection import AppiumConnection
+from appium.webdriver.common.appiumby import AppiumBy
+from base.driver_factory import PooledAppiumConnection
+from util.fake_appium_server import FakeAppiumServer
+
+
+TRANSPORTS = {
+    "no-keep-alive": lambda url: AppiumConnection(url, keep_alive=False),
+    "default": lambda url: url,
+    "pooled": lambda url: PooledAppiumConnection(url, settings={'pool_maxsize': 4}),
+}
+
+
+def run_session(url: str, transport: str, commands: int, latencies: List[float]):
+    """
+    Drive one session with a typical page object command mix
+    
+    Args:
+        url: Fake server URL
+        transport: Key of TRANSPORTS
+        commands: Number of commands to send
+        latencies: List the per-command latencies are appended to
+    """
+    driver = webdriver.Remote(TRANSPORTS[transport](url), options=UiAutomator2Options())
+    try:
+        driver.implicitly_wait(0)
+        actions = [
+            lambda: driver.find_element(AppiumBy.ACCESSIBILITY_ID, "Sign In"),
+            lambda: driver.find_element(AppiumBy.XPATH, "//android.widget.TextView[@text='Welcome']").is_displayed(),
+            lambda: driver.find_element(AppiumBy.ID, "search").text,
+        ]
+        for index in range(commands):
+            start = time.perf_counter()
+            actions[index % len(actions)]()
+            latencies.append(time.perf_counter() - start)
+    finally:
+        driver.quit()
+
+
+def benchmark(transport: str, sessions: int, commands: int, latency: float) -> Dict[str, Any]:
+    """
+    Run concurrent sessions over one transport against a fresh fake server
+    
+    Args:
+        transport: Key of TRANSPORTS
+        sessions: Concurrent sessions, like xdist workers
+        commands: Page object actions per session
+        latency: Server side delay per request in seconds
+        
+    Returns:
+        dict: Latency percentiles in ms and TCP connections accepted by the server
+    """
+    latencies: List[float] = []
+    with FakeAppiumServer(latency=latency) as server:
+        threads = [
+            threading.Thread(target=run_session, args=(server.url, transport, commands, latencies))
+            for _ in range(sessions)
+        ]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        wall = time.perf_counter() - start
+        connections, requests = server.connections, server.requests
+    
+    latencies.sort()
+    return {
+        "transport": transport,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        "wall_s": wall,
+        "requests": requests,
+        "connections": connections,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Appium HTTP transports")
+    parser.add_argument('--sessions', type=int, default=4)
+    parser.add_argument('--commands', type=int, default=300)
+    parser.add_argument('--latency', type=float, default=0.002, help="Server side delay per request in seconds")
+    args = parser.parse_args()
+    
+    print(f"{'transport':<15}{'p50 ms':>10}{'p95 ms':>10}{'wall s':>10}{'requests':>10}{'conns':>8}")
+    for transport in TRANSPORTS:
+        result = benchmark(transport, args.sessions, args.commands, args.latency)
+        print(
+            f"{result['transport']:<15}{result['p50_ms']:>10.2f}{result['p95_ms']:>10.2f}"
+            f"{result['wall_s']:>10.2f}{result['requests']:>10}{result['connections']:>8}"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -11,7 +11,9 @@ BLUE='\033[0;34m'
 NC='\033[0m' # No Color
 
 APP_PACKAGE="com.mumzworld.android"
-APP_ACTIVITY="com.mumzworld.android.MainActivity"
+
+# Shared with pytest so it reuses this preflight report
+export TEST_RUN_ID="${TEST_RUN_ID:-$(date +%Y%m%d_%H%M%S)}"
 
 echo -e "${BLUE}================================================${NC}"
 echo -e "${BLUE}   Mumzworld Mobile Test Automation${NC}"
@@ -65,61 +67,28 @@ check_appium() {
     fi
 }
 
-# Function to check app installation
-check_app_installation() {
+# Function to check app installation and launch it on every device
+run_preflight() {
     echo ""
-    echo -e "${YELLOW}Step 3: Checking application installation...${NC}"
+    echo -e "${YELLOW}Step 3: Checking application and launching it...${NC}"
     
-    if adb shell pm list packages | grep -q "$APP_PACKAGE"; then
-        echo -e "${GREEN}✓ Application $APP_PACKAGE is installed${NC}"
-        
-        # Get app version
-        VERSION=$(adb shell dumpsys package $APP_PACKAGE | grep versionName | head -1 | awk '{print $1}')
-        echo -e "${BLUE}  Version: $VERSION${NC}"
-        
-        return 0
+    # Polls the focused window instead of sleeping; pytest reuses the report
+    if python3 -m util.preflight; then
+        echo -e "${GREEN}✓ App is installed, in foreground and ready${NC}"
+        echo -e "${BLUE}  Report: test_reports/preflight.json${NC}"
     else
-        echo -e "${RED}✗ Application $APP_PACKAGE is NOT installed${NC}"
+        echo -e "${RED}✗ Preflight failed for $APP_PACKAGE${NC}"
         echo -e "${YELLOW}Please install the app first using:${NC}"
         echo -e "${BLUE}  adb install path/to/app.apk${NC}"
         exit 1
     fi
 }
 
-# Function to launch app
-launch_app() {
-    echo ""
-    echo -e "${YELLOW}Step 4: Launching application...${NC}"
-    
-    # Clear app data for fresh start (optional)
-    # adb shell pm clear $APP_PACKAGE
-    
-    # Launch the app
-    adb shell am start -n "$APP_PACKAGE/$APP_ACTIVITY" > /dev/null 2>&1
-    
-    if [ $? -eq 0 ]; then
-        echo -e "${GREEN}✓ Application launched successfully${NC}"
-        echo -e "${YELLOW}Waiting for app to initialize...${NC}"
-        sleep 5
-        
-        # Verify app is in foreground
-        CURRENT_APP=$(adb shell dumpsys window windows | grep -E 'mCurrentFocus' | cut -d'/' -f1 | rev | cut -d' ' -f1 | rev)
-        if [[ "$CURRENT_APP" == *"$APP_PACKAGE"* ]]; then
-            echo -e "${GREEN}✓ App is in foreground and ready${NC}"
-        else
-            echo -e "${YELLOW}⚠ App may not be in foreground${NC}"
-        fi
-    else
-        echo -e "${RED}✗ Failed to launch application${NC}"
-        exit 1
-    fi
-}
-
 # Function to run tests
 run_tests() {
     echo ""
     echo -e "${BLUE}================================================${NC}"
-    echo -e "${YELLOW}Step 5: Running test cases...${NC}"
+    echo -e "${YELLOW}Step 4: Running test cases...${NC}"
     echo -e "${BLUE}================================================${NC}"
     echo ""
     
@@ -150,8 +119,7 @@ run_tests() {
 main() {
     check_device
     check_appium
-    check_app_installation
-    launch_app
+    run_preflight
     run_tests
     
     EXIT_CODE=$?
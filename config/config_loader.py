@@ -0,0 +1,208 @@
+"""
+Config Loader Module
+Cached access to config/config.yaml with typed getters and environment overrides
+"""
+import os
+import copy
+import threading
+from typing import Dict, Any, Optional
+from util.common_utils import CommonUtils
+from util.logger import Logger
+
+
+class ConfigLoader:
+    """
+    Reads config.yaml once per process and builds Appium capability profiles
+    
+    Values are addressed by dotted path ('android.app_package'). A getter
+    given an environment variable name returns the variable when it is set
+    and the YAML value otherwise, converted to the getter's type.
+    """
+    
+    logger = Logger.get_logger(__name__)
+    
+    TRUE_VALUES = ('1', 'true', 'yes', 'on')
+    
+    # Environment variables that override a platform setting, kept from the .env template
+    PLATFORM_ENV = {
+        'android': {
+            'device_name': 'ANDROID_DEVICE_NAME',
+            'app_path': 'ANDROID_APP_PATH',
+            'app_package': 'APP_PACKAGE',
+            'app_activity': 'APP_ACTIVITY',
+        },
+        'ios': {
+            'device_name': 'IOS_DEVICE_NAME',
+            'app_path': 'IOS_APP_PATH',
+            'bundle_id': 'BUNDLE_ID',
+        },
+    }
+    
+    # Name parts that are upper case in capability names (use_prebuilt_wda -> usePrebuiltWDA)
+    ACRONYMS = {'wda': 'WDA'}
+    
+    # Platform settings that are not Appium capabilities
+    NON_CAPABILITY_KEYS = ('app_path', 'warm_capabilities')
+    
+    _lock = threading.Lock()
+    _config: Optional[Dict[str, Any]] = None
+    _config_path = os.path.join(CommonUtils.get_project_root(), "config", "config.yaml")
+    
+    @classmethod
+    def load(cls) -> Dict[str, Any]:
+        """
+        Get the parsed config.yaml, reading it on first use
+        
+        Returns:
+            dict: Whole configuration
+        """
+        if cls._config is None:
+            with cls._lock:
+                if cls._config is None:
+                    path = os.getenv('CONFIG_PATH', cls._config_path)
+                    if os.path.exists(path):
+                        cls._config = CommonUtils.read_yaml_file(path) or {}
+                    else:
+                        cls.logger.warning("Config file not found: %s", path)
+                        cls._config = {}
+        return cls._config
+    
+    @classmethod
+    def reload(cls):
+        """Forget the cached configuration so the next access reads the file again"""
+        with cls._lock:
+            cls._config = None
+    
+    @classmethod
+    def section(cls, name: str) -> Dict[str, Any]:
+        """
+        Get a top-level section
+        
+        Args:
+            name: Section name, e.g. 'transport'
+            
+        Returns:
+            dict: Copy of the section, empty if missing
+        """
+        return copy.deepcopy(cls.load().get(name) or {})
+    
+    @classmethod
+    def get(cls, path: str, default: Any = None, env: Optional[str] = None) -> Any:
+        """
+        Get a raw value
+        
+        Args:
+            path: Dotted path, e.g. 'test.explicit_wait'
+            default: Value when neither the variable nor the path is set
+            env: Environment variable overriding the YAML value
+            
+        Returns:
+            Any: Environment string, YAML value or default
+        """
+        if env and os.getenv(env) is not None:
+            return os.getenv(env)
+        value = cls.load()
+        for key in path.split('.'):
+            if not isinstance(value, dict) or key not in value:
+                return default
+            value = value[key]
+        return default if value is None else value
+    
+    @classmethod
+    def get_str(cls, path: str, default: str = "", env: Optional[str] = None) -> str:
+        """Get a value as a string"""
+        return str(cls.get(path, default, env))
+    
+    @classmethod
+    def get_int(cls, path: str, default: int = 0, env: Optional[str] = None) -> int:
+        """Get a value as an integer"""
+        return int(cls.get(path, default, env))
+    
+    @classmethod
+    def get_float(cls, path: str, default: float = 0.0, env: Optional[str] = None) -> float:
+        """Get a value as a float"""
+        return float(cls.get(path, default, env))
+    
+    @classmethod
+    def get_bool(cls, path: str, default: bool = False, env: Optional[str] = None) -> bool:
+        """Get a value as a boolean; strings count as true for 1/true/yes/on"""
+        value = cls.get(path, default, env)
+        if isinstance(value, str):
+            return value.lower() in cls.TRUE_VALUES
+        return bool(value)
+    
+    @classmethod
+    def get_profile_name(cls) -> str:
+        """
+        Get the capability profile used for new sessions
+        
+        Returns:
+            str: CAPABILITY_PROFILE, else capability_profiles.active, else 'default'
+        """
+        return cls.get_str('capability_profiles.active', 'default', env='CAPABILITY_PROFILE')
+    
+    @classmethod
+    def capability_profile(cls, platform: str, profile: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Build the settings of a platform with a profile applied
+        
+        The platform section is the base, the profile's keys override it
+        and the platform environment variables override both. Keys are the
+        snake_case names used in config.yaml (no_reset, app_activity, ...).
+        
+        Args:
+            platform: 'android' or 'ios'
+            profile: Profile name, defaults to get_profile_name()
+            
+        Returns:
+            dict: Platform settings, with the profile's capabilities that are only
+                safe on an already initialized device under 'warm_capabilities'
+                
+        Raises:
+            ValueError: If the profile is not defined
+        """
+        platform = platform.lower()
+        profile = profile or cls.get_profile_name()
+        settings = cls.section(platform)
+        
+        profiles = cls.section('capability_profiles')
+        if profile != 'default' and profile not in profiles:
+            raise ValueError(f"Unknown capability profile: {profile}")
+        overrides = profiles.get(profile) or {}
+        settings.update(overrides.get('capabilities') or {})
+        settings.update((overrides.get(platform) or {}).get('capabilities') or {})
+        settings['warm_capabilities'] = {
+            **(overrides.get('warm_capabilities') or {}),
+            **((overrides.get(platform) or {}).get('warm_capabilities') or {}),
+        }
+        
+        for key, env in cls.PLATFORM_ENV.get(platform, {}).items():
+            if os.getenv(env) is not None:
+                settings[key] = os.getenv(env)
+        settings['profile'] = profile
+        return settings
+    
+    @classmethod
+    def to_capabilities(cls, settings: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Convert snake_case settings to Appium capability names
+        
+        Args:
+            settings: Output of capability_profile() or its warm_capabilities
+            
+        Returns:
+            dict: Capabilities, e.g. {'appium:noReset': True}
+        """
+        capabilities = {}
+        for key, value in settings.items():
+            if key in cls.NON_CAPABILITY_KEYS or key == 'profile' or value in (None, ""):
+                continue
+            if key == 'platform_name':
+                capabilities['platformName'] = value
+                continue
+            head, *rest = key.split('_')
+            tail = ''.join(cls.ACRONYMS.get(part, part.capitalize()) for part in rest)
+            capabilities[f"appium:{head}{tail}"] = value
+        if settings.get('app_path'):
+            capabilities['appium:app'] = settings['app_path']
+        return capabilities
@@ -8,6 +8,8 @@ logger = Logger.get_logger(__name__)
 
 class AccountPage(BasePage):
     
+    USE_SNAPSHOT = True
+    
     ACCOUNT_TAB = (By.XPATH, "//android.widget.Button[@content-desc='Account']")
     SIGN_IN_BUTTON = (By.XPATH, '(//android.widget.TextView[@text="Sign In"])[2]')
     
@@ -28,12 +30,14 @@ class AccountPage(BasePage):
         
         logger.info("Clicking on Account tab")
         self.click(self.ACCOUNT_TAB)
+        self.wait_for_ui_idle()
     
     def click_sign_in_button(self):
         
         logger.info("Clicking on Sign In button")
         self.wait_for_element_clickable(self.SIGN_IN_BUTTON, timeout=10)
         self.click(self.SIGN_IN_BUTTON)
+        self.wait_for_ui_idle()
     
     def is_account_info_displayed(self):
         
@@ -55,9 +59,8 @@ class AccountPage(BasePage):
        
         logger.info("Checking if user is logged in")
         try:
-            # If Sign In button is not visible, user is logged in
-            sign_in_visible = self.is_element_displayed(self.SIGN_IN_BUTTON, timeout=3)
-            return not sign_in_visible
+            # If Sign In button stays hidden while the screen settles, user is logged in
+            return self.is_element_absent(self.SIGN_IN_BUTTON, stability_window=1)
         except:
             return True  # If button not found, assume logged in
 
@@ -1,10 +1,14 @@
+from base.base_component import BaseComponent
 from base.base_page import BasePage
 from selenium.webdriver.common.by import By
+from selenium.common.exceptions import NoSuchElementException
 from util.logger import Logger
 
 logger = Logger.get_logger(__name__)
 
 class CartPage(BasePage):
+    USE_SNAPSHOT = True
+    
     CART_TAB = (By.XPATH, "//android.widget.Button[@content-desc='Cart']")
     CART_ITEM = (By.ID, "com.mumzworld.android:id/cart_item")
     CART_ITEM_NAME = (By.ID, "com.mumzworld.android:id/cart_item_name")
@@ -12,6 +16,7 @@ class CartPage(BasePage):
     CART_ITEM_QUANTITY = (By.ID, "com.mumzworld.android:id/cart_item_quantity")
     EMPTY_CART_MESSAGE = (By.XPATH, "//android.widget.TextView[contains(@text,'empty') or contains(@text,'Empty')]")
     CART_BADGE = (By.ID, "com.mumzworld.android:id/cart_badge")
+    REMOVE_ITEM_BUTTON = (By.ID, "com.mumzworld.android:id/cart_item_remove")
     
    
     CHECKOUT_BUTTON = (By.ID, "com.mumzworld.android:id/btnCheckout")
@@ -25,38 +30,43 @@ class CartPage(BasePage):
         
         logger.info("Clicking on cart tab")
         self.click(self.CART_TAB)
+        self.wait_for_ui_idle()
     
     def is_cart_page_displayed(self):
         
         logger.info("Verifying cart page is displayed")
-        return self.is_element_displayed(self.CHECKOUT_BUTTON) or \
-               self.is_element_displayed(self.CART_ITEM)
+        snapshot = self.wait_for_snapshot(
+            lambda s: s.is_displayed(self.CHECKOUT_BUTTON) or s.is_displayed(self.CART_ITEM)
+        )
+        return snapshot is not None
     
     def is_item_in_cart(self):
         
         logger.info("Checking if item is present in cart")
         try:
             
-            if self.is_element_displayed(self.CART_ITEM):
+            snapshot = self.wait_for_snapshot(
+                lambda s: s.is_displayed(self.CART_ITEM) or s.is_displayed(self.EMPTY_CART_MESSAGE)
+            )
+            if snapshot is None:
                 return True
             
-            return not self.is_element_displayed(self.EMPTY_CART_MESSAGE)
+            return snapshot.is_displayed(self.CART_ITEM) or not snapshot.is_displayed(self.EMPTY_CART_MESSAGE)
         except:
             return False
     
     def get_cart_item_name(self):
         
         logger.info("Getting cart item name")
-        return self.get_text(self.CART_ITEM_NAME)
+        items = self.get_cart_items()
+        if not items:
+            raise NoSuchElementException("Cart has no items")
+        return items[0].get_name()
     
-    def get_cart_items_count(self):
+    def get_cart_items_count(self, timeout: float = 10):
        
         logger.info("Getting cart items count")
-        try:
-            items = self.driver.find_elements(*self.CART_ITEM)
-            return len(items)
-        except:
-            return 0
+        return len(self.get_cart_items(timeout))
     
     def is_cart_badge_displayed(self):
         
@@ -67,4 +77,56 @@ class CartPage(BasePage):
         
         logger.info("Getting cart badge count")
         return self.get_text(self.CART_BADGE)
+    
+    def remove_all_items(self, max_items: int = 50):
+        
+        logger.info("Removing all items from cart")
+        for _ in range(max_items):
+            snapshot = self.wait_for_snapshot(
+                lambda s: s.is_displayed(self.REMOVE_ITEM_BUTTON) or s.is_displayed(self.EMPTY_CART_MESSAGE)
+            )
+            if snapshot is None or not snapshot.is_displayed(self.REMOVE_ITEM_BUTTON):
+                return
+            self.click(self.REMOVE_ITEM_BUTTON)
+            self.wait_for_ui_idle()
+        raise RuntimeError(f"Cart still has items after removing {max_items}")
+
+    def get_cart_items(self, timeout: float = 10):
+        
+        logger.info("Getting cart items")
+        return self.find_components(CartItem, timeout)
+    
+    def find_cart_item(self, name: str, timeout: float = 10):
+        
+        logger.info(f"Finding cart item: {name}")
+        for item in self.get_cart_items(timeout):
+            if item.get_name() == name:
+                return item
+        return None
+
 
+class CartItem(BaseComponent):
+    ROOT = CartPage.CART_ITEM
+    
+    NAME = CartPage.CART_ITEM_NAME
+    PRICE = CartPage.CART_ITEM_PRICE
+    QUANTITY = CartPage.CART_ITEM_QUANTITY
+    REMOVE_BUTTON = CartPage.REMOVE_ITEM_BUTTON
+    
+    def get_name(self):
+        
+        return self.get_text(self.NAME)
+    
+    def get_price(self):
+        
+        return self.get_text(self.PRICE)
+    
+    def get_quantity(self):
+        
+        return self.get_text(self.QUANTITY)
+    
+    def remove(self):
+        
+        logger.info(f"Removing cart item {self.index + 1} of {self.count}")
+        self.click(self.REMOVE_BUTTON)
+        self.page.wait_for_ui_idle()
@@ -31,6 +31,8 @@ class LoginPage(BasePage):
         
         self.logger.info("Clicking sign in button")
         self.click(self.SIGN_IN_BUTTON)
+        # Signing in goes over the network, allow the screen longer to settle
+        self.wait_for_ui_idle(timeout=10)
     
     def login(self, email: str, password: str):
         
@@ -0,0 +1,92 @@
+from typing import Optional
+from base.navigator import NavigationGraph, Navigator, Screen
+from config.config_loader import ConfigLoader
+from pageObjects.account_page import AccountPage
+from pageObjects.cart_page import CartPage
+from pageObjects.login_page import LoginPage
+from pageObjects.product_page import ProductPage
+
+
+class Screens:
+
+    # Any main tab; the specific tab screens inherit its tab bar edges
+    TABS = Screen("tabs", [CartPage.CART_TAB, AccountPage.ACCOUNT_TAB])
+
+    LOGIN = Screen("login", [LoginPage.EMAIL_FIELD, LoginPage.PASSWORD_FIELD])
+    SEARCH = Screen("search", [ProductPage.SEARCH_FIELD])
+    PRODUCT_DETAIL = Screen("product_detail", [ProductPage.ADD_TO_CART_BUTTON, ProductPage.ADD_TO_CART_BUTTON_ALT])
+    SEARCH_RESULTS = Screen("search_results", [ProductPage.ADD_ICON, ProductPage.PLUS_ICON,
+                                               ProductPage.ADD_BUTTON_GENERIC])
+    CART = Screen("cart", [CartPage.CHECKOUT_BUTTON, CartPage.CART_ITEM, CartPage.EMPTY_CART_MESSAGE], parent=TABS)
+    ACCOUNT = Screen("account", [AccountPage.HI_THERE_TEXT, AccountPage.MY_ORDERS, AccountPage.MY_PROFILE],
+                     parent=TABS)
+    EXPLORE = Screen("explore", [ProductPage.SEARCH_ICON], parent=TABS)
+
+
+def _open_search_results(driver, query: str = "", **_):
+
+    page = ProductPage(driver)
+    page.send_keys(page.SEARCH_FIELD, query, clear=False, timeout=10)
+    page.wait_for_ui_idle()
+    page.select_first_search_suggestion()
+
+
+_graph: Optional[NavigationGraph] = None
+
+
+def get_graph() -> NavigationGraph:
+
+    global _graph
+    if _graph is not None:
+        return _graph
+
+    graph = NavigationGraph()
+    # Specific screens first, the generic tab bar last
+    for screen in (Screens.LOGIN, Screens.SEARCH, Screens.PRODUCT_DETAIL, Screens.SEARCH_RESULTS,
+                   Screens.CART, Screens.ACCOUNT, Screens.EXPLORE, Screens.TABS):
+        graph.add_screen(screen)
+
+    graph.add_ui_edge(Screens.TABS, Screens.EXPLORE, lambda driver, **_: ProductPage(driver).click_explore_button())
+    graph.add_ui_edge(Screens.TABS, Screens.CART, lambda driver, **_: CartPage(driver).click_cart_tab())
+    graph.add_ui_edge(Screens.TABS, Screens.ACCOUNT, lambda driver, **_: AccountPage(driver).click_account_tab())
+    graph.add_ui_edge(Screens.EXPLORE, Screens.SEARCH, lambda driver, **_: ProductPage(driver).click_search_icon())
+    graph.add_ui_edge(Screens.SEARCH, Screens.SEARCH_RESULTS, _open_search_results, cost=6.0)
+    graph.add_ui_edge(Screens.ACCOUNT, Screens.LOGIN, lambda driver, **_: AccountPage(driver).click_sign_in_button())
+
+    # Deep links are usable from any screen; screens without a configured URL are UI only
+    screens = {screen.name: screen for screen in graph.screens}
+    for name, url in ConfigLoader.section('navigation').get('deep_links', {}).items():
+        if name in screens:
+            graph.add_deep_link(screens[name], url, cost=ConfigLoader.get_float('navigation.deep_link_cost', 2.0))
+
+    _graph = graph
+    return graph
+
+
+def navigator(driver) -> Navigator:
+
+    return Navigator(driver, get_graph())
+
+
+def sign_in(driver, email: str, password: str):
+
+    navigator(driver).navigate_to(Screens.LOGIN)
+    LoginPage(driver).login(email, password)
+
+
+def is_signed_in(driver) -> bool:
+
+    navigator(driver).navigate_to(Screens.ACCOUNT)
+    return AccountPage(driver).is_logged_in()
+
+
+def empty_cart(driver):
+
+    navigator(driver).navigate_to(Screens.CART)
+    CartPage(driver).remove_all_items()
+
+
+# Dirty account state (AccountPool dirtying markers) -> flow restoring it
+ACCOUNT_RESETS = {
+    'cart': empty_cart,
+}
@@ -1,5 +1,7 @@
+from base.base_component import BaseComponent
 from base.base_page import BasePage
 from selenium.webdriver.common.by import By
+from selenium.common.exceptions import TimeoutException
 from util.logger import Logger
 
 
@@ -17,7 +19,8 @@ class ProductPage(BasePage):
     SEARCH_SUGGESTIONS = (By.XPATH, "//android.widget.TextView")
     
     
-    PRODUCT_ITEM = (By.XPATH, "//android.view.ViewGroup[@clickable='true' and @enabled='true']")
+    # Tiles are the cells of the results list; nested clickables (add buttons) and header buttons are not
+    PRODUCT_ITEM = (By.XPATH, "//android.widget.ScrollView/android.view.ViewGroup/android.view.ViewGroup[@clickable='true' and @enabled='true']")
     PRODUCT_NAME = (By.XPATH, "//android.widget.TextView")
     
     
@@ -45,13 +48,14 @@ class ProductPage(BasePage):
         logger.info("Clicking on Explore button")
         self.wait_for_element_clickable(self.EXPLORE_BUTTON, timeout=10)
         self.click(self.EXPLORE_BUTTON)
-        self.driver.implicitly_wait(2)
+        self.wait_for_ui_idle()
     
     def click_search_icon(self):
         
         logger.info("Clicking on search icon")
         self.wait_for_element_clickable(self.SEARCH_ICON, timeout=10)
         self.click(self.SEARCH_ICON)
+        self.wait_for_ui_idle()
     
     def enter_search_text(self, search_text):
         
@@ -61,27 +65,24 @@ class ProductPage(BasePage):
         
         self.click_search_icon()
        
-        self.driver.implicitly_wait(3)
-        
         logger.info("Finding search field")
-        search_field = self.find_element(self.SEARCH_FIELD, timeout=10)
-        search_field.send_keys(search_text)
+        self.send_keys(self.SEARCH_FIELD, search_text, clear=False, timeout=10)
         
-        self.driver.implicitly_wait(2)
+        # Wait for the suggestion dropdown to finish rendering
+        self.wait_for_ui_idle()
     
     def select_first_search_suggestion(self):
        
         logger.info("Selecting first search suggestion from dropdown")
         
-        self.driver.implicitly_wait(3)
         try:
             suggestions = self.find_elements(self.SEARCH_SUGGESTIONS, timeout=10)
             if suggestions and len(suggestions) > 0:
                 logger.info(f"Found {len(suggestions)} search suggestions")
             
-                suggestions[0].click()
+                self.click(self.SEARCH_SUGGESTION_FIRST)
                 logger.info("Clicked first search suggestion")
-                self.driver.implicitly_wait(2)
+                self.wait_for_ui_idle()
             else:
                 raise Exception("No search suggestions found")
         except Exception as e:
@@ -92,26 +93,13 @@ class ProductPage(BasePage):
         
         logger.info("Clicking on + icon to add to cart")
         
-        self.driver.implicitly_wait(3)
         try:
             
-            try:
-                logger.info("Trying ADD_ICON locator")
-                self.wait_for_element_clickable(self.ADD_ICON, timeout=10)
-                self.click(self.ADD_ICON)
-                logger.info("Clicked add icon")
-            except:
-                try:
-                    logger.info("Trying PLUS_ICON locator")
-                    self.wait_for_element_clickable(self.PLUS_ICON, timeout=5)
-                    self.click(self.PLUS_ICON)
-                    logger.info("Clicked plus icon")
-                except:
-                    logger.info("Trying ADD_BUTTON_GENERIC locator")
-                    self.wait_for_element_clickable(self.ADD_BUTTON_GENERIC, timeout=5)
-                    self.click(self.ADD_BUTTON_GENERIC)
-                    logger.info("Clicked add button")
-            self.driver.implicitly_wait(2)
+            clicked = self.click_first_of(
+                [self.ADD_ICON, self.PLUS_ICON, self.ADD_BUTTON_GENERIC], timeout=10
+            )
+            logger.info(f"Clicked add icon using {clicked}")
+            self.wait_for_ui_idle()
         except Exception as e:
             logger.error(f"Error clicking add icon: {str(e)}")
             raise
@@ -120,10 +108,14 @@ class ProductPage(BasePage):
         
         logger.info("Verifying Product Detail Page is displayed")
         try:
-            return self.is_element_displayed(self.PDP_TITLE) and \
-                   self.is_element_displayed(self.ADD_TO_CART_BUTTON)
-        except:
-            return self.is_element_displayed(self.ADD_TO_CART_BUTTON_ALT)
+            button, _ = self.wait_for_first_of(
+                [self.ADD_TO_CART_BUTTON, self.ADD_TO_CART_BUTTON_ALT], timeout=10, condition="visible"
+            )
+        except TimeoutException:
+            return False
+        if button == self.ADD_TO_CART_BUTTON:
+            return self.is_element_displayed(self.PDP_TITLE)
+        return True
     
     def get_product_title(self):
         
@@ -133,11 +125,7 @@ class ProductPage(BasePage):
     def click_add_to_cart_button(self):
         
         logger.info("Clicking on Add to Cart button")
-        try:
-            self.click(self.ADD_TO_CART_BUTTON)
-        except:
-            logger.info("Trying alternate Add to Cart button locator")
-            self.click(self.ADD_TO_CART_BUTTON_ALT)
+        self.click_first_of([self.ADD_TO_CART_BUTTON, self.ADD_TO_CART_BUTTON_ALT])
     
     def is_cart_success_message_displayed(self):
         
@@ -147,3 +135,39 @@ class ProductPage(BasePage):
         except:
             return False
 
+    def get_search_results(self, timeout: float = 10):
+
+        logger.info("Getting search results")
+        return self.find_components(SearchResult, timeout)
+    
+    def find_search_result(self, name: str, timeout: float = 10):
+        
+        logger.info(f"Finding search result: {name}")
+        for result in self.get_search_results(timeout):
+            if result.get_name() == name:
+                return result
+        return None
+
+
+class SearchResult(BaseComponent):
+    ROOT = ProductPage.PRODUCT_ITEM
+    
+    NAME = ProductPage.PRODUCT_NAME
+    ADD_BUTTONS = [ProductPage.ADD_ICON, ProductPage.PLUS_ICON, ProductPage.ADD_BUTTON_GENERIC]
+    
+    def get_name(self):
+        
+        return self.get_text(self.NAME)
+    
+    def open(self):
+        
+        logger.info(f"Opening search result {self.index + 1} of {self.count}")
+        self.click()
+        self.page.wait_for_ui_idle()
+    
+    def add_to_cart(self, timeout: float = 10):
+        
+        logger.info(f"Adding search result {self.index + 1} of {self.count} to cart")
+        clicked = self.click_first_of(self.ADD_BUTTONS, timeout)
+        self.page.wait_for_ui_idle()
+        return clicked
@@ -1,6 +1,7 @@
 import os
 from datetime import datetime
-from typing import Dict, List
+from typing import Dict, List, Optional
+from reports.results_store import ResultsStore
 from util.logger import Logger
 from util.common_utils import CommonUtils
 
@@ -10,11 +11,17 @@ class ReportGenerator:
     
     logger = Logger.get_logger(__name__)
     
-    def __init__(self):
-        """Initialize Report Generator"""
+    def __init__(self, results_store: Optional[ResultsStore] = None):
+        """
+        Initialize Report Generator
+        
+        Args:
+            results_store: Store the summaries are queried from
+        """
         self.project_root = CommonUtils.get_project_root()
         self.reports_dir = os.path.join(self.project_root, "test_reports")
         CommonUtils.create_directory(self.reports_dir)
+        self.results_store = results_store or ResultsStore()
     
     def get_html_report_path(self) -> str:
         """
@@ -43,23 +50,27 @@ class ReportGenerator:
         self.logger.info(f"Allure results directory: {allure_dir}")
         return allure_dir
     
-    def generate_summary_report(self, test_results: Dict) -> str:
+    def generate_summary_report(self, test_results: Optional[Dict] = None, run_id: Optional[str] = None) -> str:
         """
         Generate summary report
         
         Args:
-            test_results: Dictionary containing test results
+            test_results: Dictionary containing test results, queried from the results store if omitted
+            run_id: Run to summarize from the store, defaults to the current run
             
         Returns:
             str: Path to generated report
         """
         self.logger.info("Generating summary report")
+        if test_results is None:
+            test_results = self.results_store.summary(run_id or Logger.get_run_id())
         
         timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         total_tests = test_results.get('total', 0)
         passed = test_results.get('passed', 0)
         failed = test_results.get('failed', 0)
         skipped = test_results.get('skipped', 0)
+        errors = test_results.get('error', 0)
         
         pass_rate = (passed / total_tests * 100) if total_tests > 0 else 0
         
@@ -73,6 +84,7 @@ class ReportGenerator:
         Passed:         {passed}
         Failed:         {failed}
         Skipped:        {skipped}
+        Errors:         {errors}
         Pass Rate:      {pass_rate:.2f}%
         ================================================
         """
@@ -91,6 +103,34 @@ class ReportGenerator:
         self.logger.info(f"Summary report saved to: {summary_file}")
         return summary_file
     
+    def generate_history_report(self, limit: int = 20) -> str:
+        """
+        Generate a pass rate and duration history of recent runs
+        
+        Args:
+            limit: Number of runs to include
+            
+        Returns:
+            str: Path to generated report
+        """
+        self.logger.info("Generating history report")
+        lines = [
+            f"{'Run':<20}{'Total':>8}{'Passed':>8}{'Failed':>8}{'Skipped':>9}{'Errors':>8}{'Pass Rate':>11}{'Duration':>11}"
+        ]
+        for run in self.results_store.history(limit):
+            pass_rate = (run['passed'] / run['total'] * 100) if run['total'] > 0 else 0
+            lines.append(
+                f"{run['run_id']:<20}{run['total']:>8}{run['passed']:>8}{run['failed']:>8}{run['skipped']:>9}"
+                f"{run['error']:>8}{pass_rate:>10.2f}%{run['duration']:>10.1f}s"
+            )
+        
+        history_file = os.path.join(self.reports_dir, f"history_{CommonUtils.get_timestamp()}.txt")
+        with open(history_file, 'w') as f:
+            f.write("\n".join(lines) + "\n")
+        
+        self.logger.info(f"History report saved to: {history_file}")
+        return history_file
+    
     def cleanup_old_reports(self, days: int = 7):
         """
         Clean up old report files
@@ -0,0 +1,180 @@
+"""
+Results Store Module
+SQLite store of per-test outcomes shared by all xdist workers
+"""
+import os
+import json
+import sqlite3
+import threading
+import time
+from typing import Dict, Any, List, Optional
+from util.common_utils import CommonUtils
+from util.logger import Logger
+
+
+class ResultsStore:
+    """
+    Append-only test results, written as each outcome is reported
+    
+    Workers write to one SQLite database in WAL mode, so concurrent
+    inserts do not block readers and every aggregate is computed by
+    SQLite instead of in Python memory.
+    """
+    
+    logger = Logger.get_logger(__name__)
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS results (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            run_id TEXT NOT NULL,
+            nodeid TEXT NOT NULL,
+            phase TEXT NOT NULL,
+            outcome TEXT NOT NULL,
+            duration REAL NOT NULL,
+            worker TEXT,
+            device TEXT,
+            retries INTEGER NOT NULL DEFAULT 0,
+            artifacts TEXT,
+            message TEXT,
+            finished_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_results_run ON results (run_id, outcome);
+        CREATE INDEX IF NOT EXISTS idx_results_node ON results (nodeid, run_id);
+    """
+    
+    def __init__(self, db_path: Optional[str] = None):
+        """
+        Initialize results store
+        
+        Args:
+            db_path: SQLite file, defaults to RESULTS_DB or test_reports/results.db
+        """
+        self.db_path = db_path or os.getenv(
+            'RESULTS_DB', os.path.join(CommonUtils.get_project_root(), "test_reports", "results.db")
+        )
+        self._local = threading.local()
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Get this thread's connection, creating the schema on first use"""
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+            connection = sqlite3.connect(self.db_path, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(self.SCHEMA)
+            self._local.connection = connection
+        return connection
+    
+    def record(self, run_id: str, nodeid: str, phase: str, outcome: str, duration: float,
+               worker: Optional[str] = None, device: Optional[str] = None, retries: int = 0,
+               artifacts: Optional[List[Dict[str, str]]] = None, message: Optional[str] = None):
+        """
+        Append one test outcome
+        
+        Args:
+            run_id: Test run id
+            nodeid: Pytest node id
+            phase: 'setup', 'call' or 'teardown'
+            outcome: 'passed', 'failed', 'skipped' or 'error'
+            duration: Phase duration in seconds
+            worker: xdist worker id
+            device: Device the test ran on
+            retries: Rerun number of this attempt
+            artifacts: List of {'name', 'path'} of screenshots, videos, timelines
+            message: Failure or skip reason
+        """
+        connection = self._connect()
+        with connection:
+            connection.execute(
+                "INSERT INTO results (run_id, nodeid, phase, outcome, duration, worker, device, retries, "
+                "artifacts, message, finished_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (run_id, nodeid, phase, outcome, duration, worker, device, retries,
+                 json.dumps(artifacts or []), message, time.time())
+            )
+    
+    def summary(self, run_id: str) -> Dict[str, Any]:
+        """
+        Aggregate the outcomes of a run
+        
+        Args:
+            run_id: Test run id
+            
+        Returns:
+            dict: total, passed, failed, skipped, error counts, total duration and per-worker counts
+        """
+        connection = self._connect()
+        counts = {'passed': 0, 'failed': 0, 'skipped': 0, 'error': 0}
+        duration = 0.0
+        for outcome, count, seconds in connection.execute(
+            "SELECT outcome, COUNT(*), SUM(duration) FROM results WHERE run_id = ? GROUP BY outcome", (run_id,)
+        ):
+            counts[outcome] = count
+            duration += seconds or 0.0
+        
+        workers = {
+            worker: {'tests': count, 'duration': seconds}
+            for worker, count, seconds in connection.execute(
+                "SELECT worker, COUNT(*), SUM(duration) FROM results WHERE run_id = ? GROUP BY worker", (run_id,)
+            )
+        }
+        return {
+            'run_id': run_id,
+            'total': sum(counts.values()),
+            **counts,
+            'duration': duration,
+            'workers': workers,
+        }
+    
+    def history(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        Summarize the most recent runs
+        
+        Args:
+            limit: Number of runs
+            
+        Returns:
+            list: One dict per run, newest first
+        """
+        rows = self._connect().execute(
+            "SELECT run_id, MIN(finished_at), "
+            "SUM(outcome = 'passed'), SUM(outcome = 'failed'), SUM(outcome = 'skipped'), SUM(outcome = 'error'), "
+            "SUM(duration) FROM results GROUP BY run_id ORDER BY MIN(finished_at) DESC LIMIT ?", (limit,)
+        )
+        return [
+            {
+                'run_id': run_id, 'started_at': started_at, 'passed': passed, 'failed': failed,
+                'skipped': skipped, 'error': error, 'total': passed + failed + skipped + error, 'duration': duration,
+            }
+            for run_id, started_at, passed, failed, skipped, error, duration in rows
+        ]
+    
+    def durations(self, recent: int = 5) -> Dict[str, float]:
+        """
+        Expected duration of every test from its recent runs
+        
+        Setup and call phases are added up, since session creation is part
+        of what a worker spends on the test. Skipped attempts are ignored.
+        
+        Args:
+            recent: Number of most recent attempts averaged per test
+            
+        Returns:
+            dict: Node id to average duration in seconds
+        """
+        rows = self._connect().execute(
+            "SELECT nodeid, AVG(duration) FROM ("
+            "  SELECT nodeid, SUM(duration) AS duration, "
+            "  ROW_NUMBER() OVER (PARTITION BY nodeid ORDER BY MAX(id) DESC) AS attempt "
+            "  FROM results WHERE phase IN ('setup', 'call') AND outcome != 'skipped' "
+            "  GROUP BY nodeid, run_id, retries"
+            ") WHERE attempt <= ? GROUP BY nodeid", (recent,)
+        )
+        return {nodeid: duration for nodeid, duration in rows}
+    
+    def close(self):
+        """Close this thread's connection"""
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
@@ -17,6 +17,9 @@ PLATFORM="android"
 MARKER="all"
 WORKERS=1
 REPORT_TYPE="html"
+MANAGED_SERVERS=false
+BALANCE=false
+CASSETTE="off"
 
 # Parse command line arguments
 while [[ $# -gt 0 ]]; do
@@ -37,6 +40,22 @@ while [[ $# -gt 0 ]]; do
       REPORT_TYPE="$2"
       shift 2
       ;;
+    --managed-servers)
+      MANAGED_SERVERS=true
+      shift
+      ;;
+    --balance)
+      BALANCE=true
+      shift
+      ;;
+    --record)
+      CASSETTE="record"
+      shift
+      ;;
+    --replay)
+      CASSETTE="replay"
+      shift
+      ;;
     --help)
       echo "Usage: ./run_tests.sh [OPTIONS]"
       echo ""
@@ -45,6 +64,10 @@ while [[ $# -gt 0 ]]; do
       echo "  --marker <marker>           Test marker (smoke, regression, all)"
       echo "  --workers <number>          Number of parallel workers (default: 1)"
       echo "  --report <html|allure>      Report type (default: html)"
+      echo "  --managed-servers           Start one local Appium server per worker"
+      echo "  --balance                   Schedule tests longest-first from recorded durations"
+      echo "  --record                    Save each test's WebDriver traffic to tests/cassettes"
+      echo "  --replay                    Run against tests/cassettes, no device or Appium server"
       echo "  --help                      Show this help message"
       echo ""
       echo "Examples:"
@@ -59,46 +82,35 @@ while [[ $# -gt 0 ]]; do
   esac
 done
 
-# Check if Appium is running
-echo -e "${YELLOW}Checking Appium server...${NC}"
-if curl -s http://localhost:4723/status > /dev/null 2>&1; then
-    echo -e "${GREEN}✓ Appium server is running${NC}"
+# Check if Appium is running (managed servers are started by pytest itself)
+if [ "$CASSETTE" == "replay" ]; then
+    echo -e "${YELLOW}Replaying cassettes, no Appium server needed${NC}"
+elif [ "$MANAGED_SERVERS" == "true" ]; then
+    echo -e "${YELLOW}Appium servers will be started by pytest (one per worker)${NC}"
 else
-    echo -e "${RED}✗ Appium server is not running${NC}"
-    echo -e "${YELLOW}Please start Appium server: appium${NC}"
-    exit 1
+    echo -e "${YELLOW}Checking Appium server...${NC}"
+    if curl -s http://localhost:4723/status > /dev/null 2>&1; then
+        echo -e "${GREEN}✓ Appium server is running${NC}"
+    else
+        echo -e "${RED}✗ Appium server is not running${NC}"
+        echo -e "${YELLOW}Please start Appium server: appium${NC}"
+        exit 1
+    fi
 fi
 
-# Check if device is connected
-echo -e "${YELLOW}Checking for connected devices...${NC}"
-DEVICE_COUNT=$(adb devices | grep -w "device" | wc -l)
-if [ $DEVICE_COUNT -eq 0 ]; then
-    echo -e "${RED}✗ No Android device/emulator connected${NC}"
-    echo -e "${YELLOW}Please connect a device or start an emulator${NC}"
-    exit 1
-else
-    echo -e "${GREEN}✓ Device connected${NC}"
-fi
+# Shared with pytest so its workers reuse this preflight report
+export TEST_RUN_ID="${TEST_RUN_ID:-$(date +%Y%m%d_%H%M%S)}"
 
-# Check if app is installed
-APP_PACKAGE="com.mumzworld.android"
-echo -e "${YELLOW}Checking if $APP_PACKAGE is installed...${NC}"
-if adb shell pm list packages | grep -q "$APP_PACKAGE"; then
-    echo -e "${GREEN}✓ Application is installed${NC}"
-    
-    # Try to launch the app
-    echo -e "${YELLOW}Launching application...${NC}"
-    adb shell am start -n "$APP_PACKAGE/com.mumzworld.android.MainActivity" > /dev/null 2>&1
-    if [ $? -eq 0 ]; then
-        echo -e "${GREEN}✓ Application launched successfully${NC}"
-        sleep 3  # Wait for app to fully load
+# Check devices and app, launch it and wait until it has focus (all devices at once)
+if [ "$PLATFORM" == "android" ] && [ "$CASSETTE" != "replay" ]; then
+    echo -e "${YELLOW}Running device preflight...${NC}"
+    if python3 -m util.preflight; then
+        echo -e "${GREEN}✓ Devices ready (report: test_reports/preflight.json)${NC}"
     else
-        echo -e "${YELLOW}⚠ Could not launch app, but will proceed with tests${NC}"
+        echo -e "${RED}✗ Device preflight failed (see test_reports/preflight.json)${NC}"
+        echo -e "${YELLOW}Connect a device or start an emulator and install the application first${NC}"
+        exit 1
     fi
-else
-    echo -e "${RED}✗ Application $APP_PACKAGE is not installed${NC}"
-    echo -e "${YELLOW}Please install the application first${NC}"
-    exit 1
 fi
 
 # Build pytest command
@@ -112,6 +124,17 @@ PYTEST_CMD="$PYTEST_CMD --platform=$PLATFORM -v"
 
 if [ "$WORKERS" -gt 1 ]; then
     PYTEST_CMD="$PYTEST_CMD -n $WORKERS"
+    if [ "$BALANCE" == "true" ]; then
+        PYTEST_CMD="$PYTEST_CMD --duration-scheduling"
+    fi
+fi
+
+if [ "$MANAGED_SERVERS" == "true" ]; then
+    PYTEST_CMD="$PYTEST_CMD --appium-servers=$WORKERS"
+fi
+
+if [ "$CASSETTE" != "off" ]; then
+    PYTEST_CMD="$PYTEST_CMD --cassette=$CASSETTE"
 fi
 
 if [ "$REPORT_TYPE" == "html" ]; then
@@ -127,6 +150,9 @@ echo "  Platform: $PLATFORM"
 echo "  Marker: $MARKER"
 echo "  Workers: $WORKERS"
 echo "  Report Type: $REPORT_TYPE"
+echo "  Managed Appium Servers: $MANAGED_SERVERS"
+echo "  Duration Scheduling: $BALANCE"
+echo "  Cassettes: $CASSETTE"
 echo ""
 
 # Run tests
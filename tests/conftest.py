@@ -4,15 +4,35 @@ Contains fixtures and hooks for test execution
 """
 import pytest
 import pytest_html
+import allure
 import os
-from datetime import datetime
+import re
+import json
+import glob
+import time
+from base.appium_server import AppiumServerManager
+from base.base_page import BasePage
+from base.cassette import Cassettes
+from base.command_tracer import CommandTracer
+from base.device_pool import DevicePool
 from base.driver_factory import DriverFactory
+from pageObjects.navigation import ACCOUNT_RESETS, is_signed_in, sign_in
 from reports.report_generator import ReportGenerator
+from reports.results_store import ResultsStore
+from util.account_pool import AccountPool
+from util.auth_state import AuthStateCache
 from util.logger import Logger
+from util.preflight import Preflight
+from util.screen_recorder import ScreenRecorder
+from util.screenshot_service import ScreenshotService
 
 
 logger = Logger.get_logger(__name__)
 
+TRACE_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "test_reports", "traces")
+
+results_store = ResultsStore()
+
 
 def pytest_addoption(parser):
     """Add custom command line options"""
@@ -28,6 +48,39 @@ def pytest_addoption(parser):
         default="",
         help="Path to mobile application"
     )
+    parser.addoption(
+        "--appium-servers",
+        action="store",
+        type=int,
+        default=0,
+        help="Start this many local Appium servers, one per xdist worker (0 uses APPIUM_SERVER_URL)"
+    )
+    parser.addoption(
+        "--cassette",
+        action="store",
+        choices=Cassettes.ALL,
+        default=Cassettes.OFF,
+        help="record: save every session's WebDriver traffic per test; replay: answer from the saved cassettes"
+    )
+    parser.addoption(
+        "--cassette-dir",
+        action="store",
+        default=None,
+        help="Cassette directory (default tests/cassettes)"
+    )
+    parser.addoption(
+        "--replay-speed",
+        action="store",
+        type=float,
+        default=0.0,
+        help="Replay delay as a fraction of the recorded command durations (0 answers immediately)"
+    )
+    parser.addoption(
+        "--duration-scheduling",
+        action="store_true",
+        default=False,
+        help="Distribute tests across xdist workers longest-first using recorded durations"
+    )
 
 
 @pytest.fixture(scope="session")
@@ -36,66 +89,172 @@ def platform(request):
     return request.config.getoption("--platform")
 
 
+@pytest.fixture(scope="session")
+def driver_session():
+    """
+    Quit the worker's driver once all tests are done
+    
+    With SESSION_REUSE enabled the session outlives individual tests,
+    so it is closed here and the create vs reset timings are logged.
+    """
+    yield
+    
+    summary = DriverFactory.get_session_timing_summary()
+    logger.info(
+        f"Session timings: {summary['creates']} creates (avg {summary['avg_create']:.2f}s), "
+        f"{summary['resets']} resets (avg {summary['avg_reset']:.2f}s), "
+        f"estimated saving {summary['estimated_saved']:.2f}s"
+    )
+    for profile, stats in summary['profiles'].items():
+        phases = ", ".join(f"{name} {seconds:.2f}s" for name, seconds in stats['phases'].items())
+        logger.info(f"Profile {profile}: {stats['creates']} creates (avg {stats['avg_create']:.2f}s) - {phases}")
+    DriverFactory.quit_driver()
+
+
 @pytest.fixture(scope="function")
-def driver(platform):
+def driver(platform, driver_session, request):
     """
     Setup and teardown driver for each test
     
     Args:
         platform: Mobile platform (android/ios)
+        driver_session: Session scoped driver cleanup
+        request: Pytest request for the current test
         
     Yields:
         WebDriver: Appium driver instance
     """
     logger.info("Setting up driver for test")
-    driver = DriverFactory.get_driver(platform)
+    driver = DriverFactory.acquire_driver(platform, request.node.name)
+    
+    timing = DriverFactory.session_timings[-1]
+    request.node.user_properties.append((f"session_{timing['action']}_seconds", round(timing['duration'], 3)))
+    if 'profile' in timing:
+        request.node.user_properties.append(("capability_profile", timing['profile']))
+    
+    if ScreenRecorder.is_enabled():
+        ScreenRecorder.start(driver)
     
     yield driver
     
+    ScreenRecorder.stop()
     logger.info("Tearing down driver after test")
-    DriverFactory.quit_driver()
+    DriverFactory.release_driver()
+
+
+@pytest.fixture(scope="session")
+def account_pool():
+    """Test accounts shared by all workers (see `account_pool` in config.yaml)"""
+    return AccountPool()
+
+
+@pytest.fixture(scope="function")
+def test_account(account_pool, request):
+    """
+    Lease an account no other test is using
+    
+    The account is returned to the pool after the test, marked dirty when
+    the test carries one of the pool's dirtying markers (e.g. `cart`).
+    
+    Yields:
+        dict: Account with 'email', 'password' and 'dirty'
+    """
+    if Cassettes.is_replaying():
+        # The recorded account; its password was never written to the cassette
+        email = Cassettes.get_meta(request.node.nodeid, 'account')
+        if email is None:
+            pytest.skip(f"No cassette recorded for {request.node.nodeid}")
+        Cassettes.add_secret("replay")
+        yield {'email': email, 'password': "replay", 'dirty': []}
+        return
+    
+    if not account_pool.accounts:
+        pytest.skip("No test accounts: create config/accounts.json or set TEST_ACCOUNT_EMAIL/TEST_ACCOUNT_PASSWORD")
+    account = account_pool.lease(request.node.nodeid)
+    request.node.user_properties.append(("test_account", account['email']))
+    if Cassettes.is_recording():
+        Cassettes.add_secret(account['password'])
+        Cassettes.set_meta('account', account['email'])
+    
+    yield account
+    
+    markers = [marker.name for marker in request.node.iter_markers()]
+    account_pool.release(account['email'], dirty=account_pool.dirty_reasons(markers))
+
+
+@pytest.fixture(scope="function")
+def logged_in_driver(driver, platform, test_account, account_pool, request):
+    """
+    Driver whose app is signed in to the test account
+    
+    Only tests marked `login` go through the sign-in screens. Other tests
+    restore the account's snapshot of the app data, which is taken after
+    the first UI login of the account and dropped once it expires. State
+    left behind by an earlier test (e.g. a full cart) is reset first.
+    
+    Yields:
+        WebDriver: Appium driver instance with a signed-in app
+    """
+    start = time.perf_counter()
+    email = test_account['email']
+    
+    def ui_login(session):
+        sign_in(session, email, test_account['password'])
+    
+    # Cassettes hold UI traffic only, so recorded and replayed runs always sign in through the UI
+    use_cache = AuthStateCache.is_enabled() and Cassettes.mode == Cassettes.OFF
+    if platform == 'android' and use_cache and not request.node.get_closest_marker('login'):
+        cache = AuthStateCache(DriverFactory.get_app_id())
+        method = cache.sign_in(driver, DriverFactory.get_device_id(), email, ui_login, is_signed_in)
+    else:
+        ui_login(driver)
+        if not is_signed_in(driver):
+            raise RuntimeError(f"UI login did not sign in {email}")
+        method = AuthStateCache.UI_LOGIN
+    
+    if test_account['dirty']:
+        unknown = [reason for reason in test_account['dirty'] if reason not in ACCOUNT_RESETS]
+        for reason in test_account['dirty']:
+            if reason in ACCOUNT_RESETS:
+                logger.info("Resetting %s state of %s", reason, email)
+                ACCOUNT_RESETS[reason](driver)
+        if unknown:
+            logger.warning("No reset for %s state of %s, account stays dirty", ", ".join(unknown), email)
+        else:
+            account_pool.mark_clean(email)
+    
+    logger.info("Signed in as %s (%s) in %.2fs", email, method, time.perf_counter() - start)
+    request.node.user_properties.append(("auth_state", method))
+    request.node.user_properties.append(("sign_in_seconds", round(time.perf_counter() - start, 3)))
+    yield driver
 
 
 @pytest.fixture(scope="session", autouse=True)
-def setup_test_environment():
+def setup_test_environment(platform, request):
     """Setup test environment before all tests"""
-    import subprocess
-    
     logger.info("=" * 80)
     logger.info("PRE-TEST ENVIRONMENT SETUP")
     logger.info("=" * 80)
     
-    # Check if device is connected
-    try:
-        result = subprocess.run(['adb', 'devices'], capture_output=True, text=True)
-        if 'device' not in result.stdout:
-            logger.error("No Android device/emulator connected")
-            pytest.exit("No device connected. Please connect a device or start emulator.")
-        logger.info("✓ Device is connected")
-    except Exception as e:
-        logger.warning(f"Could not check device status: {str(e)}")
-    
-    # Check if app is installed
-    app_package = "com.mumzworld.android"
-    try:
-        result = subprocess.run(['adb', 'shell', 'pm', 'list', 'packages'], 
-                              capture_output=True, text=True)
-        if app_package in result.stdout:
-            logger.info(f"✓ Application {app_package} is installed")
-            
-            # Try to launch the app
-            logger.info("Launching application...")
-            subprocess.run(['adb', 'shell', 'am', 'start', '-n', 
-                          f'{app_package}/com.mumzworld.android.MainActivity'],
-                         capture_output=True)
-            logger.info("✓ Application launched")
-            import time
-            time.sleep(3)  # Wait for app to load
-        else:
-            logger.error(f"Application {app_package} is not installed")
-            pytest.exit(f"App not installed. Please install {app_package} first.")
-    except Exception as e:
-        logger.warning(f"Could not check/launch app: {str(e)}")
+    # Checked once per run on all devices at once; other workers reuse the report
+    if Cassettes.is_replaying():
+        logger.info("Replaying cassettes from %s, no device needed", Cassettes.directory)
+    elif not any('driver' in item.fixturenames for item in request.session.items):
+        logger.info("No selected test uses a driver, skipping device preflight")
+    elif platform == 'android':
+        try:
+            report = Preflight().run_once()
+        except Exception as e:
+            logger.warning(f"Could not run device preflight: {str(e)}")
+            report = None
+        if report is not None and not report['ready']:
+            errors = "; ".join(f"{d['serial']}: {d['error']}" for d in report['devices'])
+            pytest.exit(f"No device passed preflight. {errors or 'Please connect a device or start emulator.'}")
+        if report is not None and DevicePool.is_enabled():
+            pool = DevicePool()
+            for device in report['devices']:
+                if not device['ok']:
+                    pool.quarantine(device['serial'], f"preflight: {device['error']}")
     
     logger.info("=" * 80)
     logger.info("STARTING TEST EXECUTION")
@@ -108,6 +267,13 @@ def setup_test_environment():
     logger.info("=" * 80)
 
 
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_setup(item):
+    """Start recording WebDriver commands before the test's fixtures run"""
+    CommandTracer.begin_test(item.nodeid)
+    Cassettes.begin_test(item.nodeid)
+
+
 @pytest.hookimpl(tryfirst=True, hookwrapper=True)
 def pytest_runtest_makereport(item, call):
     """
@@ -118,34 +284,117 @@ def pytest_runtest_makereport(item, call):
     
     # Only process actual test execution (not setup/teardown)
     if report.when == "call":
+        attach_command_timeline(item, report)
+        
         if report.failed:
             logger.error(f"Test FAILED: {item.name}")
             
-            # Take screenshot on failure
+            # Take screenshot on failure; processing and writing happen in the background
             try:
                 driver = item.funcargs.get('driver')
                 if driver:
-                    screenshot_dir = os.path.join(
-                        os.path.dirname(os.path.dirname(__file__)),
-                        "test_reports",
-                        "screenshots"
-                    )
-                    os.makedirs(screenshot_dir, exist_ok=True)
+                    screenshot_path = ScreenshotService.capture(driver, item.name)
                     
-                    screenshot_name = f"{item.name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
-                    screenshot_path = os.path.join(screenshot_dir, screenshot_name)
-                    
-                    driver.save_screenshot(screenshot_path)
-                    logger.info(f"Screenshot saved: {screenshot_path}")
-                    
-                    # Attach screenshot to pytest-html report
-                    if hasattr(report, 'extra'):
-                        report.extra.append(pytest_html.extras.png(screenshot_path))
+                    # Attach references, the image is stored once under test_reports/screenshots
+                    extension = os.path.splitext(screenshot_path)[1].lstrip('.')
+                    attach_file_reference(report, screenshot_path, "Failure screenshot", pytest_html.extras.image(
+                        report_relative_path(item.config, screenshot_path), name="Failure screenshot",
+                        mime_type="image/jpeg" if extension == "jpg" else f"image/{extension}",
+                        extension=extension,
+                    ))
             except Exception as e:
                 logger.error(f"Failed to take screenshot: {str(e)}")
+            
+            # Keep the last seconds of the on-device recording, trimmed in the background
+            recording_path = ScreenRecorder.save_failure(re.sub(r'[^\w.-]+', '_', item.name))
+            if recording_path:
+                attach_file_reference(report, recording_path, "Failure recording", pytest_html.extras.mp4(
+                    report_relative_path(item.config, recording_path), name="Failure recording"
+                ))
         
         elif report.passed:
             logger.info(f"Test PASSED: {item.name}")
+    
+    record_result(item, report)
+
+
+def record_result(item, report):
+    """
+    Append the outcome of a test phase to the shared results store
+    
+    The call phase is always recorded; setup and teardown only when they
+    fail or skip, so every test contributes one row plus one per error.
+    """
+    if report.when != "call" and report.passed:
+        return
+    if report.when == "call" or report.skipped:
+        outcome = report.outcome
+    else:
+        outcome = "error"
+    
+    driver = item.funcargs.get('driver') if hasattr(item, 'funcargs') else None
+    device = DriverFactory.get_device_id() if driver else None
+    artifacts = [
+        {'name': extra.get('name'), 'path': extra.get('content')}
+        for extra in getattr(report, 'extras', [])
+        if extra.get('format_type') in ('image', 'video', 'url')
+    ]
+    try:
+        results_store.record(
+            Logger.get_run_id(), item.nodeid, report.when, outcome, report.duration,
+            worker=os.getenv('PYTEST_XDIST_WORKER', 'master'), device=device,
+            retries=getattr(report, 'rerun', 0), artifacts=artifacts,
+            message=str(report.longrepr)[-2000:] if report.longrepr else None,
+        )
+    except Exception as e:
+        logger.warning(f"Could not record test result: {str(e)}")
+
+
+def report_relative_path(config, path: str) -> str:
+    """Path of an artifact relative to the pytest-html report"""
+    html_path = config.getoption('htmlpath', None)
+    html_dir = os.path.dirname(os.path.abspath(html_path)) if html_path else os.getcwd()
+    return os.path.relpath(path, html_dir)
+
+
+def attach_file_reference(report, path: str, name: str, html_extra):
+    """
+    Link an artifact from the HTML and Allure reports without copying it
+    
+    Args:
+        report: Test report of the call phase
+        path: Artifact path, may still be written in the background
+        name: Attachment name
+        html_extra: pytest-html extra pointing at the artifact
+    """
+    extras = getattr(report, 'extras', [])
+    extras.append(html_extra)
+    report.extras = extras
+    allure.attach(f"file://{path}", name=name, attachment_type=allure.attachment_type.URI_LIST)
+
+
+def attach_command_timeline(item, report):
+    """
+    Write the test's command timeline and attach it to the Allure and HTML reports
+    
+    The file is Chrome trace-event JSON, open it in chrome://tracing or
+    ui.perfetto.dev. Setup (session create/reset) and the test body are
+    included; teardown commands only count towards the run summary.
+    """
+    events = CommandTracer.end_test()
+    if not events:
+        return
+    try:
+        name = re.sub(r'[^\w.-]+', '_', item.nodeid)
+        path = CommandTracer.write_timeline(
+            events, os.path.join(TRACE_DIR, f"{name}_{Logger.get_run_id()}.json")
+        )
+        allure.attach.file(path, name="Command timeline", attachment_type=allure.attachment_type.JSON)
+        extras = getattr(report, 'extras', [])
+        extras.append(pytest_html.extras.url(path, name="Command timeline"))
+        report.extras = extras
+    except Exception as e:
+        logger.warning(f"Failed to write command timeline: {str(e)}")
 
 
 @pytest.fixture(scope="session", autouse=True)
@@ -158,6 +407,20 @@ def configure_html_report():
 # Pytest HTML report customization
 def pytest_configure(config):
     """Configure pytest settings"""
+    # Shared by all xdist workers, which inherit the controller environment
+    Logger.get_run_id()
+    
+    Cassettes.configure(config.getoption('--cassette'), config.getoption('--cassette-dir'),
+                        config.getoption('--replay-speed'))
+    
+    # Only the controller owns the server fleet; workers find theirs by worker id
+    server_count = config.getoption('--appium-servers')
+    if server_count > 0 and not hasattr(config, 'workerinput') and not Cassettes.is_replaying():
+        manager = AppiumServerManager(server_count)
+        manager.start()
+        manager.start_monitor()
+        config._appium_server_manager = manager
+    
     config._metadata = {
         'Platform': config.getoption('--platform'),
         'Python Version': '3.x',
@@ -165,6 +428,114 @@ def pytest_configure(config):
     }
 
 
+@pytest.hookimpl(optionalhook=True)
+def pytest_xdist_make_scheduler(config, log):
+    """Use duration-aware scheduling when requested, otherwise keep the --dist mode"""
+    if not config.getoption('--duration-scheduling'):
+        return None
+    from util.duration_scheduler import DurationScheduling
+    return DurationScheduling(config, log)
+
+
+def pytest_collection_modifyitems(config, items):
+    """Tell the duration scheduler which tests share a precondition"""
+    if hasattr(config, 'workerinput') and config.getoption('--duration-scheduling'):
+        from util.duration_scheduler import write_groups
+        write_groups(items, Logger.get_run_id())
+
+
+def pytest_unconfigure(config):
+    """Tear down managed Appium servers and merge the worker logs"""
+    manager = getattr(config, '_appium_server_manager', None)
+    if manager is not None:
+        manager.stop()
+    
+    if not hasattr(config, 'workerinput'):
+        Logger.flush()
+        merged_log = Logger.merge_worker_logs()
+        if merged_log:
+            logger.info(f"Merged worker logs: {merged_log}")
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_sessionfinish(session):
+    """Flush background work, save command statistics and summarize the run from the results store"""
+    # Workers report back to the controller right after this hook
+    ScreenshotService.shutdown()
+    ScreenRecorder.shutdown()
+    if Cassettes.is_recording():
+        Cassettes.save()
+    elif Cassettes.is_replaying() and Cassettes.get_stats()['misses']:
+        logger.warning("%d requests had no recorded response, re-record the cassettes of the failing tests",
+                       Cassettes.get_stats()['misses'])
+    element_stats = BasePage.get_element_cache_stats()
+    if element_stats['hits'] or element_stats['misses']:
+        logger.info("Element cache: %d hits, %d misses, %d stale handles", element_stats['hits'],
+                    element_stats['misses'], element_stats['stale'])
+    Logger.flush()
+    
+    # The controller sees every worker's results once the workers have finished
+    if not hasattr(session.config, 'workerinput') and not session.config.option.collectonly:
+        try:
+            report_gen = ReportGenerator(results_store)
+            report_gen.generate_summary_report()
+            report_gen.generate_history_report()
+        except Exception as e:
+            logger.warning(f"Could not generate summary report: {str(e)}")
+    results_store.close()
+    
+    summary = CommandTracer.get_summary()
+    if not summary['totals']:
+        return
+    worker = os.getenv('PYTEST_XDIST_WORKER', 'master')
+    os.makedirs(TRACE_DIR, exist_ok=True)
+    path = os.path.join(TRACE_DIR, f"summary_{Logger.get_run_id()}_{worker}.json")
+    with open(path, 'w') as file:
+        json.dump(summary, file)
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    """Print the schedule accuracy and the slowest commands and locators of the run, merged across workers"""
+    if hasattr(config, 'workerinput'):
+        return
+    schedule = getattr(config, '_duration_schedule', None)
+    if schedule is not None and schedule.predicted_makespan is not None:
+        terminalreporter.section("duration scheduling")
+        terminalreporter.write_line(f"predicted makespan {schedule.predicted_makespan:8.2f}s")
+        terminalreporter.write_line(f"actual makespan    {schedule.actual_makespan():8.2f}s")
+        for worker, busy in sorted(schedule.worker_busy.items()):
+            terminalreporter.write_line(f"  {worker}: {busy:8.2f}s busy")
+    
+    summaries = []
+    for path in glob.glob(os.path.join(TRACE_DIR, f"summary_{Logger.get_run_id()}_*.json")):
+        with open(path, 'r') as file:
+            summaries.append(json.load(file))
+    if not summaries:
+        return
+    
+    top = CommandTracer.merge_summaries(summaries, int(os.getenv('TRACE_TOP_N', '10')))
+    if top['commands']:
+        terminalreporter.section("slowest WebDriver commands")
+    for stats in top['commands']:
+        terminalreporter.write_line(
+            f"{stats['total']:8.2f}s total {stats['count']:6d}x max {stats['max']:.3f}s  {stats['command']}"
+        )
+    if top['locators']:
+        terminalreporter.section("slowest locators")
+    for stats in top['locators']:
+        terminalreporter.write_line(
+            f"{stats['total']:8.2f}s total {stats['count']:6d}x max {stats['max']:.3f}s  "
+            f"{stats['command']} {stats['locator']}"
+        )
+    if top['slowest']:
+        terminalreporter.section("slowest single commands")
+    for event in top['slowest']:
+        terminalreporter.write_line(
+            f"{event['dur']:8.3f}s  {event['name']} {event['locator'] or ''}  "
+            f"[{event['test']} / {event['step'] or '-'}]"
+        )
+
+
 def pytest_html_report_title(report):
     """Customize HTML report title"""
     report.title = "Mobile Automation Test Report"
@@ -0,0 +1,137 @@
+import os
+import sys
+import socket
+import pytest
+from functools import partial
+from base.appium_server import AppiumServerManager
+
+
+# The fake server answers /status like Appium, so the fleet runs without Node or a device
+FAKE_SERVER_COMMAND = f"{sys.executable} -m util.fake_appium_server --address {{host}} --port {{port}}"
+
+
+def free_port_pair() -> int:
+    """First of two consecutive free ports"""
+    for _ in range(50):
+        with socket.socket() as first:
+            first.bind(("127.0.0.1", 0))
+            port = first.getsockname()[1]
+            with socket.socket() as second:
+                try:
+                    second.bind(("127.0.0.1", port + 1))
+                except OSError:
+                    continue
+        return port
+    raise RuntimeError("No two consecutive free ports")
+
+
+def stalled_check(manager, process, stall, check, port, timeout=2):
+    """Health check that fails for one server process while stall['on'] is set"""
+    if stall['on'] and manager._processes.get(port) is process:
+        return False
+    return check(port, timeout)
+
+
+@pytest.fixture
+def manager(tmp_path):
+
+    manager = AppiumServerManager(2, base_port=free_port_pair(), command=FAKE_SERVER_COMMAND,
+                                  startup_timeout=30, log_dir=str(tmp_path), max_missed_checks=3)
+    yield manager
+    manager.stop()
+
+
+class TestAppiumServerManager:
+
+
+    def test_start_makes_every_server_healthy(self, manager):
+        
+        manager.start()
+        
+        assert all(manager.is_healthy(port) for port in manager.ports)
+        assert os.environ['APPIUM_MANAGED_SERVERS'] == "2"
+        assert AppiumServerManager.url_for_worker('gw0') == manager.url(manager.ports[0])
+        assert AppiumServerManager.url_for_worker('gw1') == manager.url(manager.ports[1])
+        assert AppiumServerManager.url_for_worker('gw2') == manager.url(manager.ports[0])
+    
+    def test_is_healthy_is_false_without_a_server(self, manager):
+        
+        assert not manager.is_healthy(manager.ports[0], timeout=0.5)
+    
+    def test_ensure_running_restarts_a_crashed_server(self, manager):
+        
+        manager.start()
+        port = manager.ports[0]
+        crashed = manager._processes[port]
+        crashed.kill()
+        crashed.wait()
+        assert not manager.is_healthy(port)
+        
+        assert manager.ensure_running(port)
+        
+        assert manager.is_healthy(port)
+        assert manager._processes[port] is not crashed
+    
+    def test_ensure_running_tolerates_missed_health_checks(self, manager, monkeypatch):
+        
+        manager.start()
+        port = manager.ports[0]
+        busy = manager._processes[port]
+        # The process is alive but too busy to answer /status
+        stall = {'on': True}
+        monkeypatch.setattr(manager, 'is_healthy', partial(stalled_check, manager, busy, stall, manager.is_healthy))
+        
+        assert not manager.ensure_running(port)
+        assert not manager.ensure_running(port)
+        stall['on'] = False
+        assert manager.ensure_running(port)
+        stall['on'] = True
+        assert not manager.ensure_running(port)
+        assert not manager.ensure_running(port)
+        
+        assert manager._processes[port] is busy
+    
+    def test_ensure_running_restarts_a_server_after_consecutive_missed_checks(self, manager, monkeypatch):
+        
+        manager.start()
+        port = manager.ports[0]
+        stalled = manager._processes[port]
+        monkeypatch.setattr(manager, 'is_healthy',
+                            partial(stalled_check, manager, stalled, {'on': True}, manager.is_healthy))
+        
+        assert not manager.ensure_running(port)
+        assert not manager.ensure_running(port)
+        assert manager.ensure_running(port)
+        
+        assert manager._processes[port] is not stalled
+        assert stalled.poll() is not None
+    
+    def test_ensure_running_keeps_a_healthy_server(self, manager):
+        
+        manager.start()
+        process = manager._processes[manager.ports[1]]
+        
+        assert manager.ensure_running(manager.ports[1])
+        
+        assert manager._processes[manager.ports[1]] is process
+    
+    def test_stop_tears_down_every_server(self, manager):
+        
+        manager.start()
+        processes = list(manager._processes.values())
+        
+        manager.stop()
+        
+        assert all(process.poll() is not None for process in processes)
+        assert not any(manager.is_healthy(port, timeout=0.5) for port in manager.ports)
+        assert 'APPIUM_MANAGED_SERVERS' not in os.environ
+        assert AppiumServerManager.url_for_worker('gw0') is None
+    
+    def test_start_fails_when_a_server_exits(self, tmp_path):
+        
+        manager = AppiumServerManager(1, base_port=free_port_pair(), command=f"{sys.executable} -c 'exit(3)'",
+                                      startup_timeout=10, log_dir=str(tmp_path))
+        
+        with pytest.raises(RuntimeError, match="did not become ready"):
+            manager.start()
+        assert 'APPIUM_MANAGED_SERVERS' not in os.environ
@@ -0,0 +1,108 @@
+import gzip
+import pytest
+from appium import webdriver
+from appium.options.android import UiAutomator2Options
+from appium.webdriver.common.appiumby import AppiumBy
+from selenium.common.exceptions import WebDriverException
+from base.cassette import Cassettes
+from util.fake_appium_server import FakeAppiumServer
+
+
+TEST_ID = "tests/test_app.py::TestApp::test_sign_in"
+
+PASSWORD = "s3cret-Pa55"
+
+SEARCH_FIELD = (AppiumBy.ACCESSIBILITY_ID, "Search")
+TITLE = (AppiumBy.ID, "com.mumzworld.android:id/title")
+
+
+@pytest.fixture
+def cassettes(tmp_path, monkeypatch):
+    """Cassettes in a temporary directory, with the class state restored afterwards"""
+    for name, value in {'mode': Cassettes.OFF, 'speed': 0.0, '_test': "session", '_secrets': set(),
+                        '_recorded': {}, '_queues': {}, '_fallback': None, '_misses': 0}.items():
+        monkeypatch.setattr(Cassettes, name, value)
+    monkeypatch.setattr(Cassettes, 'directory', str(tmp_path))
+    return Cassettes
+
+
+def reset(cassettes):
+    """Forget everything but the files, as a new pytest process would"""
+    cassettes._secrets = set()
+    cassettes._recorded = {}
+    cassettes._queues = {}
+    cassettes._fallback = None
+    cassettes._misses = 0
+
+
+def sign_in(server_url: str, password: str):
+    """Type a password and read the screen back through a cassette connection"""
+    driver = webdriver.Remote(Cassettes.connection(server_url), options=UiAutomator2Options())
+    try:
+        title = driver.find_element(*TITLE).text
+        field = driver.find_element(*SEARCH_FIELD)
+        field.send_keys(password)
+        return title, field.text
+    finally:
+        driver.quit()
+
+
+def record(cassettes):
+
+    cassettes.configure(Cassettes.RECORD)
+    cassettes.begin_test(TEST_ID)
+    cassettes.add_secret(PASSWORD)
+    cassettes.set_meta('account', "mother@example.com")
+    with FakeAppiumServer() as server:
+        result = sign_in(server.url, PASSWORD)
+    return result, cassettes.save()
+
+
+class TestCassettes:
+
+
+    def test_record_writes_one_cassette_per_test(self, cassettes):
+        
+        (title, typed), paths = record(cassettes)
+        
+        assert (title, typed) == ("Welcome", PASSWORD)
+        assert paths == [cassettes.path_for(TEST_ID)]
+        assert cassettes.get_meta(TEST_ID, 'account') == "mother@example.com"
+    
+    def test_record_redacts_secrets(self, cassettes):
+        
+        _, paths = record(cassettes)
+        
+        with gzip.open(paths[0], 'rt', encoding='utf-8') as file:
+            content = file.read()
+        assert PASSWORD not in content
+        assert Cassettes.REDACTED in content
+    
+    def test_replay_answers_without_a_server(self, cassettes):
+        
+        (title, _), _ = record(cassettes)
+        reset(cassettes)
+        cassettes.configure(Cassettes.REPLAY)
+        cassettes.begin_test(TEST_ID)
+        # Replayed runs type a placeholder, which matches the redacted recording
+        cassettes.add_secret("replay")
+        
+        # Nothing listens on port 9, so every answer comes from the cassette
+        replayed_title, typed = sign_in("http://127.0.0.1:9", "replay")
+        
+        assert replayed_title == title
+        assert typed == Cassettes.REDACTED
+        assert cassettes.get_stats()['misses'] == 0
+    
+    def test_replay_of_an_unrecorded_request_fails(self, cassettes):
+        
+        record(cassettes)
+        reset(cassettes)
+        cassettes.configure(Cassettes.REPLAY)
+        cassettes.begin_test(TEST_ID)
+        
+        driver = webdriver.Remote(Cassettes.connection("http://127.0.0.1:9"), options=UiAutomator2Options())
+        with pytest.raises(WebDriverException):
+            driver.find_element(AppiumBy.ID, "com.mumzworld.android:id/checkout")
+        
+        assert cassettes.get_stats()['misses'] == 1
@@ -0,0 +1,153 @@
+import pytest
+from appium.webdriver.common.appiumby import AppiumBy
+from selenium.webdriver.common.by import By
+from base.page_snapshot import PageSnapshot, UnsupportedLocatorError, is_supported
+
+
+PAGE_SOURCE = """<?xml version="1.0" encoding="UTF-8"?>
+<hierarchy rotation="0">
+  <android.widget.FrameLayout resource-id="app:id/root" bounds="[0,0][1080,2400]">
+    <android.widget.LinearLayout resource-id="app:id/list" bounds="[0,200][1080,2200]">
+      <android.view.ViewGroup resource-id="app:id/tile1" clickable="true" enabled="true">
+        <android.widget.TextView resource-id="app:id/name1" text="Baby Wipes"/>
+        <android.widget.Button resource-id="app:id/add1" content-desc="Add to cart" text="Add"/>
+      </android.view.ViewGroup>
+      <android.view.ViewGroup resource-id="app:id/tile2" clickable="true" enabled="false">
+        <android.widget.TextView resource-id="app:id/name2" text="Baby Lotion"/>
+        <android.widget.Button resource-id="app:id/add2" content-desc="Add to cart" text="Add"/>
+      </android.view.ViewGroup>
+      <android.view.ViewGroup resource-id="app:id/tile3" clickable="false">
+        <android.widget.TextView resource-id="app:id/name3" text="Diapers"/>
+      </android.view.ViewGroup>
+    </android.widget.LinearLayout>
+    <android.widget.TextView resource-id="app:id/title" text="Results" content-desc="Title"
+                             bounds="[40,40][1040,160]" displayed="false"/>
+  </android.widget.FrameLayout>
+</hierarchy>
+"""
+
+XPATH_CASES = [
+    # Descendant and child axes
+    ("//android.widget.TextView", ["name1", "name2", "name3", "title"]),
+    ("/hierarchy/android.widget.FrameLayout/android.widget.TextView", ["title"]),
+    ("/hierarchy/android.widget.FrameLayout//android.widget.TextView", ["name1", "name2", "name3", "title"]),
+    ("//android.widget.LinearLayout/android.widget.TextView", []),
+    ("//android.widget.LinearLayout//android.widget.TextView", ["name1", "name2", "name3"]),
+    ("//android.widget.LinearLayout/*/android.widget.Button", ["add1", "add2"]),
+    # Positions count per parent, after the predicates before them
+    ("//android.view.ViewGroup[2]", ["tile2"]),
+    ("//android.view.ViewGroup/android.widget.TextView[1]", ["name1", "name2", "name3"]),
+    ("//android.view.ViewGroup/*[2]", ["add1", "add2"]),
+    ("//android.view.ViewGroup[@clickable='true'][2]", ["tile2"]),
+    ("//android.view.ViewGroup[4]", []),
+    # A parenthesised path counts across the whole screen
+    ("(//android.widget.Button)[2]", ["add2"]),
+    ("(//android.view.ViewGroup[@clickable='true'])[1]", ["tile1"]),
+    ("(//android.widget.Button)[3]", []),
+    ("(//android.widget.Button)", ["add1", "add2"]),
+    # Comparisons, functions and boolean logic
+    ("//*[@resource-id='app:id/title']", ["title"]),
+    ("//*[@content-desc]", ["add1", "add2", "title"]),
+    ("//android.view.ViewGroup[@enabled!='false']", ["tile1"]),
+    ("//android.view.ViewGroup[not(@enabled='false')]", ["tile1", "tile3"]),
+    ("//android.view.ViewGroup[@clickable='true' and @enabled='true']", ["tile1"]),
+    ("//android.view.ViewGroup[@enabled='false' or @clickable='false']", ["tile2", "tile3"]),
+    ("//android.view.ViewGroup[(@enabled='true' or @enabled='false') and not(@resource-id='app:id/tile1')]",
+     ["tile2"]),
+    ("//*[contains(@text, 'Baby')]", ["name1", "name2"]),
+    ("//*[starts-with(@resource-id, 'app:id/add')]", ["add1", "add2"]),
+    ("//android.view.ViewGroup/*[not(contains(@text, 'Baby'))]", ["add1", "add2", "name3"]),
+]
+
+LOCATOR_CASES = [
+    ((By.ID, "title"), ["title"]),
+    ((By.ID, "app:id/add1"), ["add1"]),
+    ((AppiumBy.ACCESSIBILITY_ID, "Add to cart"), ["add1", "add2"]),
+    ((By.CLASS_NAME, "android.widget.Button"), ["add1", "add2"]),
+    # UiSelector chains, instance() counting from 0 across the screen
+    ((AppiumBy.ANDROID_UIAUTOMATOR, 'new UiSelector().text("Add")'), ["add1", "add2"]),
+    ((AppiumBy.ANDROID_UIAUTOMATOR, 'new UiSelector().className("android.widget.Button").instance(1)'), ["add2"]),
+    ((AppiumBy.ANDROID_UIAUTOMATOR, 'new UiSelector().textContains("Baby").resourceIdMatches(".*name2")'), ["name2"]),
+    ((AppiumBy.ANDROID_UIAUTOMATOR, 'new UiSelector().descriptionStartsWith("Add").instance(5)'), []),
+    ((AppiumBy.ANDROID_UIAUTOMATOR, 'new UiSelector().clickable(true)'), ["tile1", "tile2"]),
+    ((AppiumBy.ANDROID_UIAUTOMATOR, 'new UiSelector().className("android.view.ViewGroup").enabled(false);'),
+     ["tile2"]),
+]
+
+UNSUPPORTED_LOCATORS = [
+    (By.XPATH, "//android.widget.Button[last()]"),
+    (By.XPATH, "(//android.widget.Button)[last()]"),
+    (By.XPATH, "//android.widget.Button[position()=1]"),
+    (By.XPATH, "//android.widget.Button[@text='Add'"),
+    (By.XPATH, "android.widget.Button"),
+    (By.XPATH, "//android.widget.Button | //android.widget.TextView"),
+    (AppiumBy.ANDROID_UIAUTOMATOR, 'new UiScrollable(new UiSelector()).scrollIntoView(new UiSelector().text("a"))'),
+    (AppiumBy.ANDROID_UIAUTOMATOR, 'new UiSelector().childSelector(new UiSelector().text("Add"))'),
+    (AppiumBy.ANDROID_UIAUTOMATOR, 'new UiSelector().fromParent(new UiSelector())'),
+    (AppiumBy.ANDROID_UIAUTOMATOR, 'new UiSelector()'),
+    (AppiumBy.IMAGE, "base64"),
+]
+
+
+def names(nodes) -> list:
+    """Short resource ids of nodes, in the order given"""
+    return [node.get('resource-id').split(':id/')[-1] for node in nodes]
+
+
+@pytest.fixture(scope="module")
+def snapshot():
+
+    return PageSnapshot(PAGE_SOURCE)
+
+
+class TestPageSnapshot:
+
+
+    @pytest.mark.parametrize("xpath, expected", XPATH_CASES)
+    def test_xpath(self, snapshot, xpath, expected):
+        
+        assert names(snapshot.find_all((By.XPATH, xpath))) == expected
+    
+    @pytest.mark.parametrize("locator, expected", LOCATOR_CASES)
+    def test_locator_strategies(self, snapshot, locator, expected):
+        
+        assert names(snapshot.find_all(locator)) == expected
+    
+    @pytest.mark.parametrize("locator", UNSUPPORTED_LOCATORS)
+    def test_unsupported_locator_raises(self, snapshot, locator):
+        
+        with pytest.raises(UnsupportedLocatorError):
+            snapshot.find_all(locator)
+        assert not is_supported(locator)
+    
+    @pytest.mark.parametrize("locator, expected", [
+        ((By.XPATH, ".//android.widget.Button"), ["add2"]),
+        ((By.XPATH, "//android.widget.TextView"), ["name2"]),
+        ((By.ID, "name1"), []),
+        ((AppiumBy.ANDROID_UIAUTOMATOR, 'new UiSelector().text("Add")'), ["add2"]),
+    ])
+    def test_find_all_within_searches_the_subtree(self, snapshot, locator, expected):
+        
+        tile = snapshot.find((By.ID, "tile2"))
+        
+        assert names(snapshot.find_all_within(tile, locator)) == expected
+    
+    def test_find_all_within_rejects_screen_wide_positions(self, snapshot):
+        
+        tile = snapshot.find((By.ID, "tile2"))
+        
+        with pytest.raises(UnsupportedLocatorError):
+            snapshot.find_all_within(tile, (By.XPATH, "(//android.widget.Button)[1]"))
+    
+    def test_reads(self, snapshot):
+        
+        title = (By.ID, "title")
+        
+        assert snapshot.text(title) == "Results"
+        assert snapshot.text((By.ID, "missing")) is None
+        assert snapshot.count((AppiumBy.ACCESSIBILITY_ID, "Add to cart")) == 2
+        assert snapshot.bounds(title) == (40, 40, 1040, 160)
+        assert not snapshot.is_displayed(title)
+        assert snapshot.is_displayed((By.ID, "add1"))
+        assert snapshot.exists((By.ID, "tile3"))
+        assert not snapshot.exists((By.ID, "tile4"))
@@ -0,0 +1,99 @@
+import os
+import sys
+import pytest
+from util.adb_client import AdbClient
+from util.common_utils import CommonUtils
+from util.preflight import Preflight
+
+
+FAKE_ADB = os.path.join(CommonUtils.get_project_root(), "util", "fake_adb.py")
+
+PACKAGE = "com.mumzworld.android"
+
+
+@pytest.fixture
+def fake_adb(tmp_path, monkeypatch):
+    """adb stand-in with one online and one offline device; the app gains focus right after launch"""
+    monkeypatch.setenv('FAKE_ADB_DEVICES', "emulator-5554,emulator-5556:offline")
+    monkeypatch.setenv('FAKE_ADB_PACKAGES', PACKAGE)
+    monkeypatch.setenv('FAKE_ADB_STATE', str(tmp_path / "adb_state.json"))
+    monkeypatch.setenv('FAKE_ADB_FOCUS_DELAY', "0")
+    return AdbClient(adb_path=f"{sys.executable} {FAKE_ADB}", timeout=30)
+
+
+@pytest.fixture
+def preflight(fake_adb, tmp_path):
+
+    settings = {'app_package': PACKAGE, 'app_activity': ".MainActivity", 'launch_app': True,
+                'readiness_timeout': 1, 'poll_interval': 0.1, 'max_workers': 4}
+    return Preflight(adb=fake_adb, settings=settings, report_path=str(tmp_path / "preflight.json"))
+
+
+class TestPreflight:
+
+
+    def test_online_device_is_ready_and_offline_device_fails(self, preflight):
+        
+        report = preflight.run_once()
+        
+        devices = {device['serial']: device for device in report['devices']}
+        assert report['ready'] == ["emulator-5554"]
+        assert not report['ok']
+        assert devices["emulator-5554"]['ok']
+        assert devices["emulator-5554"]['launched']
+        assert devices["emulator-5554"]['version'] == "1.0.0"
+        assert devices["emulator-5554"]['ready_after'] is not None
+        assert not devices["emulator-5556"]['ok']
+        assert devices["emulator-5556"]['error'] == "adb state is offline"
+    
+    @pytest.mark.parametrize("sdk", ["28", "29", "34"])
+    def test_focus_is_read_on_every_android_version(self, preflight, monkeypatch, sdk):
+        
+        # Android 10+ reports the focused app token instead of mCurrentFocus
+        monkeypatch.setenv('FAKE_ADB_SDK', sdk)
+        
+        report = preflight.run_once()
+        
+        assert report['ready'] == ["emulator-5554"]
+    
+    @pytest.mark.parametrize("sdk", ["28", "29"])
+    def test_app_that_never_gains_focus_fails(self, preflight, monkeypatch, sdk):
+        
+        monkeypatch.setenv('FAKE_ADB_SDK', sdk)
+        monkeypatch.setenv('FAKE_ADB_FOCUS_DELAY', "60")
+        
+        report = preflight.run_once()
+        
+        device = report['devices'][0]
+        assert report['ready'] == []
+        assert device['launched']
+        assert device['error'] == "app window never gained focus"
+    
+    def test_missing_app_fails_before_launch(self, preflight, monkeypatch):
+        
+        monkeypatch.setenv('FAKE_ADB_PACKAGES', "com.other.app")
+        
+        device = preflight.run_once()['devices'][0]
+        
+        assert not device['launched']
+        assert device['error'] == f"{PACKAGE} is not installed"
+    
+    def test_no_devices(self, preflight, monkeypatch):
+        
+        monkeypatch.setenv('FAKE_ADB_DEVICES', "")
+        
+        report = preflight.run_once()
+        
+        assert report['devices'] == []
+        assert not report['ok']
+    
+    def test_run_once_reuses_the_report_of_the_run(self, preflight, monkeypatch):
+        
+        first = preflight.run_once()
+        # A second check would now fail, so an unchanged report proves it was not repeated
+        monkeypatch.setenv('FAKE_ADB_DEVICES', "emulator-5554:offline")
+        
+        second = preflight.run_once()
+        
+        assert second == first
+        assert second['ready'] == ["emulator-5554"]
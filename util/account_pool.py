@@ -0,0 +1,194 @@
+"""
+Account Pool Module
+Leases a distinct test account to each test so parallel workers never share app state
+"""
+import os
+import json
+import time
+from typing import Dict, Any, List, Optional
+from config.config_loader import ConfigLoader
+from util.common_utils import CommonUtils
+from util.file_lock import FileLock
+from util.logger import Logger
+
+
+class AccountPool:
+    """
+    Cross-process lease manager for the test accounts in the credentials store
+    
+    Accounts come from a local JSON file (a list of objects with 'email' and
+    'password'), which is kept out of version control. Each lease is
+    exclusive across xdist workers. Tests that change server-side state
+    (e.g. marked `cart`) leave their account dirty. Dirty marks outlive the
+    run, so the next lease of that account knows it must be reset first.
+    Clean accounts are handed out before dirty ones, and the least used
+    first, so state-changing tests rotate through the pool.
+    """
+    
+    logger = Logger.get_logger(__name__)
+    
+    def __init__(self, accounts: Optional[List[Dict[str, Any]]] = None, settings: Optional[Dict[str, Any]] = None,
+                 state_dir: Optional[str] = None):
+        """
+        Initialize account pool
+        
+        Args:
+            accounts: Accounts, each with 'email' and 'password'
+            settings: 'account_pool' section of config.yaml
+            state_dir: Directory holding the shared lease state
+        """
+        self.settings = settings if settings is not None else ConfigLoader.section('account_pool')
+        self.accounts = accounts if accounts is not None else self.load_accounts(self.settings)
+        self.state_dir = state_dir or os.path.join(CommonUtils.get_project_root(), ".framework_cache")
+        self.state_file = os.path.join(self.state_dir, "account_pool.json")
+        self.lock = FileLock(os.path.join(self.state_dir, "account_pool.lock"))
+        self.run_id = Logger.get_run_id()
+        self.owner = os.getenv('PYTEST_XDIST_WORKER', 'master')
+    
+    @classmethod
+    def load_accounts(cls, settings: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Read the credentials store, falling back to TEST_ACCOUNT_EMAIL/TEST_ACCOUNT_PASSWORD
+        
+        Args:
+            settings: Account pool settings
+            
+        Returns:
+            list: Accounts with 'email' and 'password'
+        """
+        path = os.getenv('ACCOUNTS_FILE') or settings.get('credentials_file') or "config/accounts.json"
+        if not os.path.isabs(path):
+            path = os.path.join(CommonUtils.get_project_root(), path)
+        if os.path.exists(path):
+            with open(path, 'r') as file:
+                accounts = json.load(file)
+            return [account for account in accounts if account.get('email') and account.get('password')]
+        if os.getenv('TEST_ACCOUNT_EMAIL') and os.getenv('TEST_ACCOUNT_PASSWORD'):
+            return [{'email': os.getenv('TEST_ACCOUNT_EMAIL'), 'password': os.getenv('TEST_ACCOUNT_PASSWORD')}]
+        cls.logger.warning("No credentials store at %s and TEST_ACCOUNT_EMAIL is not set", path)
+        return []
+    
+    def lease(self, test: str = "") -> Dict[str, Any]:
+        """
+        Lease a free account, waiting until one is available
+        
+        Args:
+            test: Node id of the test taking the account
+            
+        Returns:
+            dict: Account with 'email', 'password' and 'dirty' (reasons it needs a reset)
+            
+        Raises:
+            RuntimeError: If the pool has no accounts
+            TimeoutError: If no account became free within lease_timeout
+        """
+        if not self.accounts:
+            raise RuntimeError("Account pool is empty. Create config/accounts.json or set TEST_ACCOUNT_EMAIL.")
+        
+        deadline = time.monotonic() + float(self.settings.get('lease_timeout', 600))
+        while True:
+            with self.lock:
+                state = self._read_state()
+                account = self._pick_account(state)
+                if account is not None:
+                    email = account['email']
+                    state['leases'][email] = {'owner': self.owner, 'pid': os.getpid(), 'test': test}
+                    state['uses'][email] = state['uses'].get(email, 0) + 1
+                    state['last_owner'][self.owner] = email
+                    self._write_state(state)
+                    dirty = state['dirty'].get(email, [])
+                    self.logger.info("Worker %s leased account %s%s", self.owner, email,
+                                     f" (dirty: {', '.join(dirty)})" if dirty else "")
+                    return {**account, 'dirty': dirty}
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"No free test account for worker {self.owner}")
+            time.sleep(1)
+    
+    def release(self, email: str, dirty: Optional[List[str]] = None):
+        """
+        Return an account to the pool
+        
+        Args:
+            email: Account email
+            dirty: Kinds of state the test changed, e.g. ['cart']
+        """
+        with self.lock:
+            state = self._read_state()
+            state['leases'].pop(email, None)
+            if dirty:
+                state['dirty'][email] = sorted(set(state['dirty'].get(email, [])) | set(dirty))
+            self._write_state(state)
+        self.logger.info("Worker %s released account %s%s", self.owner, email,
+                         f" (dirty: {', '.join(dirty)})" if dirty else "")
+    
+    def mark_clean(self, email: str):
+        """
+        Record that an account's state was reset
+        
+        Args:
+            email: Account email
+        """
+        with self.lock:
+            state = self._read_state()
+            state['dirty'].pop(email, None)
+            self._write_state(state)
+    
+    def dirty_reasons(self, markers: List[str]) -> List[str]:
+        """
+        Kinds of state a test changes, from its marker names
+        
+        Args:
+            markers: Marker names of the test
+            
+        Returns:
+            list: Configured dirtying markers the test carries
+        """
+        return [marker for marker in self.settings.get('dirtying_markers', ['cart']) if marker in markers]
+    
+    def _pick_account(self, state: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Pick a free account: clean before dirty, this worker's last account, then the least used"""
+        free = [account for account in self.accounts if account['email'] not in state['leases']]
+        if not free:
+            return None
+        previous = state['last_owner'].get(self.owner)
+        return min(free, key=lambda account: (
+            account['email'] in state['dirty'],
+            account['email'] != previous,
+            state['uses'].get(account['email'], 0),
+        ))
+    
+    def _read_state(self) -> Dict[str, Any]:
+        """Read pool state; leases of other runs and dead workers are dropped, dirty marks are kept"""
+        state = {}
+        if os.path.exists(self.state_file):
+            try:
+                with open(self.state_file, 'r') as file:
+                    state = json.load(file)
+            except ValueError:
+                self.logger.warning("Corrupt account pool state, starting fresh")
+        state.setdefault('dirty', {})
+        if state.get('run_id') != self.run_id:
+            state.update({'run_id': self.run_id, 'leases': {}, 'uses': {}, 'last_owner': {}})
+        state['leases'] = {
+            email: lease for email, lease in state['leases'].items() if self._is_process_alive(lease['pid'])
+        }
+        return state
+    
+    def _write_state(self, state: Dict[str, Any]):
+        """Atomically write pool state"""
+        os.makedirs(self.state_dir, exist_ok=True)
+        tmp_file = f"{self.state_file}.{os.getpid()}.tmp"
+        with open(tmp_file, 'w') as file:
+            json.dump(state, file, indent=4)
+        os.replace(tmp_file, self.state_file)
+    
+    @staticmethod
+    def _is_process_alive(pid: int) -> bool:
+        """Check whether the process holding a lease still exists"""
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            return True
+        return True
@@ -0,0 +1,223 @@
+"""
+ADB Client Module
+Thin wrapper around the adb executable used by preflight and the device pool
+"""
+import os
+import re
+import time
+import shlex
+import subprocess
+from typing import Dict, List, Optional
+from util.logger import Logger
+
+
+class AdbClient:
+    """
+    Runs adb commands against one device
+    
+    The executable comes from ADB_PATH, which may also be a full command
+    line such as "python util/fake_adb.py", so everything built on this
+    client can run against a fake adb without a device.
+    """
+    
+    logger = Logger.get_logger(__name__)
+    
+    # Focused window, then the focused app token; Android 10+ often leaves mCurrentFocus out of the window dump
+    FOCUS_PATTERNS = (
+        re.compile(r"mCurrentFocus=Window\{\S+ \S+ ([^/\s}]+)(?:/([^\s}]+))?\}"),
+        re.compile(r"mFocusedApp=.*?ActivityRecord\{\S+ \S+ ([^/\s}]+)/"),
+    )
+    RESUMED_PATTERN = re.compile(r"(?:topResumedActivity|mResumedActivity)=ActivityRecord\{\S+ \S+ ([^/\s}]+)/")
+    
+    def __init__(self, serial: Optional[str] = None, adb_path: Optional[str] = None, timeout: float = 30):
+        """
+        Initialize adb client
+        
+        Args:
+            serial: Device serial passed with -s, None for the only attached device
+            adb_path: adb command, defaults to ADB_PATH or 'adb'
+            timeout: Default command timeout in seconds
+        """
+        self.serial = serial
+        self.adb_path = adb_path or os.getenv('ADB_PATH', 'adb')
+        self.timeout = timeout
+    
+    def for_device(self, serial: str) -> 'AdbClient':
+        """
+        Get a client bound to another device
+        
+        Args:
+            serial: Device serial
+            
+        Returns:
+            AdbClient: Client with the same executable and timeout
+        """
+        return AdbClient(serial, self.adb_path, self.timeout)
+    
+    def run(self, *args: str, timeout: Optional[float] = None) -> subprocess.CompletedProcess:
+        """
+        Run an adb command
+        
+        Args:
+            *args: adb arguments
+            timeout: Command timeout in seconds, defaults to the client timeout
+            
+        Returns:
+            CompletedProcess: Finished command with text stdout and stderr
+        """
+        command = self._command(args)
+        return subprocess.run(command, capture_output=True, text=True, timeout=timeout or self.timeout)
+    
+    def run_binary(self, *args: str, data: Optional[bytes] = None,
+                   timeout: Optional[float] = None) -> subprocess.CompletedProcess:
+        """
+        Run an adb command with binary stdin and stdout
+        
+        Args:
+            *args: adb arguments
+            data: Bytes written to the command's stdin
+            timeout: Command timeout in seconds
+            
+        Returns:
+            CompletedProcess: Finished command with bytes stdout and stderr
+        """
+        command = self._command(args)
+        return subprocess.run(command, input=data, capture_output=True, timeout=timeout or self.timeout)
+    
+    def _command(self, args) -> List[str]:
+        """Full command line for adb arguments"""
+        command = shlex.split(self.adb_path)
+        if self.serial:
+            command += ['-s', self.serial]
+        command += list(args)
+        self.logger.debug("adb: %s", ' '.join(command))
+        return command
+    
+    def shell(self, *args: str, timeout: Optional[float] = None) -> str:
+        """
+        Run a shell command on the device
+        
+        Args:
+            *args: Shell command and arguments
+            timeout: Command timeout in seconds
+            
+        Returns:
+            str: Command output
+        """
+        return self.run('shell', *args, timeout=timeout).stdout
+    
+    def devices(self) -> Dict[str, str]:
+        """
+        List attached devices
+        
+        Returns:
+            dict: Serial to adb state ('device', 'offline', 'unauthorized', ...)
+        """
+        result = AdbClient(None, self.adb_path, self.timeout).run('devices')
+        devices = {}
+        for line in result.stdout.splitlines()[1:]:
+            parts = line.split()
+            if len(parts) >= 2:
+                devices[parts[0]] = parts[1]
+        return devices
+    
+    def is_boot_completed(self) -> bool:
+        """Check whether Android finished booting"""
+        return self.shell('getprop', 'sys.boot_completed').strip() == '1'
+    
+    def is_installed(self, package: str) -> bool:
+        """
+        Check whether a package is installed
+        
+        Args:
+            package: Application package
+            
+        Returns:
+            bool: True if installed
+        """
+        output = self.shell('pm', 'list', 'packages', package)
+        return f"package:{package}" in output.split()
+    
+    def version_name(self, package: str) -> Optional[str]:
+        """
+        Get the installed version of a package
+        
+        Args:
+            package: Application package
+            
+        Returns:
+            str: versionName, None if unknown
+        """
+        match = re.search(r"versionName=(\S+)", self.shell('dumpsys', 'package', package))
+        return match.group(1) if match else None
+    
+    def start_activity(self, package: str, activity: str) -> bool:
+        """
+        Launch an activity
+        
+        Args:
+            package: Application package
+            activity: Activity class name
+            
+        Returns:
+            bool: True if the activity manager accepted the intent
+        """
+        result = self.run('shell', 'am', 'start', '-n', f"{package}/{activity}")
+        return result.returncode == 0 and 'Error' not in result.stdout
+    
+    def force_stop(self, package: str):
+        """
+        Stop an app so its files can be replaced
+        
+        Args:
+            package: Application package
+        """
+        self.shell('am', 'force-stop', package)
+    
+    def focused_package(self) -> Optional[str]:
+        """
+        Get the package owning the focused window
+        
+        Reads mCurrentFocus or mFocusedApp from the window manager, and
+        the resumed activity from the activity manager when neither is
+        reported.
+        
+        Returns:
+            str: Package name, None if no app window has focus
+        """
+        windows = self.shell('dumpsys', 'window')
+        for pattern in self.FOCUS_PATTERNS:
+            match = pattern.search(windows)
+            if match:
+                return match.group(1)
+        match = self.RESUMED_PATTERN.search(self.shell('dumpsys', 'activity', 'activities'))
+        return match.group(1) if match else None
+    
+    def wait_for_focus(self, package: str, timeout: float = 30, poll_interval: float = 0.5) -> Optional[float]:
+        """
+        Poll until a package's window has focus
+        
+        Args:
+            package: Application package
+            timeout: Maximum wait in seconds
+            poll_interval: Time between probes in seconds
+            
+        Returns:
+            float: Seconds until the window was focused, None on timeout
+        """
+        start = time.monotonic()
+        while True:
+            if self.focused_package() == package:
+                return time.monotonic() - start
+            if time.monotonic() - start >= timeout:
+                return None
+            time.sleep(poll_interval)
+    
+    def ready_serials(self) -> List[str]:
+        """
+        List serials of devices in 'device' state
+        
+        Returns:
+            list: Device serials
+        """
+        return [serial for serial, state in self.devices().items() if state == 'device']
@@ -0,0 +1,233 @@
+"""
+Auth State Module
+Captures a signed-in app's persisted data once and restores it into later sessions
+"""
+import os
+import json
+import time
+import hashlib
+from typing import Callable, Dict, Any, List, Optional
+from base.base_page import BasePage
+from config.config_loader import ConfigLoader
+from util.adb_client import AdbClient
+from util.common_utils import CommonUtils
+from util.file_lock import FileLock
+from util.logger import Logger
+
+
+class AuthStateCache:
+    """
+    Per-account snapshots of the app's signed-in state
+    
+    After a UI login the app's data directories (shared_prefs, databases,
+    ...) are copied off the device with `run-as <package> tar`, which needs
+    a debuggable build. Later sessions stop the app, unpack the snapshot
+    into its data directory and start it again instead of signing in
+    through the UI. A snapshot is dropped when it is older than the
+    configured TTL, was taken from another app version, or the app does
+    not come back signed in (the server expired the session).
+    
+    Snapshots live in .framework_cache/auth/ and are shared by xdist
+    workers; a per-account file lock makes sure only one worker signs in
+    through the UI while the others wait for its snapshot.
+    """
+    
+    logger = Logger.get_logger(__name__)
+    
+    cache_dir = os.path.join(CommonUtils.get_project_root(), ".framework_cache", "auth")
+    
+    RESTORED = "restored"
+    UI_LOGIN = "ui_login"
+    
+    def __init__(self, package: str, adb: Optional[AdbClient] = None, settings: Optional[Dict[str, Any]] = None):
+        """
+        Initialize auth state cache
+        
+        Args:
+            package: Android package of the app under test
+            adb: adb client, defaults to one using ADB_PATH
+            settings: 'auth_cache' section of config.yaml
+        """
+        self.package = package
+        self.settings = settings if settings is not None else ConfigLoader.section('auth_cache')
+        self.adb = adb or AdbClient(timeout=float(self.settings.get('command_timeout', 30)))
+    
+    @staticmethod
+    def is_enabled() -> bool:
+        """Check if logins should be restored from snapshots (AUTH_CACHE overrides auth_cache.enabled)"""
+        return ConfigLoader.get_bool('auth_cache.enabled', True, env='AUTH_CACHE')
+    
+    def sign_in(self, driver, serial: str, account: str, ui_login: Callable, probe: Callable) -> str:
+        """
+        Bring the app into a signed-in state for an account
+        
+        Args:
+            driver: Appium driver of the session
+            serial: Device serial of the session
+            account: Account identifier, e.g. the email address
+            ui_login: Callable(driver) signing in through the UI
+            probe: Callable(driver) returning True if the app shows a signed-in user
+            
+        Returns:
+            str: RESTORED if a snapshot was used, UI_LOGIN otherwise
+            
+        Raises:
+            RuntimeError: If the UI login does not leave the app signed in
+        """
+        adb = self.adb.for_device(serial)
+        with self._lock(account):
+            start = time.perf_counter()
+            entry = self.get(account, adb.version_name(self.package))
+            if entry is not None and self.restore(adb, account):
+                driver.activate_app(self.package)
+                BasePage.forget(driver)
+                if probe(driver):
+                    self.logger.info("Restored signed-in state of %s in %.0fms", account,
+                                     (time.perf_counter() - start) * 1000)
+                    return self.RESTORED
+                self.invalidate(account, "app is not signed in after restoring")
+            
+            ui_login(driver)
+            if not probe(driver):
+                raise RuntimeError(f"UI login did not sign in {account}")
+            self.capture(adb, account)
+            return self.UI_LOGIN
+    
+    def get(self, account: str, version: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Get a usable snapshot's metadata
+        
+        Args:
+            account: Account identifier
+            version: Installed app version; snapshots of other versions are dropped
+            
+        Returns:
+            dict: Snapshot metadata, None if there is no valid snapshot
+        """
+        meta_path, data_path = self._paths(account)
+        try:
+            with open(meta_path, 'r') as file:
+                entry = json.load(file)
+        except (OSError, ValueError):
+            return None
+        
+        age = time.time() - entry.get('captured_at', 0)
+        if not os.path.exists(data_path):
+            self.invalidate(account, "snapshot data is missing")
+        elif age > float(self.settings.get('ttl', 43200)):
+            self.invalidate(account, f"snapshot expired after {age:.0f}s")
+        elif version and entry.get('version') and entry['version'] != version:
+            self.invalidate(account, f"app version changed from {entry['version']} to {version}")
+        else:
+            return entry
+        return None
+    
+    def capture(self, adb: AdbClient, account: str) -> bool:
+        """
+        Copy the app's data directories off the device
+        
+        Args:
+            adb: adb client bound to the session's device
+            account: Account identifier
+            
+        Returns:
+            bool: True if a snapshot was stored
+        """
+        start = time.perf_counter()
+        paths = self._existing_paths(adb)
+        if not paths:
+            self.logger.warning("No app data to snapshot for %s (is %s debuggable?)", account, self.package)
+            return False
+        result = adb.run_binary('exec-out', 'run-as', self.package, 'tar', '-cf', '-', *paths)
+        if result.returncode != 0 or not result.stdout:
+            self.logger.warning("Could not snapshot app data for %s: %s", account,
+                                result.stderr.decode(errors='replace').strip())
+            return False
+        
+        meta_path, data_path = self._paths(account)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._write(data_path, result.stdout)
+        entry = {
+            'account': account,
+            'package': self.package,
+            'version': adb.version_name(self.package),
+            'paths': paths,
+            'size': len(result.stdout),
+            'captured_at': time.time(),
+            'run_id': Logger.get_run_id(),
+        }
+        self._write(meta_path, json.dumps(entry, indent=4).encode())
+        self.logger.info("Snapshot of %s stored (%d bytes, %.2fs)", account, entry['size'],
+                         time.perf_counter() - start)
+        return True
+    
+    def restore(self, adb: AdbClient, account: str) -> bool:
+        """
+        Replace the app's data directories with a snapshot; the app is left stopped
+        
+        Args:
+            adb: adb client bound to the session's device
+            account: Account identifier
+            
+        Returns:
+            bool: True if the snapshot was unpacked
+        """
+        meta_path, data_path = self._paths(account)
+        try:
+            with open(meta_path, 'r') as file:
+                paths = json.load(file)['paths']
+            with open(data_path, 'rb') as file:
+                data = file.read()
+        except (OSError, ValueError, KeyError):
+            return False
+        
+        adb.force_stop(self.package)
+        adb.shell('run-as', self.package, 'rm', '-rf', *paths)
+        result = adb.run_binary('exec-in', 'run-as', self.package, 'tar', '-xf', '-', data=data)
+        if result.returncode != 0:
+            self.logger.warning("Could not restore app data for %s: %s", account,
+                                result.stderr.decode(errors='replace').strip())
+            return False
+        return True
+    
+    def invalidate(self, account: str, reason: str = ""):
+        """
+        Drop an account's snapshot
+        
+        Args:
+            account: Account identifier
+            reason: Logged reason
+        """
+        paths = [path for path in self._paths(account) if os.path.exists(path)]
+        if paths:
+            self.logger.info("Dropping auth snapshot of %s: %s", account, reason or "invalidated")
+        for path in paths:
+            os.remove(path)
+    
+    def _existing_paths(self, adb: AdbClient) -> List[str]:
+        """Configured data directories that exist in the app's data directory"""
+        wanted = self.settings.get('paths') or ['shared_prefs', 'databases', 'files']
+        listing = adb.shell('run-as', self.package, 'ls').split()
+        return [path for path in wanted if path in listing]
+    
+    def _key(self, account: str) -> str:
+        """File name stem of an account's snapshot"""
+        return hashlib.sha1(f"{self.package}:{account}".encode()).hexdigest()[:16]
+    
+    def _paths(self, account: str):
+        """Metadata and data file of an account's snapshot"""
+        key = self._key(account)
+        return os.path.join(self.cache_dir, f"{key}.json"), os.path.join(self.cache_dir, f"{key}.tar")
+    
+    def _lock(self, account: str) -> FileLock:
+        """Lock held while an account's snapshot is read or created"""
+        return FileLock(os.path.join(self.cache_dir, f"{self._key(account)}.lock"),
+                        timeout=float(self.settings.get('lock_timeout', 300)))
+    
+    @staticmethod
+    def _write(path: str, data: bytes):
+        """Atomically write a file"""
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as file:
+            file.write(data)
+        os.replace(tmp_path, path)
@@ -0,0 +1,166 @@
+"""
+Duration Scheduler Module
+xdist scheduler that hands out tests longest-first using recorded durations
+"""
+import os
+import json
+import heapq
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+from xdist.scheduler import LoadScopeScheduling
+from reports.results_store import ResultsStore
+from util.common_utils import CommonUtils
+from util.logger import Logger
+
+
+GROUPS_DIR = os.path.join(CommonUtils.get_project_root(), ".framework_cache")
+
+
+def groups_file(run_id: str) -> str:
+    """
+    Path of the nodeid to precondition group map written by the workers
+    
+    Args:
+        run_id: Test run id
+        
+    Returns:
+        str: JSON file path
+    """
+    return os.path.join(GROUPS_DIR, f"schedule_groups_{run_id}.json")
+
+
+def write_groups(items, run_id: str):
+    """
+    Save the precondition group of every collected test
+    
+    Tests marked @pytest.mark.precondition("name") share a work unit and
+    therefore a worker, so the expensive setup they share runs once.
+    
+    Args:
+        items: Collected pytest items
+        run_id: Test run id
+    """
+    groups = {}
+    for item in items:
+        marker = item.get_closest_marker('precondition')
+        if marker and marker.args:
+            groups[item.nodeid] = str(marker.args[0])
+    os.makedirs(GROUPS_DIR, exist_ok=True)
+    path = groups_file(run_id)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as file:
+        json.dump(groups, file)
+    os.replace(tmp_path, path)
+
+
+def predict_makespan(unit_durations: List[float], workers: int) -> float:
+    """
+    Makespan of greedy longest-first assignment to the least-loaded worker
+    
+    Args:
+        unit_durations: Expected duration of each work unit
+        workers: Number of workers
+        
+    Returns:
+        float: Expected run time of the busiest worker in seconds
+    """
+    loads = [0.0] * max(workers, 1)
+    for duration in sorted(unit_durations, reverse=True):
+        heapq.heappush(loads, heapq.heappop(loads) + duration)
+    return max(loads)
+
+
+class DurationScheduling(LoadScopeScheduling):
+    """
+    Longest-processing-time-first scheduling on top of xdist's scope scheduler
+    
+    Every test is its own work unit unless it shares a precondition group.
+    Units are queued by expected duration, longest first, and a worker only
+    receives the next unit when it is about to run out, so the next long
+    unit goes to whichever worker frees up first (the least loaded one).
+    """
+    
+    logger = Logger.get_logger(__name__)
+    
+    DEFAULT_DURATION = 30.0
+    
+    def __init__(self, config, log=None):
+        super().__init__(config, log)
+        self.run_id = Logger.get_run_id()
+        self.durations: Dict[str, float] = {}
+        self.groups: Dict[str, str] = {}
+        self.predicted_makespan: Optional[float] = None
+        self.worker_busy: Dict[str, float] = {}
+        self.started_at: Optional[float] = None
+        config._duration_schedule = self
+    
+    def _split_scope(self, nodeid: str) -> str:
+        group = self.groups.get(nodeid)
+        return f"precondition:{group}" if group else nodeid
+    
+    def schedule(self):
+        if self.collection is None:
+            self._load_history()
+        super().schedule()
+    
+    def _assign_work_unit(self, node):
+        if self.started_at is None:
+            self._order_workqueue()
+            self.started_at = time.monotonic()
+        super()._assign_work_unit(node)
+    
+    def mark_test_complete(self, node, item_index, duration=0):
+        worker = node.gateway.id
+        self.worker_busy[worker] = self.worker_busy.get(worker, 0.0) + duration
+        super().mark_test_complete(node, item_index, duration)
+    
+    def _reschedule(self, node):
+        if node.shutting_down:
+            return
+        if not self.workqueue:
+            node.shutdown()
+            return
+        # Keep a single test queued behind the running one: the worker needs it
+        # to finish the current test, and anything more would be pre-assigned
+        # before we know which worker frees up first
+        if self._pending_of(self.assigned_work[node]) > 1:
+            return
+        self._assign_work_unit(node)
+    
+    def unit_duration(self, work_unit) -> float:
+        """Expected duration of a work unit in seconds"""
+        return sum(self.durations.get(nodeid, self._default_duration()) for nodeid in work_unit)
+    
+    def _default_duration(self) -> float:
+        if not self.durations:
+            return self.DEFAULT_DURATION
+        known = sorted(self.durations.values())
+        return known[len(known) // 2]
+    
+    def _load_history(self):
+        try:
+            self.durations = ResultsStore().durations()
+        except Exception as e:
+            self.logger.warning("No duration history, scheduling in collection order: %s", e)
+        path = groups_file(self.run_id)
+        if os.path.exists(path):
+            with open(path, 'r') as file:
+                self.groups = json.load(file)
+    
+    def _order_workqueue(self):
+        """Queue the work units longest first and predict the makespan"""
+        self.workqueue = OrderedDict(
+            sorted(self.workqueue.items(), key=lambda item: -self.unit_duration(item[1]))
+        )
+        self.predicted_makespan = predict_makespan(
+            [self.unit_duration(unit) for unit in self.workqueue.values()], len(self.nodes)
+        )
+        self.logger.info(
+            "Duration scheduling: %d units on %d workers, %d tests with history, predicted makespan %.1fs",
+            len(self.workqueue), len(self.nodes), len(self.durations), self.predicted_makespan
+        )
+    
+    def actual_makespan(self) -> float:
+        """Busy time of the busiest worker in seconds"""
+        return max(self.worker_busy.values(), default=0.0)
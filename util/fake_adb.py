@@ -0,0 +1,188 @@
+"""
+Fake ADB Module
+Stand-in adb executable for running preflight and device code without a device
+
+Point ADB_PATH at it, e.g. ADB_PATH="python util/fake_adb.py". Behaviour
+is configured through environment variables:
+
+    FAKE_ADB_DEVICES      serial[:state] list, default "emulator-5554"
+    FAKE_ADB_PACKAGES     installed packages, default "com.mumzworld.android"
+    FAKE_ADB_FOCUS_DELAY  seconds between 'am start' and the window gaining focus
+    FAKE_ADB_SDK          API level; 29+ reports focus as on Android 10+ (no mCurrentFocus), default 28
+    FAKE_ADB_STATE        JSON file remembering launches between invocations
+    FAKE_ADB_DATA         directory holding each app's data as a tar, for run-as
+"""
+import os
+import sys
+import json
+import time
+import tarfile
+import tempfile
+
+# Run as a script, so the project root is not on the path yet
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from util.file_lock import FileLock  # noqa: E402
+
+DEFAULT_STATE = os.path.join(tempfile.gettempdir(), "fake_adb_state.json")
+
+
+def _devices():
+    devices = {}
+    for entry in os.getenv('FAKE_ADB_DEVICES', 'emulator-5554').split(','):
+        serial, _, state = entry.strip().partition(':')
+        if serial:
+            devices[serial] = state or 'device'
+    return devices
+
+
+def _packages():
+    return [p.strip() for p in os.getenv('FAKE_ADB_PACKAGES', 'com.mumzworld.android').split(',') if p.strip()]
+
+
+def _read_state():
+    try:
+        with open(os.getenv('FAKE_ADB_STATE', DEFAULT_STATE), 'r') as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+
+def _update_state(serial, launch):
+    """Set or clear (launch=None) a device's launch; parallel invocations must not lose updates"""
+    path = os.getenv('FAKE_ADB_STATE', DEFAULT_STATE)
+    with FileLock(f"{path}.lock"):
+        state = _read_state()
+        if launch is None:
+            state.pop(serial, None)
+        else:
+            state[serial] = launch
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as file:
+            json.dump(state, file)
+        os.replace(tmp_path, path)
+
+
+def _data_path(serial, package):
+    directory = os.getenv('FAKE_ADB_DATA', os.path.join(tempfile.gettempdir(), "fake_adb_data"))
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, f"{serial}_{package}.tar")
+
+
+def _run_as(serial, args):
+    """Answer run-as commands against the app's data tar; returns (bytes, code)"""
+    if len(args) < 2 or args[0] not in _packages():
+        return f"run-as: unknown package: {args[0] if args else ''}\n".encode(), 1
+    path = _data_path(serial, args[0])
+    command = args[1:]
+    if command == ['ls']:
+        if not os.path.exists(path):
+            return b"cache\n", 0
+        with tarfile.open(path) as archive:
+            names = sorted({member.name.split('/')[0] for member in archive.getmembers()})
+        return ''.join(f"{name}\n" for name in ['cache'] + names).encode(), 0
+    if command[:2] == ['rm', '-rf']:
+        if os.path.exists(path):
+            os.remove(path)
+        return b"", 0
+    if command[:3] == ['tar', '-cf', '-']:
+        if not os.path.exists(path):
+            return b"tar: no such file\n", 1
+        with open(path, 'rb') as file:
+            return file.read(), 0
+    if command[:3] == ['tar', '-xf', '-']:
+        data = sys.stdin.buffer.read()
+        with open(path, 'wb') as file:
+            file.write(data)
+        return b"", 0
+    return b"", 0
+
+
+def _sdk():
+    return int(os.getenv('FAKE_ADB_SDK', '28'))
+
+
+def _focused_component(serial):
+    """The launched app once FAKE_ADB_FOCUS_DELAY has passed, the launcher before"""
+    launch = _read_state().get(serial)
+    delay = float(os.getenv('FAKE_ADB_FOCUS_DELAY', '1.0'))
+    if launch and time.time() - launch['launched_at'] >= delay:
+        return launch['component']
+    return "com.android.launcher3/com.android.launcher3.Launcher"
+
+
+def _shell(serial, args):
+    """Answer the shell commands the framework uses"""
+    command = ' '.join(args)
+    if command == 'getprop sys.boot_completed':
+        return "1\n", 0
+    if command.startswith('pm list packages'):
+        wanted = args[3] if len(args) > 3 else ''
+        return ''.join(f"package:{p}\n" for p in _packages() if wanted in p), 0
+    if command.startswith('dumpsys package') and len(args) > 2:
+        if args[2] not in _packages():
+            return "", 0
+        return f"Packages:\n  Package [{args[2]}]\n    versionName=1.0.0\n", 0
+    if command.startswith('am start') and '-n' in args:
+        component = args[args.index('-n') + 1]
+        package, _, activity = component.partition('/')
+        if package not in _packages():
+            return f"Error: Activity class {{{component}}} does not exist.\n", 1
+        _update_state(serial, {'component': component, 'launched_at': time.time()})
+        return f"Starting: Intent {{ cmp={component} }}\n", 0
+    if command.startswith('am force-stop'):
+        _update_state(serial, None)
+        return "", 0
+    if args[:1] == ['run-as']:
+        output, code = _run_as(serial, args[1:])
+        return output.decode(errors='replace'), code
+    if command == 'getprop ro.build.version.sdk':
+        return f"{_sdk()}\n", 0
+    if command.startswith('dumpsys window'):
+        focus = _focused_component(serial)
+        if _sdk() >= 29:
+            return f"WINDOW MANAGER DISPLAY CONTENTS\n  mFocusedApp=ActivityRecord{{4f2e1d u0 {focus} t12}}\n", 0
+        return f"  mCurrentFocus=Window{{1a2b3c u0 {focus}}}\n", 0
+    if command.startswith('dumpsys activity activities'):
+        return f"  topResumedActivity=ActivityRecord{{4f2e1d u0 {_focused_component(serial)} t12}}\n", 0
+    return "", 0
+
+
+def main(argv):
+    """Dispatch an adb command line"""
+    serial = None
+    if argv[:1] == ['-s']:
+        serial, argv = argv[1], argv[2:]
+    devices = _devices()
+    
+    if argv[:1] == ['devices']:
+        print("List of devices attached")
+        for name, state in devices.items():
+            print(f"{name}\t{state}")
+        return 0
+    
+    if serial is None:
+        if len(devices) != 1:
+            sys.stderr.write("adb: more than one device/emulator\n" if devices else "adb: no devices/emulators found\n")
+            return 1
+        serial = next(iter(devices))
+    if devices.get(serial) != 'device':
+        sys.stderr.write(f"adb: device '{serial}' not found\n")
+        return 1
+    
+    if argv[:1] == ['get-state']:
+        print("device")
+        return 0
+    if argv[:1] == ['shell']:
+        output, code = _shell(serial, argv[1:])
+        sys.stdout.write(output)
+        return code
+    if argv[:1] in (['exec-out'], ['exec-in']) and argv[1:2] == ['run-as']:
+        output, code = _run_as(serial, argv[2:])
+        sys.stdout.buffer.write(output)
+        return code
+    sys.stderr.write(f"fake adb: unsupported command: {' '.join(argv)}\n")
+    return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
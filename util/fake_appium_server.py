@@ -0,0 +1,325 @@
+"""
+Fake Appium Server Module
+Local stand-in HTTP server that mimics the Appium W3C endpoints
+
+Elements are resolved against a static page_source hierarchy, so page
+objects, transports and benchmarks can run without a device.
+"""
+import json
+import time
+import uuid
+import argparse
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Dict, Any, Optional
+from base.page_snapshot import PageSnapshot, UnsupportedLocatorError
+
+# W3C web element identifier key
+ELEMENT_KEY = "element-6066-11e4-a52e-4f735466cecf"
+
+# 1x1 transparent PNG
+BLANK_PNG = (
+    "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAQAAAC1HAwCAAAAC0lEQVR42mNkYAAAAAYAAjCB0C8AAAAASUVORK5CYII="
+)
+
+DEFAULT_PAGE_SOURCE = """<?xml version="1.0" encoding="UTF-8"?>
+<hierarchy rotation="0">
+  <android.widget.FrameLayout package="com.mumzworld.android" bounds="[0,0][1080,2400]" displayed="true">
+    <android.widget.TextView text="Welcome" resource-id="com.mumzworld.android:id/title" bounds="[40,120][1040,200]" displayed="true"/>
+    <android.widget.EditText text="" resource-id="com.mumzworld.android:id/search" content-desc="Search" bounds="[40,240][1040,340]" displayed="true"/>
+    <android.widget.Button text="Sign In" resource-id="com.mumzworld.android:id/sign_in" content-desc="Sign In" bounds="[40,400][1040,500]" displayed="true"/>
+    <android.widget.TextView text="Account" content-desc="Account" bounds="[800,2280][1080,2400]" displayed="true"/>
+    <android.widget.TextView text="Cart" content-desc="Cart" bounds="[540,2280][800,2400]" displayed="true"/>
+  </android.widget.FrameLayout>
+</hierarchy>
+"""
+
+
+class FakeAppiumRequestHandler(BaseHTTPRequestHandler):
+    """Request handler speaking the subset of the W3C protocol the framework needs"""
+    
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately; like Node, don't let Nagle delay keep-alive replies
+    disable_nagle_algorithm = True
+    
+    def log_message(self, format, *args):
+        """Silence per-request logging"""
+    
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+    
+    def _delay(self):
+        with self.server.lock:
+            self.server.requests += 1
+        if self.server.latency:
+            time.sleep(self.server.latency)
+    
+    def _path(self) -> str:
+        path = self.path.split('?', 1)[0].rstrip('/')
+        if path.startswith('/wd/hub'):
+            path = path[len('/wd/hub'):]
+        return path or '/'
+    
+    def _read_body(self) -> Dict[str, Any]:
+        length = int(self.headers.get('Content-Length') or 0)
+        if not length:
+            return {}
+        try:
+            return json.loads(self.rfile.read(length))
+        except ValueError:
+            return {}
+    
+    def _send(self, status: int, value: Any):
+        body = json.dumps({'value': value}).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def _send_error(self, status: int, error: str, message: str):
+        self._send(status, {'error': error, 'message': message, 'stacktrace': ''})
+    
+    def _element_ref(self, node) -> Dict[str, str]:
+        element_id = self.server.element_ids.setdefault(id(node), uuid.uuid4().hex)
+        self.server.elements[element_id] = node
+        return {ELEMENT_KEY: element_id}
+    
+    def _find(self, body: Dict[str, Any], root=None) -> list:
+        locator = (body.get('using'), body.get('value'))
+        if root is not None:
+            return self.server.snapshot.find_all_within(root, locator)
+        return self.server.snapshot.find_all(locator)
+    
+    def _session_command(self, method: str, session_id: str, command: list, body: Dict[str, Any]):
+        """Handle /session/{id}/... commands"""
+        if session_id not in self.server.sessions:
+            self._send_error(404, 'invalid session id', f"Session {session_id} does not exist")
+            return
+        
+        if command in (['element'], ['elements']) and method == 'POST':
+            try:
+                nodes = self._find(body)
+            except UnsupportedLocatorError as e:
+                self._send_error(400, 'invalid selector', str(e))
+                return
+            self._send_found(command[0], nodes, body)
+            return
+        
+        if command and command[0] == 'element' and len(command) >= 3:
+            node = self.server.elements.get(command[1])
+            if node is None and command[1] in self.server.retired:
+                # Handles from before a hierarchy change are stale, as for a re-rendered view
+                self._send_error(404, 'stale element reference', f"Element {command[1]} is stale")
+                return
+            if node is None:
+                self._send_error(404, 'no such element', f"Element {command[1]} is unknown")
+                return
+            self._element_command(method, node, command[2:], body)
+            return
+        
+        if command == ['source']:
+            self._send(200, self.server.page_source)
+        elif command == ['screenshot']:
+            self._send(200, BLANK_PNG)
+        elif command == ['window', 'rect']:
+            self._send(200, {'x': 0, 'y': 0, 'width': 1080, 'height': 2400})
+        elif command in (['timeouts'], ['execute', 'sync'], ['actions'], ['appium', 'device', 'hide_keyboard']):
+            self._send(200, None)
+        elif command and command[0] == 'appium':
+            self._send(200, None)
+        else:
+            self._send_error(404, 'unknown command', f"{method} {'/'.join(command)} is not supported")
+    
+    def _send_found(self, kind: str, nodes: list, body: Dict[str, Any]):
+        if kind == 'elements':
+            self._send(200, [self._element_ref(node) for node in nodes])
+        elif nodes:
+            self._send(200, self._element_ref(nodes[0]))
+        else:
+            self._send_error(404, 'no such element', f"No element matches {body.get('using')}={body.get('value')}")
+    
+    def _element_command(self, method: str, node, command: list, body: Dict[str, Any]):
+        """Handle /session/{id}/element/{element id}/... commands"""
+        if command in (['element'], ['elements']) and method == 'POST':
+            try:
+                nodes = self._find(body, root=node)
+            except UnsupportedLocatorError as e:
+                self._send_error(400, 'invalid selector', str(e))
+                return
+            self._send_found(command[0], nodes, body)
+        elif command == ['click'] or command == ['clear']:
+            if command == ['clear']:
+                node.set('text', '')
+            self._send(200, None)
+        elif command == ['value']:
+            node.set('text', node.get('text', '') + body.get('text', ''))
+            self._send(200, None)
+        elif command == ['text']:
+            self._send(200, node.get('text', ''))
+        elif command == ['displayed']:
+            self._send(200, node.get('displayed', 'true') == 'true')
+        elif command == ['enabled']:
+            self._send(200, node.get('enabled', 'true') == 'true')
+        elif command == ['selected']:
+            self._send(200, node.get('selected', 'false') == 'true')
+        elif command == ['rect']:
+            bounds = PageSnapshot._BOUNDS_PATTERN.match(node.get('bounds', ''))
+            left, top, right, bottom = (int(value) for value in bounds.groups()) if bounds else (0, 0, 0, 0)
+            self._send(200, {'x': left, 'y': top, 'width': right - left, 'height': bottom - top})
+        elif len(command) == 2 and command[0] == 'attribute':
+            self._send(200, node.get(command[1]))
+        elif command == ['screenshot']:
+            self._send(200, BLANK_PNG)
+        else:
+            self._send_error(404, 'unknown command', f"{method} element/{'/'.join(command)} is not supported")
+    
+    def do_GET(self):
+        self._delay()
+        path = self._path()
+        if path == '/status':
+            self._send(200, {'ready': True, 'message': 'Fake Appium server is ready', 'build': {'version': 'fake'}})
+            return
+        parts = path.strip('/').split('/')
+        if len(parts) == 2 and parts[0] == 'session':
+            session = self.server.sessions.get(parts[1])
+            if session is None:
+                self._send_error(404, 'invalid session id', f"Session {parts[1]} does not exist")
+            else:
+                self._send(200, session)
+            return
+        if len(parts) > 2 and parts[0] == 'session':
+            self._session_command('GET', parts[1], parts[2:], {})
+            return
+        self._send_error(404, 'unknown command', f"GET {path} is not supported")
+    
+    def do_POST(self):
+        self._delay()
+        path = self._path()
+        body = self._read_body()
+        if path == '/session':
+            requested_at = time.time() * 1000
+            session_id = uuid.uuid4().hex
+            capabilities = dict(body.get('capabilities', {}).get('alwaysMatch', {}))
+            if capabilities.get('appium:eventTimings'):
+                capabilities['events'] = {
+                    'newSessionRequested': [requested_at],
+                    'newSessionStarted': [time.time() * 1000],
+                }
+            self.server.sessions[session_id] = capabilities
+            self._send(200, {'sessionId': session_id, 'capabilities': capabilities})
+            return
+        parts = path.strip('/').split('/')
+        if len(parts) > 2 and parts[0] == 'session':
+            self._session_command('POST', parts[1], parts[2:], body)
+            return
+        self._send_error(404, 'unknown command', f"POST {path} is not supported")
+    
+    def do_DELETE(self):
+        self._delay()
+        path = self._path()
+        parts = path.strip('/').split('/')
+        if len(parts) == 2 and parts[0] == 'session':
+            self.server.sessions.pop(parts[1], None)
+            self._send(200, None)
+            return
+        if len(parts) > 2 and parts[0] == 'session':
+            self._session_command('DELETE', parts[1], parts[2:], {})
+            return
+        self._send_error(404, 'unknown command', f"DELETE {path} is not supported")
+
+
+class FakeAppiumServer:
+    """Threaded fake Appium server, for tests and benchmarks"""
+    
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, handler_class=FakeAppiumRequestHandler,
+                 latency: float = 0.0, page_source: str = DEFAULT_PAGE_SOURCE):
+        """
+        Initialize fake server
+        
+        Args:
+            host: Interface to bind
+            port: Port to bind, 0 picks a free port
+            handler_class: Request handler class
+            latency: Seconds added to every request, to mimic a device round trip
+            page_source: Hierarchy that element lookups are answered from
+        """
+        self.httpd = ThreadingHTTPServer((host, port), handler_class)
+        self.httpd.daemon_threads = True
+        self.httpd.sessions = {}
+        self.httpd.lock = threading.Lock()
+        self.httpd.latency = latency
+        self.httpd.connections = 0
+        self.httpd.requests = 0
+        self.set_page_source(page_source)
+        self._thread: Optional[threading.Thread] = None
+    
+    def set_page_source(self, page_source: str):
+        """
+        Replace the hierarchy served by the fake device
+        
+        Args:
+            page_source: XML in driver.page_source format
+        """
+        self.httpd.page_source = page_source
+        self.httpd.snapshot = PageSnapshot(page_source)
+        self.httpd.retired = set(getattr(self.httpd, 'elements', {})) | getattr(self.httpd, 'retired', set())
+        self.httpd.elements = {}
+        self.httpd.element_ids = {}
+    
+    @property
+    def connections(self) -> int:
+        """Number of TCP connections accepted so far"""
+        return self.httpd.connections
+    
+    @property
+    def requests(self) -> int:
+        """Number of HTTP requests served so far"""
+        return self.httpd.requests
+    
+    @property
+    def url(self) -> str:
+        """Base URL of the running server"""
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+    
+    def start(self) -> "FakeAppiumServer":
+        """Serve requests on a background thread"""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+    
+    def stop(self):
+        """Stop serving and close the socket"""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+    
+    def __enter__(self):
+        return self.start()
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+
+def main():
+    """Run the fake server in the foreground, e.g. as a managed Appium server stand-in"""
+    parser = argparse.ArgumentParser(description="Fake Appium server")
+    parser.add_argument('--address', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=4723)
+    parser.add_argument('--latency', type=float, default=0.0, help="Seconds added to every request")
+    args, _ = parser.parse_known_args()
+    server = FakeAppiumServer(args.address, args.port, latency=args.latency)
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == '__main__':
+    main()
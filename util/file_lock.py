@@ -0,0 +1,60 @@
+"""
+File Lock Utility Module
+Provides a cross-process lock shared by pytest-xdist workers
+"""
+import os
+import time
+import fcntl
+
+
+class FileLock:
+    """Exclusive advisory lock on a file, usable as a context manager"""
+    
+    def __init__(self, lock_path: str, timeout: float = 60, poll_interval: float = 0.05):
+        """
+        Initialize file lock
+        
+        Args:
+            lock_path: Path of the lock file (created if missing)
+            timeout: Maximum time to wait for the lock in seconds
+            poll_interval: Time between lock attempts in seconds
+        """
+        self.lock_path = lock_path
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self._fd = None
+    
+    def acquire(self):
+        """
+        Acquire the lock, waiting up to the configured timeout
+        
+        Raises:
+            TimeoutError: If the lock could not be acquired in time
+        """
+        os.makedirs(os.path.dirname(self.lock_path) or ".", exist_ok=True)
+        fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                self._fd = fd
+                return
+            except BlockingIOError:
+                if time.monotonic() >= deadline:
+                    os.close(fd)
+                    raise TimeoutError(f"Could not acquire lock: {self.lock_path}")
+                time.sleep(self.poll_interval)
+    
+    def release(self):
+        """Release the lock if held"""
+        if self._fd is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+            self._fd = None
+    
+    def __enter__(self):
+        self.acquire()
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.release()
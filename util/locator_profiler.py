@@ -0,0 +1,383 @@
+"""
+Locator Profiler
+Times every page object locator against recorded or live hierarchies and finds cheaper equivalents
+
+Locators are collected from the classes of pageObjects/ that derive from
+BasePage. Each one is evaluated against every hierarchy, and candidates
+built from the attributes of the node it selects (resource-id, content-desc,
+a UiSelector on class and text) are kept when they select exactly the same
+nodes in every hierarchy. The report ranks locators by cost: server round
+trips when profiled live, snapshot evaluation time otherwise. --apply writes
+the proposals to the locator overrides file, which BasePage applies when
+page classes are defined.
+
+Usage:
+    python -m util.locator_profiler --source tests/cassettes --source dumps/
+    python -m util.locator_profiler --live --screens login,account,cart
+    python -m util.locator_profiler --source tests/cassettes --apply
+"""
+import os
+import sys
+import json
+import gzip
+import time
+import pkgutil
+import argparse
+import importlib
+import statistics
+from typing import Dict, Any, List, Optional, Tuple
+from appium.webdriver.common.appiumby import AppiumBy
+from selenium.webdriver.common.by import By
+from base.base_page import BasePage
+from base.locator_overrides import LocatorOverrides
+from base.page_snapshot import PageSnapshot, UnsupportedLocatorError, compile_locator
+from util.common_utils import CommonUtils
+from util.logger import Logger
+
+
+# Relative server-side cost of a strategy on UiAutomator2. id and accessibility id
+# are direct lookups, a UiSelector walks the view tree on the device, class names
+# match every node, and XPath serializes the whole hierarchy to XML first.
+STRATEGY_COST = {
+    By.ID: 0,
+    AppiumBy.ACCESSIBILITY_ID: 0,
+    AppiumBy.ANDROID_UIAUTOMATOR: 1,
+    By.CLASS_NAME: 2,
+    By.XPATH: 3,
+}
+
+
+class LocatorProfiler:
+    """Ranks page object locators by cost and proposes cheaper locators selecting the same nodes"""
+    
+    logger = Logger.get_logger(__name__)
+    
+    def __init__(self, hierarchies: List[Tuple[str, str]], repeat: int = 20):
+        """
+        Initialize locator profiler
+        
+        Args:
+            hierarchies: (name, page_source) pairs the locators are evaluated against
+            repeat: Evaluations per locator and hierarchy when timing
+        """
+        self.snapshots = [(name, PageSnapshot(source)) for name, source in hierarchies]
+        self.repeat = repeat
+        # (hierarchy name, locator) -> median server round trip in ms, filled by live profiling
+        self.server_ms: Dict[Tuple[str, Tuple[str, str]], float] = {}
+    
+    @staticmethod
+    def collect_locators(package: str = "pageObjects") -> Dict[str, Tuple[str, str]]:
+        """
+        Collect the locators declared on the page classes of a package
+        
+        Args:
+            package: Package holding the page objects
+            
+        Returns:
+            dict: 'PageClass.ATTRIBUTE' -> locator as declared in the source
+        """
+        module = importlib.import_module(package)
+        for info in pkgutil.iter_modules(module.__path__):
+            importlib.import_module(f"{package}.{info.name}")
+        
+        locators = {}
+        pending = list(BasePage.__subclasses__())
+        while pending:
+            page_class = pending.pop(0)
+            pending.extend(page_class.__subclasses__())
+            if not page_class.__module__.startswith(f"{package}."):
+                continue
+            for name, value in vars(page_class).items():
+                if (isinstance(value, tuple) and len(value) == 2 and value[0] in STRATEGY_COST
+                        and isinstance(value[1], str)):
+                    key = f"{page_class.__name__}.{name}"
+                    locators[key] = LocatorOverrides.original(key, value)
+        return dict(sorted(locators.items()))
+    
+    @classmethod
+    def load_hierarchies(cls, paths: List[str]) -> List[Tuple[str, str]]:
+        """
+        Read page sources from XML dumps and record/replay cassettes
+        
+        Args:
+            paths: .xml files, .json.gz cassettes or directories holding them
+            
+        Returns:
+            list: (name, page_source) pairs, duplicates removed
+        """
+        hierarchies, seen = [], set()
+        for path in paths:
+            files = [path]
+            if os.path.isdir(path):
+                files = [os.path.join(root, name) for root, _, names in sorted(os.walk(path)) for name in sorted(names)]
+            for file_path in files:
+                for index, source in enumerate(cls._read_sources(file_path)):
+                    if source not in seen:
+                        seen.add(source)
+                        name = os.path.relpath(file_path)
+                        hierarchies.append((f"{name}#{index}" if index else name, source))
+        return hierarchies
+    
+    def profile_live(self, driver, screens: List[str], locators: Dict[str, Tuple[str, str]]):
+        """
+        Capture hierarchies from a session and time server-side lookups on each screen
+        
+        Args:
+            driver: Appium driver instance
+            screens: Screen names of the navigation graph to visit, empty for the current screen only
+            locators: Output of collect_locators()
+        """
+        from pageObjects.navigation import get_graph, navigator
+        
+        by_name = {screen.name: screen for screen in get_graph().screens}
+        driver.implicitly_wait(0)
+        for screen_name in screens or [None]:
+            if screen_name is not None:
+                navigator(driver).navigate_to(by_name[screen_name])
+                BasePage(driver).wait_for_ui_idle()
+            name = f"live:{screen_name or 'current'}"
+            snapshot = PageSnapshot(driver.page_source)
+            self.snapshots.append((name, snapshot))
+            for locator in locators.values():
+                timed = [locator]
+                matches = self._matches(snapshot, locator)
+                if matches:
+                    timed += self._candidates(snapshot, matches)
+                for candidate in timed:
+                    self.server_ms[(name, candidate)] = self._time_server(driver, candidate)
+    
+    def profile(self, locators: Dict[str, Tuple[str, str]], min_hierarchies: int = 1) -> List[Dict[str, Any]]:
+        """
+        Cost and cheapest equivalent of every locator
+        
+        Args:
+            locators: Output of collect_locators()
+            min_hierarchies: Hierarchies the original must match before an equivalent is proposed
+            
+        Returns:
+            list: One entry per locator, most expensive first
+        """
+        results = []
+        for key, locator in locators.items():
+            try:
+                matches = [self._matches(snapshot, locator) for _, snapshot in self.snapshots]
+            except UnsupportedLocatorError as e:
+                results.append({'key': key, 'locator': list(locator), 'cost_ms': None, 'matched': 0,
+                                'proposal': None, 'note': str(e)})
+                continue
+            matched = sum(1 for nodes in matches if nodes)
+            entry = {'key': key, 'locator': list(locator), 'cost_ms': self._cost(locator), 'matched': matched,
+                     'proposal': None, 'note': ""}
+            if not matched:
+                entry['note'] = "matches no hierarchy"
+            elif matched < min_hierarchies:
+                entry['note'] = f"matches {matched} hierarchies, {min_hierarchies} needed for a proposal"
+            else:
+                proposal = self._cheapest_equivalent(locator, matches)
+                if proposal is not None:
+                    entry.update(proposal=list(proposal), proposal_cost_ms=self._cost(proposal))
+            results.append(entry)
+        return sorted(results, key=lambda entry: (
+            entry['cost_ms'] is None, -(entry['cost_ms'] or 0), -STRATEGY_COST.get(entry['locator'][0], 0)
+        ))
+    
+    @staticmethod
+    def overrides(results: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """
+        Locator overrides for the proposals of a profile
+        
+        Args:
+            results: Output of profile()
+            
+        Returns:
+            dict: Entries for LocatorOverrides.save()
+        """
+        return {
+            entry['key']: {
+                'original': entry['locator'],
+                'replacement': entry['proposal'],
+                'cost_ms': entry['cost_ms'],
+                'replacement_cost_ms': entry['proposal_cost_ms'],
+                'hierarchies': entry['matched'],
+            }
+            for entry in results if entry['proposal']
+        }
+    
+    @staticmethod
+    def ui_selector(*, instance: Optional[int] = None, **attributes: str) -> Tuple[str, str]:
+        """
+        Build a -android uiautomator locator
+        
+        Args:
+            instance: Zero-based position among the nodes the selector matches
+            **attributes: UiSelector method name -> string argument, e.g. resourceId="..."
+            
+        Returns:
+            tuple: Locator
+        """
+        def quote(value):
+            return '"' + value.replace('\\', '\\\\').replace('"', '\\"') + '"'
+        
+        selector = "new UiSelector()" + "".join(f".{method}({quote(value)})" for method, value in attributes.items())
+        if instance is not None:
+            selector += f".instance({instance})"
+        return AppiumBy.ANDROID_UIAUTOMATOR, selector
+    
+    def _cheapest_equivalent(self, locator: Tuple[str, str], matches: List[list]) -> Optional[Tuple[str, str]]:
+        """Cheapest candidate selecting the same nodes as a locator in every hierarchy"""
+        candidates = []
+        for (_, snapshot), nodes in zip(self.snapshots, matches):
+            if nodes:
+                candidates.extend(candidate for candidate in self._candidates(snapshot, nodes)
+                                  if candidate not in candidates)
+        equivalent = [
+            candidate for candidate in candidates
+            if all(self._matches(snapshot, candidate) == nodes for (_, snapshot), nodes in zip(self.snapshots, matches))
+        ]
+        cheaper = [
+            candidate for candidate in equivalent
+            if STRATEGY_COST[candidate[0]] < STRATEGY_COST[locator[0]]
+            and (not self.server_ms or self._cost(candidate) < self._cost(locator))
+        ]
+        if not cheaper:
+            return None
+        # Positional selectors break when rows are added; prefer ones that need no instance(),
+        # then the most specific selector
+        return min(cheaper, key=lambda candidate: (
+            STRATEGY_COST[candidate[0]], ".instance(" in candidate[1], -candidate[1].count(")."),
+            self._cost(candidate)
+        ))
+    
+    def _candidates(self, snapshot: PageSnapshot, nodes: list) -> List[Tuple[str, str]]:
+        """Locators built from the attributes of the first selected node"""
+        node = snapshot.nodes[nodes[0]]
+        resource_id, description = node.get('resource-id'), node.get('content-desc')
+        text, class_name = node.get('text'), node.get('class', node.tag)
+        candidates = []
+        if resource_id:
+            candidates += [(By.ID, resource_id), self.ui_selector(resourceId=resource_id)]
+        if description:
+            candidates += [(AppiumBy.ACCESSIBILITY_ID, description), self.ui_selector(description=description),
+                           self.ui_selector(className=class_name, description=description)]
+        if text:
+            candidates.append(self.ui_selector(className=class_name, text=text))
+        candidates.append(self.ui_selector(className=class_name))
+        
+        if len(nodes) == 1:
+            # A single node among several that look alike is addressed by its position
+            for candidate in [candidate for candidate in candidates if candidate[0] == AppiumBy.ANDROID_UIAUTOMATOR]:
+                selected = self._matches(snapshot, candidate)
+                if len(selected) > 1 and nodes[0] in selected:
+                    candidates.append((candidate[0], f"{candidate[1]}.instance({selected.index(nodes[0])})"))
+        return candidates
+    
+    @staticmethod
+    def _matches(snapshot: PageSnapshot, locator: Tuple[str, str]) -> List[int]:
+        """Positions of the nodes a locator selects in a snapshot"""
+        return [snapshot._order[id(node)] for node in snapshot.find_all(locator)]
+    
+    def _cost(self, locator: Tuple[str, str]) -> float:
+        """Total cost over all hierarchies in ms: server round trips where timed, snapshot evaluation otherwise"""
+        matcher = compile_locator(locator)
+        total = 0.0
+        for name, snapshot in self.snapshots:
+            if (name, locator) in self.server_ms:
+                total += self.server_ms[(name, locator)]
+                continue
+            durations = []
+            for _ in range(self.repeat):
+                start = time.perf_counter()
+                matcher(snapshot)
+                durations.append(time.perf_counter() - start)
+            total += statistics.median(durations) * 1000
+        return round(total, 4)
+    
+    def _time_server(self, driver, locator: Tuple[str, str]) -> float:
+        """Median find_elements round trip of a locator in ms"""
+        durations = []
+        for _ in range(self.repeat):
+            start = time.perf_counter()
+            driver.find_elements(*locator)
+            durations.append(time.perf_counter() - start)
+        return round(statistics.median(durations) * 1000, 4)
+    
+    @classmethod
+    def _read_sources(cls, path: str) -> List[str]:
+        """Page sources in an XML dump or a cassette"""
+        if path.endswith('.xml'):
+            with open(path, 'r', encoding='utf-8') as file:
+                return [file.read()]
+        if not path.endswith('.json.gz'):
+            return []
+        try:
+            with gzip.open(path, 'rt', encoding='utf-8') as file:
+                cassette = json.load(file)
+        except (OSError, ValueError):
+            cls.logger.warning("Skipping unreadable cassette: %s", path)
+            return []
+        sources = []
+        for interaction in cassette.get('interactions', []):
+            value = interaction['response'].get('value')
+            if interaction['key'].endswith('/source') and isinstance(value, str) and value not in sources:
+                sources.append(value)
+        return sources
+
+
+def print_report(results: List[Dict[str, Any]], live: bool):
+    """Print the ranked profile"""
+    unit = "server ms" if live else "eval ms"
+    print(f"{'locator':<42}{'strategy':<22}{'hits':>5}{unit:>12}{'proposed':>12}  proposal")
+    for entry in results:
+        cost = f"{entry['cost_ms']:.3f}" if entry['cost_ms'] is not None else "-"
+        proposed = f"{entry['proposal_cost_ms']:.3f}" if entry['proposal'] else ""
+        proposal = f"{entry['proposal'][0]}={entry['proposal'][1]}" if entry['proposal'] else entry['note']
+        print(f"{entry['key']:<42}{entry['locator'][0]:<22}{entry['matched']:>5}{cost:>12}{proposed:>12}  {proposal}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rank page object locators by cost and propose cheaper equivalents")
+    parser.add_argument('--source', action='append', default=[],
+                        help="XML dump, cassette or directory of them (repeatable), defaults to tests/cassettes")
+    parser.add_argument('--live', action='store_true', help="Profile against a session on APPIUM_SERVER_URL")
+    parser.add_argument('--platform', default="android")
+    parser.add_argument('--screens', default="", help="Comma-separated navigation graph screens to visit live")
+    parser.add_argument('--repeat', type=int, default=None, help="Timings per locator (20 offline, 3 live)")
+    parser.add_argument('--min-hierarchies', type=int, default=1,
+                        help="Hierarchies a locator must match before a replacement is proposed")
+    parser.add_argument('--report', default=os.path.join(CommonUtils.get_project_root(), "test_reports",
+                                                         "locator_profile.json"))
+    parser.add_argument('--apply', action='store_true', help="Write the proposals to the locator overrides file")
+    args = parser.parse_args()
+    
+    sources = args.source or ([] if args.live else [os.path.join(CommonUtils.get_project_root(), "tests", "cassettes")])
+    profiler = LocatorProfiler(LocatorProfiler.load_hierarchies(sources),
+                               repeat=args.repeat or (3 if args.live else 20))
+    locators = LocatorProfiler.collect_locators()
+    if args.live:
+        from base.driver_factory import DriverFactory
+        
+        driver = DriverFactory.acquire_driver(args.platform, "locator_profiler")
+        try:
+            profiler.profile_live(driver, [name for name in args.screens.split(',') if name], locators)
+        finally:
+            DriverFactory.quit_driver()
+    if not profiler.snapshots:
+        print(f"No page sources found in {', '.join(sources)}; record cassettes or pass --source/--live")
+        return 1
+    
+    results = profiler.profile(locators, args.min_hierarchies)
+    print_report(results, args.live)
+    os.makedirs(os.path.dirname(args.report), exist_ok=True)
+    with open(args.report, 'w') as file:
+        json.dump({'hierarchies': [name for name, _ in profiler.snapshots], 'locators': results}, file, indent=4)
+    print(f"{len(results)} locators, {len(profiler.snapshots)} hierarchies, report saved to {args.report}")
+    
+    overrides = LocatorProfiler.overrides(results)
+    if args.apply and overrides:
+        LocatorOverrides.save(overrides)
+        print(f"{len(overrides)} overrides written to {LocatorOverrides.path()}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,17 +1,80 @@
 """
 Logger Utility Module
 Provides centralized logging functionality for the framework
+
+All loggers share one queue. A background QueueListener formats the
+records and writes them to the console and to a single log file per run
+and xdist worker, flushing the file in batches. After shutdown, loggers
+write to the console and the file directly.
 """
+import atexit
+import glob
+import heapq
 import logging
+import logging.handlers
 import os
+import queue
+import re
+import time
 from datetime import datetime
 import colorlog
 
 
+LOG_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "logs")
+
+
+class _RunFileHandler(logging.FileHandler):
+    """File handler that resolves the run log path when the file is first opened"""
+    
+    def __init__(self):
+        super().__init__(os.path.join(LOG_DIR, "automation.log"), delay=True)
+    
+    def _open(self):
+        self.baseFilename = Logger.get_log_file()
+        os.makedirs(os.path.dirname(self.baseFilename), exist_ok=True)
+        return super()._open()
+    
+    def flush(self):
+        # Called after every record by StreamHandler.emit; writes stay in the
+        # file buffer until _BatchingHandler flushes the batch
+        pass
+    
+    def flush_batch(self):
+        """Push buffered writes to the file"""
+        with self.lock:
+            if self.stream is not None:
+                self.stream.flush()
+
+
+class _BatchingHandler(logging.handlers.MemoryHandler):
+    """Buffers records and flushes when full, on errors, or after flush_interval seconds"""
+    
+    def __init__(self, target: logging.Handler, capacity: int = 200, flush_interval: float = 1.0):
+        super().__init__(capacity, flushLevel=logging.ERROR, target=target)
+        self.flush_interval = flush_interval
+        self._last_flush = time.monotonic()
+    
+    def shouldFlush(self, record: logging.LogRecord) -> bool:
+        return super().shouldFlush(record) or time.monotonic() - self._last_flush >= self.flush_interval
+    
+    def flush(self):
+        super().flush()
+        if self.target is not None:
+            self.target.flush_batch()
+        self._last_flush = time.monotonic()
+
+
 class Logger:
     """Centralized logger class for the framework"""
     
+    FILE_FORMAT = '%(asctime)s.%(msecs)03d - %(name)s - %(levelname)s - %(message)s'
+    DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+    
     _loggers = {}
+    _queue_handler = None
+    _listener = None
+    _file_handler = None
+    _direct_handlers = None
     
     @staticmethod
     def get_logger(name: str, log_level: str = "INFO") -> logging.Logger:
@@ -20,7 +83,7 @@ class Logger:
         
         Args:
             name: Logger name (usually module name)
-            log_level: Logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL)
+            log_level: Logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL), LOG_LEVEL overrides it
             
         Returns:
             logging.Logger: Configured logger instance
@@ -30,30 +93,142 @@ class Logger:
         
         # Create logger
         logger = logging.getLogger(name)
-        logger.setLevel(getattr(logging, log_level.upper()))
+        logger.setLevel(getattr(logging, os.getenv('LOG_LEVEL', log_level).upper()))
         
         # Avoid duplicate handlers
         if logger.handlers:
             return logger
         
-        # Create logs directory if it doesn't exist
-        log_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "logs")
-        os.makedirs(log_dir, exist_ok=True)
+        for handler in Logger._get_handlers():
+            logger.addHandler(handler)
+        # Propagated records reach pytest's log capture (log_cli, "Captured log" in reports);
+        # LOG_PROPAGATE=false keeps them in the queue only
+        logger.propagate = os.getenv('LOG_PROPAGATE', 'true').lower() != 'false'
         
-        # Create log file with timestamp
-        log_file = os.path.join(
-            log_dir, 
-            f"automation_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log"
-        )
+        # Store logger
+        Logger._loggers[name] = logger
+        
+        return logger
+    
+    @staticmethod
+    def get_run_id() -> str:
+        """
+        Get the id shared by all processes of this test run
         
-        # File handler
-        file_handler = logging.FileHandler(log_file)
+        Returns:
+            str: TEST_RUN_ID, set to the current timestamp if missing
+        """
+        return os.environ.setdefault('TEST_RUN_ID', datetime.now().strftime('%Y%m%d_%H%M%S'))
+    
+    @staticmethod
+    def get_log_file() -> str:
+        """
+        Get the log file of this process
+        
+        Returns:
+            str: logs/automation_<run id>_<worker>.log
+        """
+        worker = os.getenv('PYTEST_XDIST_WORKER', 'master')
+        return os.path.join(LOG_DIR, f"automation_{Logger.get_run_id()}_{worker}.log")
+    
+    @staticmethod
+    def flush():
+        """Write out every record logged so far"""
+        if Logger._listener is None:
+            return
+        # Stopping drains the queue; the listener is restarted for later records
+        Logger._listener.stop()
+        Logger._file_handler.flush()
+        Logger._listener.start()
+    
+    @staticmethod
+    def shutdown():
+        """Drain the queue and switch every logger to the console and the file directly"""
+        if Logger._listener is None:
+            return
+        Logger._listener.stop()
+        file_handler = Logger._file_handler.target
+        console_handler = Logger._listener.handlers[1]
+        Logger._file_handler.close()
+        file_handler.close()
+        Logger._listener = None
+        
+        # Records logged later (atexit hooks of other modules) would otherwise sit in
+        # the stopped queue; the file reopens on the next record and logging.shutdown
+        # closes it at exit
+        Logger._direct_handlers = [file_handler, console_handler]
+        for logger in Logger._loggers.values():
+            logger.removeHandler(Logger._queue_handler)
+            for handler in Logger._direct_handlers:
+                logger.addHandler(handler)
+    
+    @staticmethod
+    def merge_worker_logs(run_id: str = None) -> str:
+        """
+        Merge the per-worker log files of a run into one chronological log
+        
+        Lines without a timestamp (tracebacks) stay with the record before
+        them, and every record is tagged with the worker that wrote it.
+        
+        Args:
+            run_id: Run to merge, defaults to the current run
+            
+        Returns:
+            str: Path of the merged log, or None without several worker logs
+        """
+        run_id = run_id or Logger.get_run_id()
+        paths = sorted(glob.glob(os.path.join(LOG_DIR, f"automation_{run_id}_*.log")))
+        if len(paths) < 2:
+            return None
+        
+        streams = []
+        for path in paths:
+            worker = path[:-len(".log")].rsplit('_', 1)[-1]
+            with open(path, 'r', errors='replace') as file:
+                streams.append(Logger._read_records(file.readlines(), worker))
+        
+        merged_path = os.path.join(LOG_DIR, f"automation_{run_id}.log")
+        with open(merged_path, 'w') as merged:
+            for _, worker, lines in heapq.merge(*streams, key=lambda record: record[0]):
+                merged.write(f"[{worker}] {lines[0]}")
+                merged.writelines(lines[1:])
+        return merged_path
+    
+    @staticmethod
+    def _read_records(lines, worker: str):
+        """Group log lines into (timestamp, worker, lines) records"""
+        timestamp = re.compile(r"^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}\.\d{3}")
+        records = []
+        for line in lines:
+            match = timestamp.match(line)
+            if match or not records:
+                records.append((match.group(0) if match else "", worker, [line]))
+            else:
+                records[-1][2].append(line)
+        return records
+    
+    @staticmethod
+    def _get_handlers() -> list:
+        """Handlers for a new logger: the shared queue, or the direct handlers after shutdown"""
+        if Logger._direct_handlers is not None:
+            return Logger._direct_handlers
+        return [Logger._get_queue_handler()]
+    
+    @staticmethod
+    def _get_queue_handler() -> logging.Handler:
+        """Create the shared queue and its listener on first use"""
+        if Logger._queue_handler is not None:
+            return Logger._queue_handler
+        
+        # File handler, flushed in batches
+        file_handler = _RunFileHandler()
         file_handler.setLevel(logging.DEBUG)
-        file_formatter = logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-            datefmt='%Y-%m-%d %H:%M:%S'
+        file_handler.setFormatter(logging.Formatter(Logger.FILE_FORMAT, datefmt=Logger.DATE_FORMAT))
+        Logger._file_handler = _BatchingHandler(
+            file_handler,
+            capacity=int(os.getenv('LOG_BUFFER_SIZE', '200')),
+            flush_interval=float(os.getenv('LOG_FLUSH_INTERVAL', '1.0')),
         )
-        file_handler.setFormatter(file_formatter)
         
         # Console handler with colors
         console_handler = logging.StreamHandler()
@@ -71,12 +246,13 @@ class Logger:
         )
         console_handler.setFormatter(console_formatter)
         
-        # Add handlers to logger
-        logger.addHandler(file_handler)
-        logger.addHandler(console_handler)
-        
-        # Store logger
-        Logger._loggers[name] = logger
-        
-        return logger
-
+        # The stock QueueHandler merges msg % args and the traceback into the
+        # message on the calling thread, so the listener formats plain text
+        Logger._queue_handler = logging.handlers.QueueHandler(queue.SimpleQueue())
+        Logger._listener = logging.handlers.QueueListener(
+            Logger._queue_handler.queue, Logger._file_handler, console_handler, respect_handler_level=True
+        )
+        Logger._listener.start()
+        atexit.register(Logger.shutdown)
+        return Logger._queue_handler
+        
\ No newline at end of file
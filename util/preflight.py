@@ -0,0 +1,225 @@
+"""
+Preflight Module
+Checks every test device once per run, concurrently, before any session starts
+"""
+import os
+import sys
+import json
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional
+from config.config_loader import ConfigLoader
+from util.adb_client import AdbClient
+from util.common_utils import CommonUtils
+from util.file_lock import FileLock
+from util.logger import Logger
+
+
+class Preflight:
+    """
+    Device preflight shared by pytest workers and the shell runners
+    
+    Each device is checked on its own thread: adb state, boot completion,
+    app installation and version, then the app is launched and the
+    focused window is polled until it belongs to the app. The first
+    process of a run does the work under a file lock and writes a JSON
+    report; every later process of the same run reads that report.
+    """
+    
+    logger = Logger.get_logger(__name__)
+    
+    def __init__(self, adb: Optional[AdbClient] = None, settings: Optional[Dict[str, Any]] = None,
+                 report_path: Optional[str] = None):
+        """
+        Initialize preflight
+        
+        Args:
+            adb: adb client, defaults to one using ADB_PATH
+            settings: 'preflight' section of config.yaml merged with the app package and activity
+            report_path: JSON report file, defaults to test_reports/preflight.json
+        """
+        self.settings = settings if settings is not None else self.load_settings()
+        self.adb = adb or AdbClient(timeout=float(self.settings.get('command_timeout', 30)))
+        root = CommonUtils.get_project_root()
+        self.report_path = report_path or os.path.join(root, "test_reports", "preflight.json")
+        self.lock = FileLock(
+            os.path.join(root, ".framework_cache", "preflight.lock"),
+            timeout=float(self.settings.get('readiness_timeout', 30)) + 120
+        )
+        self.run_id = Logger.get_run_id()
+    
+    @staticmethod
+    def load_settings() -> Dict[str, Any]:
+        """
+        Read the preflight section and the Android app of the active profile
+        
+        Returns:
+            dict: Preflight settings with app_package and app_activity
+        """
+        android = ConfigLoader.capability_profile('android')
+        settings = {'app_package': android.get('app_package'), 'app_activity': android.get('app_activity')}
+        settings.update(ConfigLoader.section('preflight'))
+        return settings
+    
+    def run_once(self) -> Dict[str, Any]:
+        """
+        Run the preflight unless another process of this run already did
+        
+        Returns:
+            dict: Preflight report
+        """
+        with self.lock:
+            report = self.read_report()
+            if report is not None and report.get('run_id') == self.run_id:
+                self.logger.info("Preflight already done for run %s", self.run_id)
+                return report
+            report = self.run()
+            self.write_report(report)
+            return report
+    
+    def run(self, serials: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Check devices concurrently
+        
+        Args:
+            serials: Devices to check, defaults to the device pool inventory or every attached device
+            
+        Returns:
+            dict: Report with run_id, ok, duration and one entry per device
+        """
+        start = time.monotonic()
+        attached = self.adb.devices()
+        if serials is None:
+            serials = self._pool_serials() or list(attached)
+        
+        devices = []
+        if serials:
+            with ThreadPoolExecutor(max_workers=min(len(serials), int(self.settings.get('max_workers', 8)))) as pool:
+                devices = list(pool.map(lambda serial: self.check_device(serial, attached.get(serial)), serials))
+        
+        report = {
+            'run_id': self.run_id,
+            'finished_at': time.time(),
+            'duration': round(time.monotonic() - start, 3),
+            'ok': bool(devices) and all(device['ok'] for device in devices),
+            'ready': [device['serial'] for device in devices if device['ok']],
+            'devices': devices,
+        }
+        for device in devices:
+            if device['ok']:
+                self.logger.info("✓ %s ready in %.1fs (%s %s)", device['serial'], device['duration'],
+                                 self.settings.get('app_package'), device['version'] or '')
+            else:
+                self.logger.error("✗ %s failed preflight: %s", device['serial'], device['error'])
+        if not devices:
+            self.logger.error("No Android device/emulator connected")
+        return report
+    
+    def check_device(self, serial: str, state: Optional[str]) -> Dict[str, Any]:
+        """
+        Check one device and bring the app to the foreground
+        
+        Args:
+            serial: Device serial
+            state: adb state of the device, None if it is not attached
+            
+        Returns:
+            dict: Device result with ok, error and per-check details
+        """
+        start = time.monotonic()
+        package = self.settings.get('app_package')
+        result = {
+            'serial': serial, 'state': state, 'ok': False, 'error': None, 'installed': False,
+            'version': None, 'launched': False, 'ready_after': None, 'duration': 0.0,
+        }
+        adb = self.adb.for_device(serial)
+        try:
+            if state != 'device':
+                result['error'] = f"adb state is {state or 'not attached'}"
+            elif not adb.is_boot_completed():
+                result['error'] = "boot not completed"
+            elif not adb.is_installed(package):
+                result['error'] = f"{package} is not installed"
+            else:
+                result['installed'] = True
+                result['version'] = adb.version_name(package)
+                if not self.settings.get('launch_app', True):
+                    result['ok'] = True
+                elif not adb.start_activity(package, self.settings.get('app_activity')):
+                    result['error'] = "app launch failed"
+                else:
+                    result['launched'] = True
+                    ready_after = adb.wait_for_focus(
+                        package,
+                        timeout=float(self.settings.get('readiness_timeout', 30)),
+                        poll_interval=float(self.settings.get('poll_interval', 0.5))
+                    )
+                    if ready_after is None:
+                        result['error'] = "app window never gained focus"
+                    else:
+                        result['ready_after'] = round(ready_after, 3)
+                        result['ok'] = True
+        except Exception as e:
+            result['error'] = str(e)
+        result['duration'] = round(time.monotonic() - start, 3)
+        return result
+    
+    def read_report(self) -> Optional[Dict[str, Any]]:
+        """
+        Read the last preflight report
+        
+        Returns:
+            dict: Report, None if missing or unreadable
+        """
+        if not os.path.exists(self.report_path):
+            return None
+        try:
+            with open(self.report_path, 'r') as file:
+                return json.load(file)
+        except ValueError:
+            return None
+    
+    def write_report(self, report: Dict[str, Any]):
+        """
+        Atomically write the preflight report
+        
+        Args:
+            report: Preflight report
+        """
+        os.makedirs(os.path.dirname(self.report_path), exist_ok=True)
+        tmp_path = f"{self.report_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as file:
+            json.dump(report, file, indent=4)
+        os.replace(tmp_path, self.report_path)
+    
+    @staticmethod
+    def _pool_serials() -> List[str]:
+        """Devices configured for the device pool, if it is enabled"""
+        from base.device_pool import DevicePool
+        if not DevicePool.is_enabled():
+            return []
+        return [device['udid'] for device in ConfigLoader.section('device_pool').get('devices') or []]
+
+
+def main():
+    """Run the preflight from the shell runners; exits non-zero when no device is ready"""
+    parser = argparse.ArgumentParser(description="Device preflight")
+    parser.add_argument('--no-launch', action='store_true', help="Only check devices and app installation")
+    parser.add_argument('--report', default=None, help="JSON report path")
+    args = parser.parse_args()
+    
+    settings = Preflight.load_settings()
+    if args.no_launch:
+        settings['launch_app'] = False
+    report = Preflight(settings=settings, report_path=args.report).run_once()
+    for device in report['devices']:
+        status = "ready" if device['ok'] else f"FAILED: {device['error']}"
+        print(f"{device['serial']}: {status}")
+    if not report['devices']:
+        print("No Android device/emulator connected")
+    return 0 if report['ready'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
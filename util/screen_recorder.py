@@ -0,0 +1,187 @@
+"""
+Screen Recorder Module
+Failure-only screen recording kept on the device until a test fails
+"""
+import os
+import base64
+import shutil
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional
+import allure_commons
+from config.config_loader import ConfigLoader
+from util.common_utils import CommonUtils
+from util.logger import Logger
+
+
+class _AllureStepListener:
+    """Rolls the recording at allure.step boundaries"""
+    
+    @allure_commons.hookimpl
+    def start_step(self, uuid, title, params):
+        ScreenRecorder.roll_if_needed()
+
+
+class ScreenRecorder:
+    """
+    Rolling on-device recording that is only downloaded for failed tests
+    
+    Every test restarts the device recording with forceRestart, which
+    drops the previous test's video on the device, so passing tests cost
+    one command and no transfer. Long tests are restarted at an allure step
+    boundary before the recording hits its time limit. When a test fails
+    the video is fetched, and decoding, trimming to the last keep_seconds
+    with ffmpeg, and writing happen on a background thread.
+    """
+    
+    logger = Logger.get_logger(__name__)
+    
+    _lock = threading.Lock()
+    _settings: Optional[Dict[str, Any]] = None
+    _executor: Optional[ThreadPoolExecutor] = None
+    _driver = None
+    _started_at: Optional[float] = None
+    _listener_registered = False
+    
+    recording_dir = os.path.join(CommonUtils.get_project_root(), "test_reports", "recordings")
+    
+    @staticmethod
+    def load_settings() -> Dict[str, Any]:
+        """
+        Read the recording section from config.yaml
+        
+        Returns:
+            dict: Recording settings
+        """
+        return ConfigLoader.section('recording')
+    
+    @classmethod
+    def settings(cls) -> Dict[str, Any]:
+        """Recording settings, loaded once per process"""
+        if cls._settings is None:
+            cls._settings = cls.load_settings()
+        return cls._settings
+    
+    @classmethod
+    def is_enabled(cls) -> bool:
+        """
+        Check whether failure recordings are enabled
+        
+        Returns:
+            bool: True if enabled via SCREEN_RECORDING or config.yaml
+        """
+        return ConfigLoader.get_bool('recording.enabled', False, env='SCREEN_RECORDING')
+    
+    @classmethod
+    def start(cls, driver):
+        """
+        Start a fresh recording for the next test, discarding the previous one
+        
+        Args:
+            driver: Appium driver instance
+        """
+        if not cls._listener_registered:
+            allure_commons.plugin_manager.register(_AllureStepListener())
+            cls._listener_registered = True
+        cls._driver = driver
+        cls._restart()
+    
+    @classmethod
+    def roll_if_needed(cls):
+        """Restart the recording before it reaches its time limit"""
+        if cls._driver is None or cls._started_at is None:
+            return
+        settings = cls.settings()
+        roll_after = int(settings.get('time_limit', 600)) - int(settings.get('keep_seconds', 30))
+        if time.monotonic() - cls._started_at >= roll_after:
+            cls.logger.debug("Rolling screen recording")
+            cls._restart()
+    
+    @classmethod
+    def stop(cls):
+        """Forget the current recording; the device drops it on the next start or session end"""
+        cls._driver = None
+        cls._started_at = None
+    
+    @classmethod
+    def save_failure(cls, name: str) -> Optional[str]:
+        """
+        Fetch the current recording and keep its last keep_seconds
+        
+        Args:
+            name: File name stem, usually the test name
+            
+        Returns:
+            str: Path the video will be written to, None if nothing was recorded
+        """
+        if cls._driver is None or cls._started_at is None:
+            return None
+        try:
+            payload = cls._driver.stop_recording_screen()
+        except Exception as e:
+            cls.logger.warning("Could not fetch screen recording: %s", e)
+            return None
+        finally:
+            cls._started_at = None
+        if not payload:
+            return None
+        
+        path = os.path.join(cls.recording_dir, f"{name}_{Logger.get_run_id()}.mp4")
+        with cls._lock:
+            if cls._executor is None:
+                cls._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="recording")
+            cls._executor.submit(cls._write, payload, path)
+        return path
+    
+    @classmethod
+    def shutdown(cls):
+        """Finish writing queued videos"""
+        with cls._lock:
+            executor, cls._executor = cls._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+    
+    @classmethod
+    def _restart(cls):
+        settings = cls.settings()
+        options = {'timeLimit': int(settings.get('time_limit', 600)), 'forceRestart': True}
+        if settings.get('bit_rate'):
+            options['bitRate'] = int(settings['bit_rate'])
+        if settings.get('video_size'):
+            options['videoSize'] = settings['video_size']
+        try:
+            cls._driver.start_recording_screen(**options)
+            cls._started_at = time.monotonic()
+        except Exception as e:
+            cls.logger.warning("Could not start screen recording: %s", e)
+            cls._started_at = None
+    
+    @classmethod
+    def _write(cls, payload: str, path: str):
+        """Decode the video and trim it to the last keep_seconds"""
+        try:
+            os.makedirs(cls.recording_dir, exist_ok=True)
+            raw_path = f"{path}.full.mp4"
+            with open(raw_path, 'wb') as file:
+                file.write(base64.b64decode(payload))
+            
+            ffmpeg = shutil.which(cls.settings().get('ffmpeg', 'ffmpeg'))
+            if ffmpeg is None:
+                os.replace(raw_path, path)
+                return
+            keep_seconds = int(cls.settings().get('keep_seconds', 30))
+            result = subprocess.run(
+                [ffmpeg, '-y', '-loglevel', 'error', '-sseof', f"-{keep_seconds}", '-i', raw_path, '-c', 'copy', path],
+                capture_output=True, text=True
+            )
+            if result.returncode == 0:
+                os.remove(raw_path)
+            else:
+                # Shorter than keep_seconds or not seekable: keep the whole video
+                cls.logger.debug("ffmpeg trim failed, keeping full video: %s", result.stderr.strip())
+                os.replace(raw_path, path)
+            cls.logger.info("Failure recording saved: %s", path)
+        except Exception as e:
+            cls.logger.error("Failed to save screen recording %s: %s", path, e)
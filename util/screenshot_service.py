@@ -0,0 +1,176 @@
+"""
+Screenshot Service Module
+Captures screenshots on the calling thread and processes them in the background
+"""
+import os
+import io
+import base64
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future, wait
+from typing import Dict, Any, Optional
+from config.config_loader import ConfigLoader
+from util.common_utils import CommonUtils
+from util.logger import Logger
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+
+class ScreenshotService:
+    """
+    Background screenshot processing shared by the reporting hooks and page objects
+    
+    Only the driver round trip for the base64 payload happens on the
+    caller's thread. Decoding, downscaling, re-encoding and writing run on
+    a small thread pool. Screenshots are stored under the SHA-1 of their
+    payload, so identical frames are written once and every report entry
+    points to the same file.
+    """
+    
+    logger = Logger.get_logger(__name__)
+    
+    _lock = threading.Lock()
+    _executor: Optional[ThreadPoolExecutor] = None
+    _settings: Optional[Dict[str, Any]] = None
+    _pending: Dict[str, Future] = {}
+    
+    screenshot_dir = os.path.join(CommonUtils.get_project_root(), "test_reports", "screenshots")
+    
+    @staticmethod
+    def load_settings() -> Dict[str, Any]:
+        """
+        Read the screenshots section from config.yaml
+        
+        Returns:
+            dict: Screenshot settings
+        """
+        return ConfigLoader.section('screenshots')
+    
+    @classmethod
+    def settings(cls) -> Dict[str, Any]:
+        """Screenshot settings, loaded once per process"""
+        if cls._settings is None:
+            cls._settings = cls.load_settings()
+        return cls._settings
+    
+    @classmethod
+    def capture(cls, driver, name: str = "screenshot") -> str:
+        """
+        Capture the screen into the content-addressed store
+        
+        Args:
+            driver: Appium driver instance
+            name: Description used in log messages
+            
+        Returns:
+            str: Path the screenshot is (or will shortly be) stored at
+        """
+        payload = driver.get_screenshot_as_base64()
+        digest = hashlib.sha1(payload.encode('ascii')).hexdigest()[:20]
+        path = os.path.join(cls.screenshot_dir, f"{digest}.{cls._extension()}")
+        
+        with cls._lock:
+            if path in cls._pending or os.path.exists(path):
+                cls.logger.debug("Screenshot %s is identical to %s", name, path)
+                return path
+            cls._pending[path] = cls._get_executor().submit(cls._store, payload, path, True)
+        cls.logger.info("Screenshot %s queued: %s", name, path)
+        return path
+    
+    @classmethod
+    def save(cls, driver, path: str) -> Future:
+        """
+        Capture the screen to an explicit file
+        
+        The image is converted to the format of the file extension when
+        Pillow is installed, and is not downscaled.
+        
+        Args:
+            driver: Appium driver instance
+            path: Target file path
+            
+        Returns:
+            Future: Completes when the file is written
+        """
+        payload = driver.get_screenshot_as_base64()
+        with cls._lock:
+            future = cls._get_executor().submit(cls._store, payload, path, False)
+            cls._pending[path] = future
+        return future
+    
+    @classmethod
+    def wait(cls, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until every queued screenshot is written
+        
+        Args:
+            timeout: Maximum wait in seconds, None waits forever
+            
+        Returns:
+            bool: True if nothing is pending anymore
+        """
+        with cls._lock:
+            futures = list(cls._pending.values())
+        _, not_done = wait(futures, timeout=timeout)
+        return not not_done
+    
+    @classmethod
+    def shutdown(cls):
+        """Finish queued work and stop the thread pool"""
+        with cls._lock:
+            executor, cls._executor = cls._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+    
+    @classmethod
+    def _get_executor(cls) -> ThreadPoolExecutor:
+        """Create the thread pool on first use; caller holds the lock"""
+        if cls._executor is None:
+            cls._executor = ThreadPoolExecutor(
+                max_workers=int(cls.settings().get('workers', 2)),
+                thread_name_prefix="screenshot",
+            )
+        return cls._executor
+    
+    @classmethod
+    def _extension(cls) -> str:
+        """File extension of stored screenshots"""
+        image_format = str(cls.settings().get('format', 'jpeg')).lower()
+        if Image is None or image_format == 'png':
+            return "png"
+        return "jpg" if image_format == 'jpeg' else image_format
+    
+    @classmethod
+    def _store(cls, payload: str, path: str, downscale: bool):
+        """Decode, optionally downscale and re-encode, then write atomically"""
+        try:
+            data = base64.b64decode(payload)
+            extension = os.path.splitext(path)[1].lstrip('.').lower()
+            max_width = int(cls.settings().get('max_width', 0)) if downscale else 0
+            
+            if Image is not None and (extension != 'png' or max_width):
+                image = Image.open(io.BytesIO(data))
+                if max_width and image.width > max_width:
+                    height = round(image.height * max_width / image.width)
+                    image = image.resize((max_width, height), Image.BILINEAR)
+                image_format = 'JPEG' if extension in ('jpg', 'jpeg') else extension.upper()
+                if image_format == 'JPEG':
+                    image = image.convert('RGB')
+                output = io.BytesIO()
+                image.save(output, format=image_format, quality=int(cls.settings().get('quality', 80)))
+                data = output.getvalue()
+            
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as file:
+                file.write(data)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            cls.logger.error("Failed to write screenshot %s: %s", path, e)
+            raise
+        finally:
+            with cls._lock:
+                cls._pending.pop(path, None)